@@ -0,0 +1,187 @@
+import os
+import threading
+from contextlib import contextmanager
+import psycopg
+from psycopg.pq import TransactionStatus
+from dotenv import load_dotenv
+from plans import postgres_operators
+from presto_client import BlockingPrestoClient
+
+load_dotenv()
+
+# Rows fetched at a time when a query's results are streamed from PostgreSQL
+STREAM_PAGE_ROWS = 10000
+
+class Executor:
+    """Runs the rendered queries of a scenario on one engine.
+
+    run(query) returns a dictionary with at least "executionTime" in seconds and may add
+    "wallTime", "rowCount", "optimizerPlan" and "operators" in the schema of plans.py. It is
+    called from several threads at once in throughput mode. stream_rows(query, on_rows) runs a
+    query for its results, calling on_rows(columns, rows) for every page with the columns as
+    (name, type) pairs, where the type is None when the engine's values carry it.
+    """
+
+    name = None
+    chart_title = "Query Execution Times"
+    chart_color = "salmon"
+    # Whether the executor takes the session settings a scenario file can give
+    supports_settings = False
+
+    def run(self, query):
+        raise NotImplementedError
+
+    def stream_rows(self, query, on_rows):
+        raise NotImplementedError
+
+    def active_workers(self):
+        """Return the number of workers the engine runs queries on, or None when it has no workers."""
+        return None
+
+    def close(self):
+        pass
+
+class PostgresExecutor(Executor):
+    """Runs queries directly on PostgreSQL with EXPLAIN ANALYZE on pooled connections.
+
+    Connections are opened on demand, one per concurrent query, and kept open for the next ones,
+    so connection setup is not part of the measured queries. Every connection applies the session
+    settings given, like {"work_mem": "64MB", "jit": "off"}, when it is opened.
+    """
+
+    name = "postgres"
+    chart_title = "PostgreSQL Query Execution Times"
+    supports_settings = True
+
+    def __init__(self, settings=None):
+        self.conninfo = {
+            "host": os.getenv("POSTGRES_HOST"),
+            "port": os.getenv("POSTGRES_PORT"),
+            "user": os.getenv("POSTGRES_USER"),
+            "password": os.getenv("POSTGRES_PASSWORD"),
+            "dbname": os.getenv("POSTGRES_DB"),
+        }
+        self.settings = dict(settings or {})
+        self._idle = []
+        self._pool_lock = threading.Lock()
+
+    def connect(self):
+        """Open a connection in autocommit mode with the session settings applied."""
+        conn = psycopg.connect(**self.conninfo, autocommit=True)
+        try:
+            with conn.cursor() as cursor:
+                for setting, value in self.settings.items():
+                    cursor.execute("SELECT set_config(%s, %s, false)", (setting, str(value)))
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Lend an idle pooled connection, or a new one, and take it back unless the query broke it."""
+        with self._pool_lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None or conn.closed:
+            conn = self.connect()
+        try:
+            yield conn
+        except Exception:
+            conn.close()
+            raise
+        if conn.closed or conn.info.transaction_status != TransactionStatus.IDLE:
+            conn.close()
+            return
+        with self._pool_lock:
+            self._idle.append(conn)
+
+    def run(self, query):
+        """Execute a query with EXPLAIN ANALYZE and return its execution time in seconds, plan and operators."""
+        with self.connection() as conn:
+            # Capture the optimizer plan as JSON, which psycopg decodes
+            with conn.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (ANALYZE, VERBOSE, BUFFERS, FORMAT JSON) {query}")
+                optimizer_plan = cursor.fetchone()[0]
+
+        execution_time = optimizer_plan[0].get("Execution Time")
+        return {
+            "executionTime": execution_time / 1000 if execution_time is not None else None,
+            "optimizerPlan": optimizer_plan,
+            "operators": postgres_operators(optimizer_plan),
+        }
+
+    def stream_rows(self, query, on_rows):
+        """Fetch the results of a query through a server-side cursor, a page at a time."""
+        with self.connection() as conn:
+            # Server-side cursors live in a transaction, which autocommit connections open explicitly
+            with conn.transaction(), conn.cursor(name="stream_rows") as cursor:
+                cursor.execute(query)
+                columns = [(column.name, None) for column in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(STREAM_PAGE_ROWS)
+                    if not rows:
+                        break
+                    on_rows(columns, rows)
+
+    def close(self):
+        with self._pool_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+class PrestoExecutor(Executor):
+    """Runs queries through Presto with one client whose pooled connections all queries share."""
+
+    name = "presto"
+    chart_title = "Presto Query Execution Times"
+
+    def __init__(self):
+        self.host = os.getenv("PRESTO_HOST")
+        self.port = os.getenv("PRESTO_PORT")
+        self.user = os.getenv("PRESTO_USER")
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = BlockingPrestoClient(self.host, self.port, self.user)
+        return self._client
+
+    def run(self, query):
+        """Execute a query, drain its results, and return its wall time, execution time, queueing time and optimizers."""
+        return self.client().execute(query)
+
+    def stream_rows(self, query, on_rows):
+        """Fetch the results of a query, following every result page."""
+        self.client().execute(query, lambda columns, rows: on_rows(
+            [(column["name"], column["type"]) for column in columns], rows))
+
+    def active_workers(self):
+        try:
+            return self.client().active_workers()
+        except Exception as e:
+            print(f"Could not read the active Presto workers: {e}")
+            return None
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+# Engines a scenario file can name, new executors only need to be added here
+EXECUTORS = {
+    PostgresExecutor.name: PostgresExecutor,
+    PrestoExecutor.name: PrestoExecutor,
+}
+
+def make_executor(engine, settings=None):
+    """Create the executor of an engine named in a scenario file, with the scenario's session settings."""
+    if engine not in EXECUTORS:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(sorted(EXECUTORS))}")
+    if not settings:
+        return EXECUTORS[engine]()
+    if not EXECUTORS[engine].supports_settings:
+        raise ValueError(f"The {engine} engine does not take session settings")
+    return EXECUTORS[engine](settings)
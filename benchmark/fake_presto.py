@@ -0,0 +1,246 @@
+import re
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Longest time a nextUri request is held while a query runs, like the coordinator's default
+MAX_WAIT = 1.0
+TABLE_PATTERN = re.compile(r"\b(\w+)\.(\w+)\.(\w+)\b")
+DIRECTIVE_PATTERN = re.compile(r"--\s*fake-(rows|seconds|page-size|fail|serial)\s*:\s*(\S+)", re.IGNORECASE)
+# Fraction of a query's run time that does not shrink with more workers, as in Amdahl's law
+DEFAULT_SERIAL_FRACTION = 0.2
+
+def format_duration(seconds):
+    """Format seconds the way Presto formats durations in queryStats."""
+    if seconds < 1:
+        return f"{seconds * 1000:.2f}ms"
+    if seconds < 60:
+        return f"{seconds:.2f}s"
+    return f"{seconds / 60:.2f}m"
+
+class FakeQuery:
+    """A query of the fake coordinator, which runs for a fixed time and then returns generated rows.
+
+    Comments like "-- fake-rows: 100", "-- fake-seconds: 0.5", "-- fake-page-size: 10" or
+    "-- fake-fail: message" in the SQL override the server defaults for that query. The time is
+    that of one worker; with more workers only the part outside "-- fake-serial: 0.2" shrinks.
+    """
+
+    def __init__(self, sql, rows, seconds, page_size, workers=1):
+        self.id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:5]}"
+        self.sql = sql
+        self.rows = rows
+        self.seconds = seconds
+        self.page_size = page_size
+        self.error = None
+        serial = DEFAULT_SERIAL_FRACTION
+        for name, value in DIRECTIVE_PATTERN.findall(sql):
+            name = name.lower()
+            if name == "rows":
+                self.rows = int(value)
+            elif name == "seconds":
+                self.seconds = float(value)
+            elif name == "page-size":
+                self.page_size = int(value)
+            elif name == "fail":
+                self.error = value
+            elif name == "serial":
+                serial = float(value)
+        self.seconds *= serial + (1 - serial) / max(workers, 1)
+        self.created = time.perf_counter()
+        self.finished = None
+
+    @property
+    def done_at(self):
+        return self.created + self.seconds
+
+    def plan_and_operators(self, elapsed):
+        """Build a plan with a table scan per catalog.schema.table the SQL names, and its operator summaries.
+
+        The run time is split evenly among the scans, each reading the number of result rows.
+        """
+        tables = sorted(set(TABLE_PATTERN.findall(self.sql)))
+        scans = []
+        operators = []
+        share = elapsed / (len(tables) + 1)
+        for index, (catalog, schema, table) in enumerate(tables):
+            node_id = str(index + 1)
+            scans.append({
+                "@type": "tablescan",
+                "id": node_id,
+                "table": {"connectorId": catalog, "connectorHandle": {"schemaTableName": {"schema": schema, "table": table}}},
+            })
+            operators.append({
+                "stageId": 1, "planNodeId": node_id, "operatorType": "ScanFilterAndProjectOperator",
+                "rawInputPositions": self.rows, "rawInputDataSize": f"{self.rows * 100}B",
+                "outputPositions": self.rows, "outputDataSize": f"{self.rows * 100}B",
+                "getOutputWall": format_duration(share), "getOutputCpu": format_duration(share / 2),
+            })
+        operators.append({
+            "stageId": 0, "planNodeId": "0", "operatorType": "ExchangeOperator",
+            "rawInputPositions": self.rows * len(tables), "rawInputDataSize": f"{self.rows * len(tables) * 100}B",
+            "outputPositions": self.rows, "outputDataSize": f"{self.rows * 100}B",
+            "getOutputWall": format_duration(share), "getOutputCpu": format_duration(share / 10),
+        })
+        output_stage = {
+            "stageId": f"{self.id}.0",
+            "plan": {"id": "0", "root": {"@type": "exchange", "id": "0"}},
+            "subStages": [{"stageId": f"{self.id}.1", "plan": {"id": "1", "root": {"@type": "exchange", "id": "s", "sources": scans}}}],
+        }
+        return output_stage, operators
+
+    def page(self, token):
+        """Return the rows of result page token, starting at 1."""
+        start = (token - 1) * self.page_size
+        return [[index, f"row-{index}"] for index in range(start, min(start + self.page_size, self.rows))]
+
+class FakePrestoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send each response in one segment, so client timings are not skewed by delayed acknowledgements
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, body, status=200):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def do_POST(self):
+        if self.path != "/v1/statement":
+            self._send_json({"message": "Not found"}, 404)
+            return
+        sql = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        query = FakeQuery(sql, self.server.rows, self.server.seconds, self.server.page_size, self.server.workers)
+        with self.server.lock:
+            self.server.queries[query.id] = query
+        self._send_json({
+            "id": query.id,
+            "infoUri": f"{self._base_url()}/v1/query/{query.id}",
+            "nextUri": f"{self._base_url()}/v1/statement/queued/{query.id}/0",
+            "stats": {"state": "QUEUED"},
+        })
+
+    def do_PUT(self):
+        # PUT /v1/fake/workers/<n> changes the number of workers, standing in for scaling the containers
+        parts = self.path.strip("/").split("/")
+        if parts[:3] != ["v1", "fake", "workers"] or len(parts) != 4 or not parts[3].isdigit():
+            self._send_json({"message": "Not found"}, 404)
+            return
+        self.server.workers = int(parts[3])
+        self._send_json({"workers": self.server.workers})
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts == ["v1", "node"]:
+            self._nodes()
+            return
+        with self.server.lock:
+            query = self.server.queries.get(parts[-2] if parts[:3] == ["v1", "statement", "queued"] else parts[-1])
+        if query is None:
+            self._send_json({"message": "Query not found"}, 404)
+        elif parts[:3] == ["v1", "statement", "queued"]:
+            self._statement_page(query, int(parts[-1]))
+        elif parts[:2] == ["v1", "query"]:
+            self._query_info(query)
+        else:
+            self._send_json({"message": "Not found"}, 404)
+
+    def _nodes(self):
+        """List the workers like the coordinator's failure detector, which does not list the coordinator."""
+        self._send_json([
+            {"uri": f"http://worker-{index}:8080", "recentRequests": 60.0, "recentFailures": 0.0,
+             "recentSuccesses": 60.0, "lastRequestTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+             "recentFailureRatio": 0.0, "age": "1.00m"}
+            for index in range(self.server.workers)
+        ])
+
+    def _statement_page(self, query, token):
+        remaining = query.done_at - time.perf_counter()
+        if remaining > 0:
+            # Hold the request like the coordinator does, then report the query as still running
+            time.sleep(min(remaining, MAX_WAIT))
+            if query.done_at > time.perf_counter():
+                self._send_json({
+                    "id": query.id,
+                    "nextUri": f"{self._base_url()}/v1/statement/queued/{query.id}/{token}",
+                    "stats": {"state": "RUNNING"},
+                })
+                return
+        if query.finished is None:
+            query.finished = time.perf_counter()
+        body = {"id": query.id, "stats": {"state": "FAILED" if query.error else "FINISHED"}}
+        if query.error:
+            body["error"] = {"message": query.error}
+            self._send_json(body)
+            return
+        # Like the coordinator, pages can still follow once the state reads FINISHED
+        token = max(token, 1)
+        body["columns"] = [{"name": "id", "type": "bigint"}, {"name": "value", "type": "varchar"}]
+        body["data"] = query.page(token)
+        if token * query.page_size < query.rows:
+            body["nextUri"] = f"{self._base_url()}/v1/statement/queued/{query.id}/{token + 1}"
+        self._send_json(body)
+
+    def _query_info(self, query):
+        finished = query.finished or time.perf_counter()
+        output_stage, operators = query.plan_and_operators(finished - query.created)
+        self._send_json({
+            "queryId": query.id,
+            "query": query.sql,
+            "state": "FINISHED" if query.finished and not query.error else "FAILED" if query.error else "RUNNING",
+            "queryStats": {
+                "queuedTime": format_duration(0.0),
+                "executionTime": format_duration(finished - query.created),
+                "elapsedTime": format_duration(finished - query.created),
+                "operatorSummaries": operators,
+            },
+            "outputStage": output_stage,
+            "optimizerInformation": [{"optimizerName": "FakeOptimizer", "optimizerTriggered": True}],
+        })
+
+def start_fake_presto(host="127.0.0.1", port=0, rows=10, seconds=0.0, page_size=1000, workers=1, verbose=False):
+    """Start a fake coordinator in a background thread and return the server, whose server_port is bound."""
+    server = ThreadingHTTPServer((host, port), FakePrestoHandler)
+    server.daemon_threads = True
+    server.queries = {}
+    server.lock = threading.Lock()
+    server.rows = rows
+    server.seconds = seconds
+    server.page_size = page_size
+    server.workers = workers
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, name="fake-presto", daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Presto coordinator to test the benchmark clients offline.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rows", type=int, default=10, help="rows every query returns")
+    parser.add_argument("--seconds", type=float, default=0.0, help="time every query runs before returning rows")
+    parser.add_argument("--page-size", type=int, default=1000, help="rows per result page")
+    parser.add_argument("--workers", type=int, default=1, help="workers listed by /v1/node, which speed up the queries")
+    args = parser.parse_args()
+
+    server = start_fake_presto(args.host, args.port, args.rows, args.seconds, args.page_size, args.workers, verbose=True)
+    print(f"Fake Presto listening on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import os
+import re
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+from executors import make_executor
+from plans import summarize_operators
+from result_store import ResultStore
+from telemetry import DEFAULT_CONTAINERS, MODES, bound_sources, make_telemetry
+from run_stats import load_statistics, measure_query, plot_latency_chart, summarize_metric
+from throughput import run_throughput_test, save_throughput_report
+
+load_dotenv()
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS_DIR = os.path.join(BENCHMARK_DIR, 'scenarios')
+QUERIES_LOCAL_PATH = os.path.join(BENCHMARK_DIR, 'queries')  # Query templates shared by every scenario
+RESULTS_LOCAL_PATH = os.getenv("RESULTS_LOCAL_PATH")
+
+# Table references in the query templates, like {{store_sales}}
+TABLE_PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+def load_scenario(scenario):
+    """Load a scenario by name from benchmark/scenarios, or from the path of a scenario file."""
+    path = scenario if scenario.endswith('.json') else os.path.join(SCENARIOS_DIR, f"{scenario}.json")
+    with open(path, 'r') as scenario_file:
+        definition = json.load(scenario_file)
+    definition.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    for store in definition["tables"]:
+        if store not in definition["catalogs"]:
+            raise ValueError(f"Scenario {definition['name']} places tables in {store} but has no catalog for it")
+    return definition
+
+def table_locations(scenario):
+    """Map every table of a scenario to the store it is placed in, with '*' for a store holding every table."""
+    locations = {}
+    for store, tables in scenario["tables"].items():
+        for table_name in ([tables] if tables == "*" else tables):
+            if table_name in locations:
+                raise ValueError(f"Scenario {scenario['name']} places {table_name} in both {locations[table_name]} and {store}")
+            locations[table_name] = store
+    return locations
+
+def qualify_table(scenario, locations, table_name):
+    """Return the name of a table qualified with the catalog and schema of the store it is placed in.
+
+    A scenario's optional "tableNames" maps tables of a store to the name they have there, like
+    the date-partitioned copies of load/cassandra_modeler.py.
+    """
+    store = locations.get(table_name, locations.get("*"))
+    if store is None:
+        raise ValueError(f"Table {table_name} is not placed in any store by scenario {scenario['name']}")
+    table_name = scenario.get("tableNames", {}).get(store, {}).get(table_name, table_name)
+    catalog = scenario["catalogs"][store]
+    return f"{catalog}.{table_name}" if catalog else table_name
+
+def render_query(template, scenario, locations=None):
+    """Render a query template for a scenario by qualifying each table placeholder."""
+    locations = locations or table_locations(scenario)
+    return TABLE_PLACEHOLDER_PATTERN.sub(lambda match: qualify_table(scenario, locations, match.group(1)), template)
+
+def load_query_templates(names=None):
+    """Read the query templates, keyed by query name and limited to names when given."""
+    templates = {}
+    for sql_file in sorted(os.listdir(QUERIES_LOCAL_PATH)):
+        name = os.path.splitext(sql_file)[0]
+        if sql_file.endswith('.sql') and (not names or name in names):
+            with open(os.path.join(QUERIES_LOCAL_PATH, sql_file), 'r') as query_file:
+                templates[name] = query_file.read()
+    return templates
+
+def render_queries(scenario, names=None):
+    """Render the query set of a scenario, keyed by query name."""
+    locations = table_locations(scenario)
+    return {name: render_query(template, scenario, locations) for name, template in load_query_templates(names).items()}
+
+def results_path(scenario):
+    return os.path.join(RESULTS_LOCAL_PATH, scenario["name"])
+
+def execute_query(executor, name, query, output_file, warmup=1, repetitions=5, telemetry=None):
+    """Execute a query after warmup runs, track its repeated runs, and save their distribution and metadata.
+
+    With telemetry, the resources of the sampled containers are recorded while the query runs,
+    with every warmup and measured run as a phase. Returns the saved result, or None when every
+    run failed.
+    """
+    try:
+        if telemetry is None:
+            runs = measure_query(executor.run, query, warmup, repetitions)
+        else:
+            with telemetry.recording() as recording:
+                runs = measure_query(recording.phased(executor.run, warmup), query, warmup, repetitions)
+        successful_runs = [run for run in runs if "error" not in run]
+        if not successful_runs:
+            raise Exception(f"All {repetitions} runs failed: {runs[-1]['error']}")
+
+        statistics = {"executionTime": summarize_metric(runs, "executionTime")}
+        result = {"executionTime": statistics["executionTime"].get("median")}
+        if "wallTime" in successful_runs[-1]:
+            statistics["wallTime"] = summarize_metric(runs, "wallTime")
+            result["wallTime"] = statistics["wallTime"].get("median")
+        if "rowCount" in successful_runs[-1]:
+            result["rowCount"] = successful_runs[-1]["rowCount"]
+        result["warmup"] = warmup
+        result["executionTimes"] = [run.get("executionTime") for run in successful_runs]
+        if "wallTime" in statistics:
+            result["wallTimes"] = [run.get("wallTime") for run in successful_runs]
+        result["statistics"] = statistics
+        result["optimizerPlan"] = successful_runs[-1].get("optimizerPlan")
+        if "operators" in successful_runs[-1]:
+            result["operators"] = successful_runs[-1]["operators"]
+            result["operatorSummary"] = summarize_operators(result["operators"])
+        if telemetry is not None:
+            result["telemetry"] = recording.report()
+
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as output:
+            json.dump(result, output, indent=4)
+
+        execution_stats = statistics["executionTime"]
+        if execution_stats["flaky"] or execution_stats["noisy"]:
+            print(f"Warning: {name} is {'flaky' if execution_stats['flaky'] else 'noisy'}")
+        if result.get("operatorSummary", {}).get("bottleneck"):
+            print(f"Slowest connector of {name}: {result['operatorSummary']['bottleneck']}")
+        if telemetry is not None and bound_sources(result["telemetry"]):
+            print(f"Resources {name} was bound by: {', '.join(bound_sources(result['telemetry']))}")
+        print(f"Query metadata saved to {output_file}")
+        return result
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return None
+
+def run_benchmark(scenario, queries, executor, warmup=1, repetitions=5, workers=None, label=None, output_path=None,
+                  telemetry=None):
+    """Run every query of a scenario, record the run in the result store, and return its id and query statistics.
+
+    When workers is not given, the executor is asked for the number of active workers. The result
+    files are written to output_path, by default the scenario's results directory, with the
+    resources sampled during each query when telemetry is given.
+    """
+    output_path = output_path or results_path(scenario)
+    if workers is None:
+        workers = executor.active_workers()
+    store = ResultStore()
+    run_id = store.start_run(scenario["name"], scenario["engine"], workers, label)
+    query_stats = {}
+    try:
+        for name, query in queries.items():
+            print(f"Executing {name}")
+            output_file_path = os.path.join(output_path, f"{name}.json")
+            result = execute_query(executor, name, query, output_file_path, warmup, repetitions, telemetry)
+            if result is not None:
+                store.add_query_result(run_id, name, result)
+                if result["statistics"]["executionTime"].get("runs"):
+                    query_stats[name] = result["statistics"]["executionTime"]
+    finally:
+        store.close()
+    print(f"Run {run_id} recorded in the result store" + (f" with {workers} workers" if workers is not None else ""))
+    return run_id, query_stats
+
+def generate_chart(scenario, executor, query_stats=None):
+    """Saves the query latency distributions of a run as a bar chart with error bars.
+
+    Without query_stats, the statistics are read from the JSON result files.
+    """
+    path = results_path(scenario)
+    if query_stats is None:
+        query_stats = load_statistics(path)
+
+    if query_stats:
+        chart_path = os.path.join(path, "query_latency_chart.png")
+        plot_latency_chart(query_stats, chart_path, f"{executor.chart_title} ({scenario['name']})", executor.chart_color)
+        flagged = [name for name, stats in query_stats.items() if stats["flaky"] or stats["noisy"]]
+        if flagged:
+            print(f"Flaky or noisy queries: {', '.join(flagged)}")
+    else:
+        print("No valid execution times found to plot.")
+
+def save_rendered_queries(queries, output_dir):
+    """Write the rendered SQL of a scenario, to inspect it or run it by hand."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, query in queries.items():
+        with open(os.path.join(output_dir, f"{name}.sql"), 'w') as query_file:
+            query_file.write(query)
+    print(f"{len(queries)} queries rendered to {output_dir}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the TPC-DS query set against a benchmark scenario.")
+    parser.add_argument("scenario", help="scenario name in benchmark/scenarios (like scenario-1) or path of a scenario file")
+    parser.add_argument("--queries", nargs="+", help="query names to run (default: all)")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs of every query before the measured ones")
+    parser.add_argument("--repetitions", type=int, default=5, help="measured runs of every query")
+    parser.add_argument("--streams", type=int, default=1,
+                        help="run this many concurrent query streams in throughput mode instead of one query at a time")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the per-stream query order in throughput mode")
+    parser.add_argument("--workers", type=int,
+                        help="number of Presto workers of this run, recorded in the result store (default: read from Presto)")
+    parser.add_argument("--label", help="free-form label of this run in the result store")
+    parser.add_argument("--rollups", action="store_true",
+                        help="run the queries rewritten to the rollups built by rollups.py where they apply")
+    parser.add_argument("--telemetry", choices=sorted(MODES),
+                        help="sample the CPU, memory and I/O of the containers during every query, reading every "
+                             "counter (full) or only CPU and memory at a longer interval (light)")
+    parser.add_argument("--containers", nargs="+", default=list(DEFAULT_CONTAINERS),
+                        help="parts of the names of the containers sampled with --telemetry")
+    parser.add_argument("--render-only", metavar="DIR",
+                        help="write the rendered queries of the scenario to DIR instead of running them")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scenario = load_scenario(args.scenario)
+    queries = render_queries(scenario, args.queries)
+    if args.rollups:
+        from rollups import render_rewritten_queries
+        queries.update(render_rewritten_queries(scenario, args.queries)[1])
+
+    if args.render_only:
+        save_rendered_queries(queries, args.render_only)
+        return
+
+    if args.telemetry and args.streams > 1:
+        raise ValueError("--telemetry samples one query at a time and cannot be combined with --streams")
+    telemetry = make_telemetry(args.telemetry, args.containers) if args.telemetry else None
+
+    executor = make_executor(scenario["engine"], scenario.get("settings"))
+    try:
+        if args.streams > 1:
+            report = run_throughput_test(queries, executor.run, args.streams, args.seed)
+            save_throughput_report(report, results_path(scenario))
+            return
+
+        _, query_stats = run_benchmark(scenario, queries, executor, args.warmup, args.repetitions, args.workers, args.label,
+                                       telemetry=telemetry)
+    finally:
+        executor.close()
+    generate_chart(scenario, executor, query_stats)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
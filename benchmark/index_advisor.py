@@ -0,0 +1,266 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import psycopg
+from dotenv import load_dotenv
+from executors import PostgresExecutor, make_executor
+from harness import TABLE_PLACEHOLDER_PATTERN, load_query_templates, load_scenario, render_queries, results_path, run_benchmark
+from result_store import ResultStore, compare_runs
+
+load_dotenv()
+
+POSTGRES_DDL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "migration", "postgres-ddl.sql")
+
+# Indexes and statistics objects created by the advisor, so --drop removes only those
+INDEX_PREFIX = "adv_ix_"
+STATISTICS_PREFIX = "adv_st_"
+# Longest identifier PostgreSQL keeps
+MAX_IDENTIFIER_LENGTH = 63
+# Columns CREATE STATISTICS accepts
+MAX_STATISTICS_COLUMNS = 8
+# Columns of a composite index on a query's filter columns
+MAX_INDEX_COLUMNS = 3
+DEFAULT_MIN_QUERIES = 2
+DEFAULT_MAINTENANCE_WORK_MEM = "1GB"
+DEFAULT_PARALLEL_MAINTENANCE_WORKERS = 4
+
+TABLE_DDL_PATTERN = re.compile(r"create\s+table\s+(?:\w+\.)?(\w+)\s*\((.*?)\);", re.IGNORECASE | re.DOTALL)
+PRIMARY_KEY_PATTERN = re.compile(r"primary\s+key\s*\(([^)]*)\)", re.IGNORECASE)
+COLUMN_DDL_PATTERN = re.compile(r"^\s*(\w+)\s+(\w+(?:\s*\([\d,\s]*\))?)", re.MULTILINE)
+JOIN_PATTERN = re.compile(r"(?:\w+\.)?(\w+)\s*=\s*(?:\w+\.)?(\w+)")
+FILTER_PATTERN = re.compile(r"(?:\w+\.)?(\w+)\s*(?:<>|!=|<=|>=|=|<|>|\bbetween\b|\bnot\s+in\b|\bin\b|\blike\b)\s*[('\d-]",
+                            re.IGNORECASE)
+
+def load_postgres_schema(ddl_file=POSTGRES_DDL_FILE):
+    """Read the columns, their types and the primary key of every table in the PostgreSQL DDL."""
+    with open(ddl_file, 'r') as file:
+        ddl = file.read()
+    tables = {}
+    for table_name, body in TABLE_DDL_PATTERN.findall(ddl):
+        primary_key = PRIMARY_KEY_PATTERN.search(body)
+        types = {column: column_type.lower() for column, column_type in COLUMN_DDL_PATTERN.findall(body)
+                 if column.lower() != "primary"}
+        tables[table_name] = {
+            "columns": list(types),
+            "types": types,
+            "primaryKey": [column.strip() for column in primary_key.group(1).split(",")] if primary_key else [],
+        }
+    return tables
+
+def query_predicates(template, column_tables):
+    """Find the join and filter columns of a query template, as (table, column) pairs.
+
+    Joins are equalities between columns of two tables, and filters compare a column with a
+    literal, a list or a subquery. TPC-DS column names carry their table's prefix, so a column
+    name alone tells its table.
+    """
+    sql = re.sub(r"--[^\n]*", "", TABLE_PLACEHOLDER_PATTERN.sub(lambda match: match.group(1), template))
+    joins = set()
+    for left, right in JOIN_PATTERN.findall(sql):
+        if left in column_tables and right in column_tables and column_tables[left] != column_tables[right]:
+            joins.add((column_tables[left], left))
+            joins.add((column_tables[right], right))
+    filters = {(column_tables[column], column) for column in FILTER_PATTERN.findall(sql) if column in column_tables}
+    return joins, filters - joins
+
+def object_name(prefix, table_name, columns):
+    """Name an index or statistics object after its table and columns, hashed when it gets too long."""
+    name = f"{prefix}{table_name}_{'_'.join(columns)}"
+    if len(name) <= MAX_IDENTIFIER_LENGTH:
+        return name
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{name[:MAX_IDENTIFIER_LENGTH - len(digest) - 1]}_{digest}"
+
+def propose(templates, schema, tables, min_queries=DEFAULT_MIN_QUERIES):
+    """Propose indexes and extended statistics on the given tables for the query templates.
+
+    Join columns that are not the leading primary key column get a single-column index, like the
+    foreign keys of the fact tables. Filter columns get a single-column index, or a composite
+    index when a query filters a table on several columns, which then also get extended
+    statistics so the planner knows they are correlated. Only what at least min_queries queries
+    use is proposed, and single-column indexes already covered by a composite one are left out.
+    """
+    column_tables = {column: table_name for table_name, table in schema.items() for column in table["columns"]}
+    index_queries = defaultdict(set)
+    statistics_queries = defaultdict(set)
+    filter_frequency = Counter()
+    query_filters = {}
+    for name, template in templates.items():
+        joins, filters = query_predicates(template, column_tables)
+        for table_name, column in joins:
+            if table_name in tables and column not in schema[table_name]["primaryKey"][:1]:
+                index_queries[(table_name, (column,))].add(name)
+        by_table = defaultdict(set)
+        for table_name, column in filters:
+            if table_name in tables and column not in schema[table_name]["primaryKey"][:1]:
+                by_table[table_name].add(column)
+                filter_frequency[(table_name, column)] += 1
+        query_filters[name] = by_table
+
+    for name, by_table in query_filters.items():
+        for table_name, columns in by_table.items():
+            ordered = sorted(columns, key=lambda column: (-filter_frequency[(table_name, column)], column))
+            index_queries[(table_name, tuple(ordered[:MAX_INDEX_COLUMNS]))].add(name)
+            if len(ordered) > 1:
+                statistics_queries[(table_name, tuple(sorted(ordered[:MAX_STATISTICS_COLUMNS])))].add(name)
+
+    indexes = {key: queries for key, queries in index_queries.items() if len(queries) >= min_queries}
+    for table_name, columns in list(indexes):
+        if len(columns) == 1 and any(other_table == table_name and len(other) > 1 and other[0] == columns[0]
+                                     for other_table, other in indexes):
+            del indexes[(table_name, columns)]
+    return {
+        "indexes": [
+            {"name": object_name(INDEX_PREFIX, table_name, columns), "table": table_name, "columns": list(columns),
+             "queries": sorted(queries)}
+            for (table_name, columns), queries in sorted(indexes.items())
+        ],
+        "statistics": [
+            {"name": object_name(STATISTICS_PREFIX, table_name, columns), "table": table_name, "columns": list(columns),
+             "queries": sorted(queries)}
+            for (table_name, columns), queries in sorted(statistics_queries.items()) if len(queries) >= min_queries
+        ],
+    }
+
+def postgres_tables(scenario, schema):
+    """Return the tables a scenario places in PostgreSQL."""
+    tables = scenario["tables"].get("postgres", [])
+    return sorted(schema) if tables == "*" else [table_name for table_name in tables if table_name in schema]
+
+def build_table(conninfo, table_name, indexes, statistics, maintenance_work_mem, parallel_workers):
+    """Build the indexes of one table concurrently, create its extended statistics, and analyze it.
+
+    Builds of one table run one after another, since concurrent builds on a table wait for each other.
+    """
+    with psycopg.connect(**conninfo, autocommit=True) as conn:
+        conn.execute(f"SET maintenance_work_mem = '{maintenance_work_mem}'")
+        conn.execute(f"SET max_parallel_maintenance_workers = {int(parallel_workers)}")
+        for index in indexes:
+            print(f"Creating index {index['name']} on {table_name} ({', '.join(index['columns'])})")
+            conn.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index['name']} "
+                         f"ON public.{table_name} ({', '.join(index['columns'])})")
+        for statistic in statistics:
+            print(f"Creating statistics {statistic['name']} on {table_name} ({', '.join(statistic['columns'])})")
+            conn.execute(f"CREATE STATISTICS IF NOT EXISTS {statistic['name']} (ndistinct, dependencies) "
+                         f"ON {', '.join(statistic['columns'])} FROM public.{table_name}")
+        conn.execute(f"ANALYZE public.{table_name}")
+    return table_name
+
+def apply_proposal(conninfo, proposal, tables, workers, maintenance_work_mem, parallel_workers):
+    """Build the proposed indexes and statistics with one table per worker, then analyze every table."""
+    by_table = {table_name: ([], []) for table_name in tables}
+    for index in proposal["indexes"]:
+        by_table[index["table"]][0].append(index)
+    for statistic in proposal["statistics"]:
+        by_table[statistic["table"]][1].append(statistic)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_table, conninfo, table_name, indexes, statistics, maintenance_work_mem, parallel_workers)
+                   for table_name, (indexes, statistics) in by_table.items()]
+        for future in as_completed(futures):
+            print(f"Indexed and analyzed {future.result()}")
+
+def analyze_tables(conninfo, tables):
+    with psycopg.connect(**conninfo, autocommit=True) as conn:
+        for table_name in tables:
+            conn.execute(f"ANALYZE public.{table_name}")
+    print(f"Analyzed {len(tables)} tables")
+
+def drop_advised(conninfo):
+    """Drop every index and statistics object the advisor created."""
+    with psycopg.connect(**conninfo, autocommit=True) as conn:
+        indexes = [row[0] for row in conn.execute(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND starts_with(indexname, %s)", (INDEX_PREFIX,))]
+        statistics = [row[0] for row in conn.execute(
+            "SELECT stxname FROM pg_statistic_ext WHERE starts_with(stxname, %s)", (STATISTICS_PREFIX,))]
+        for name in indexes:
+            conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{name}")
+        for name in statistics:
+            conn.execute(f"DROP STATISTICS IF EXISTS public.{name}")
+    print(f"Dropped {len(indexes)} indexes and {len(statistics)} statistics objects")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Propose and build PostgreSQL indexes and extended statistics for the query set, "
+                    "and measure every query before and after.")
+    parser.add_argument("scenario", nargs="?", default="scenario-0",
+                        help="scenario whose PostgreSQL tables to index and whose queries to measure")
+    parser.add_argument("--queries", nargs="+", help="query names to measure (default: all)")
+    parser.add_argument("--min-queries", type=int, default=DEFAULT_MIN_QUERIES,
+                        help="queries that must use an index or statistics object for it to be proposed")
+    parser.add_argument("--workers", type=int, default=4, help="tables indexed at the same time")
+    parser.add_argument("--parallel-workers", type=int, default=DEFAULT_PARALLEL_MAINTENANCE_WORKERS,
+                        help="max_parallel_maintenance_workers of every index build")
+    parser.add_argument("--maintenance-work-mem", default=DEFAULT_MAINTENANCE_WORK_MEM,
+                        help="maintenance_work_mem of every index build")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs of every query before the measured ones")
+    parser.add_argument("--repetitions", type=int, default=5, help="measured runs of every query")
+    parser.add_argument("--dry-run", action="store_true", help="only print the proposal")
+    parser.add_argument("--skip-before", action="store_true", help="do not measure the queries before building")
+    parser.add_argument("--drop", action="store_true", help="drop the indexes and statistics the advisor created and exit")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scenario = load_scenario(args.scenario)
+    conninfo = PostgresExecutor().conninfo
+    if args.drop:
+        drop_advised(conninfo)
+        return
+
+    schema = load_postgres_schema()
+    tables = postgres_tables(scenario, schema)
+    if not tables:
+        raise ValueError(f"Scenario {scenario['name']} places no tables in PostgreSQL")
+    proposal = propose(load_query_templates(), schema, tables, args.min_queries)
+    for index in proposal["indexes"]:
+        print(f"Index {index['table']} ({', '.join(index['columns'])}) for {len(index['queries'])} queries")
+    for statistic in proposal["statistics"]:
+        print(f"Statistics {statistic['table']} ({', '.join(statistic['columns'])}) for {len(statistic['queries'])} queries")
+    if args.dry_run:
+        return
+
+    queries = render_queries(scenario, args.queries)
+    path = os.path.join(results_path(scenario), "indexes")
+    executor = make_executor(scenario["engine"], scenario.get("settings"))
+    try:
+        before_run = None
+        if not args.skip_before:
+            # Objects left by an earlier run would already be there before, so they are dropped first.
+            # Plain statistics are part of any sane load, so only the advised objects make the difference
+            drop_advised(conninfo)
+            analyze_tables(conninfo, tables)
+            before_run, _ = run_benchmark(scenario, queries, executor, args.warmup, args.repetitions,
+                                          label="indexes: before", output_path=os.path.join(path, "before"))
+        apply_proposal(conninfo, proposal, tables, args.workers, args.maintenance_work_mem, args.parallel_workers)
+        after_run, _ = run_benchmark(scenario, queries, executor, args.warmup, args.repetitions,
+                                     label="indexes: after", output_path=os.path.join(path, "after"))
+    finally:
+        executor.close()
+
+    report = {"proposal": proposal, "beforeRun": before_run, "afterRun": after_run, "queries": {}}
+    if before_run is not None:
+        store = ResultStore()
+        try:
+            report["queries"] = compare_runs(store.query_times(before_run), store.query_times(after_run))
+        finally:
+            store.close()
+        for query, outcome in report["queries"].items():
+            print(f"  {outcome['verdict']:<11} {query}: {outcome['baseMedian']:.3f}s -> {outcome['newMedian']:.3f}s "
+                  f"({outcome['change']:+.1%})")
+    os.makedirs(path, exist_ok=True)
+    output_file = os.path.join(path, "index_advice.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=4)
+    print(f"Index advice saved to {output_file}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError, psycopg.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import matplotlib.pyplot as plt
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from run_stats import measure_query, summarize_metric
+
+load_dotenv()
+
+MONGO_URI = "mongodb://localhost:27017"
+DB_NAME = os.getenv("MONGO_DB")
+RESULTS_LOCAL_PATH = os.getenv("RESULTS_LOCAL_PATH")
+
+# Layouts written by load/mongo-loader.py --layout, and the collection suffix of each
+LAYOUT_SUFFIXES = {"flat": "", "embedded": "_embedded", "bucketed": "_bucketed"}
+# Returns tables with their date key, item key, quantity and reason key, the columns the access patterns read
+RETURNS_TABLES = {
+    "store_returns": ("sr_returned_date_sk", "sr_item_sk", "sr_return_quantity", "sr_reason_sk"),
+    "catalog_returns": ("cr_returned_date_sk", "cr_item_sk", "cr_return_quantity", "cr_reason_sk"),
+    "web_returns": ("wr_returned_date_sk", "wr_item_sk", "wr_return_quantity", "wr_reason_sk"),
+}
+PATTERNS = ("date range", "item lookup", "daily totals", "reason totals")
+# Dimension the embedded layout copies into the returns, which the other layouts join with $lookup
+REASON_COLLECTION = "reason"
+REASON_KEY = "r_reason_sk"
+REASON_FIELD = "r_reason_desc"
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_ITEMS = 20
+
+def pattern_pipeline(pattern, layout, keys, date_range, items):
+    """Build the aggregation pipeline of an access pattern for a layout, ending with the number of matched rows.
+
+    The patterns are those of the queries on the returns tables: a range of the date key, a set
+    of items, totals per date, and totals per reason description over the date range. The
+    embedded layout reads the description from its documents, the others look it up in the
+    reason collection. Bucketed documents are unwound to their rows after the buckets are
+    filtered, so every layout returns the same count.
+    """
+    date_key, item_key, quantity, reason_key = keys
+    bucketed = layout == "bucketed"
+    row = "rows." if bucketed else ""
+    pipeline = []
+    if pattern == "date range":
+        pipeline.append({"$match": {date_key: {"$gte": date_range[0], "$lte": date_range[1]}}})
+        return pipeline + [{"$group": {"_id": None, "rows": {"$sum": "$count" if bucketed else 1}}}]
+    if pattern == "item lookup":
+        pipeline.append({"$match": {f"{row}{item_key}": {"$in": items}}})
+        if bucketed:
+            pipeline += [{"$unwind": "$rows"}, {"$match": {f"rows.{item_key}": {"$in": items}}}]
+        return pipeline + [{"$group": {"_id": None, "rows": {"$sum": 1}}}]
+    if pattern == "reason totals":
+        pipeline.append({"$match": {date_key: {"$gte": date_range[0], "$lte": date_range[1]}}})
+        if bucketed:
+            pipeline.append({"$unwind": "$rows"})
+        description = f"${REASON_FIELD}"
+        if layout != "embedded":
+            pipeline += [
+                {"$lookup": {"from": REASON_COLLECTION, "localField": f"{row}{reason_key}",
+                             "foreignField": REASON_KEY, "as": "reason"}},
+                {"$unwind": {"path": "$reason", "preserveNullAndEmptyArrays": True}},
+            ]
+            description = f"$reason.{REASON_FIELD}"
+        pipeline.append({"$group": {"_id": description, "rows": {"$sum": 1}}})
+        return pipeline + [{"$group": {"_id": None, "rows": {"$sum": "$rows"}}}]
+    if bucketed:
+        pipeline.append({"$unwind": "$rows"})
+    pipeline.append({"$group": {"_id": f"${date_key}", "quantity": {"$sum": f"${row}{quantity}"}, "rows": {"$sum": 1}}})
+    return pipeline + [{"$group": {"_id": None, "rows": {"$sum": "$rows"}}}]
+
+def run_pipeline(collection, pipeline):
+    """Run a pipeline and return its time in seconds and the number of rows it matched."""
+    started = time.perf_counter()
+    result = list(collection.aggregate(pipeline, allowDiskUse=True))
+    elapsed = time.perf_counter() - started
+    return {"executionTime": elapsed, "rowCount": result[0]["rows"] if result else 0}
+
+def pattern_parameters(collection, keys, window_days, item_count, seed):
+    """Pick a date range in the middle of the flat collection's dates and random items within its item keys."""
+    date_key, item_key = keys[:2]
+    first = collection.find_one({date_key: {"$ne": None}}, sort=[(date_key, 1)])
+    last = collection.find_one({date_key: {"$ne": None}}, sort=[(date_key, -1)])
+    highest_item = collection.find_one({item_key: {"$ne": None}}, sort=[(item_key, -1)])
+    if first is None or highest_item is None:
+        raise ValueError(f"{collection.name} has no rows with {date_key} and {item_key}")
+    middle = (first[date_key] + last[date_key]) // 2
+    rng = random.Random(seed)
+    items = sorted(rng.sample(range(1, highest_item[item_key] + 1), min(item_count, highest_item[item_key])))
+    return (middle, middle + window_days - 1), items
+
+def plot_layout_chart(report, chart_path):
+    """Save a grouped bar chart of the median time of every table's access patterns in each layout."""
+    labels = [f"{table_name} {pattern}" for table_name, patterns in report.items() for pattern in patterns]
+    layouts = [layout for layout in LAYOUT_SUFFIXES
+               if any(layout in outcomes for patterns in report.values() for outcomes in patterns.values())]
+    width = 0.8 / len(layouts)
+    plt.figure(figsize=(12, 5))
+    for index, layout in enumerate(layouts):
+        positions = [label_index + index * width for label_index in range(len(labels))]
+        medians = [outcomes.get(layout, {}).get("executionTime", {}).get("median") or 0
+                   for patterns in report.values() for outcomes in patterns.values()]
+        plt.bar(positions, medians, width=width, label=layout)
+    plt.xticks([label_index + 0.4 - width / 2 for label_index in range(len(labels))], labels, rotation=45, ha="right")
+    plt.ylabel("Latency (seconds, median)")
+    plt.title("MongoDB Returns Collection Layouts")
+    plt.legend()
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    os.makedirs(os.path.dirname(chart_path), exist_ok=True)
+    plt.savefig(chart_path, bbox_inches='tight')
+    print(f"Layout chart saved to {chart_path}")
+    plt.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Time the access patterns of the queries on the returns collections in every loaded MongoDB layout.")
+    parser.add_argument("--tables", nargs="+", default=list(RETURNS_TABLES), choices=list(RETURNS_TABLES))
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUT_SUFFIXES), choices=list(LAYOUT_SUFFIXES))
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS, help="days of the date range pattern")
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS, help="items of the item lookup pattern")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the looked up items")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs of every pattern before the measured ones")
+    parser.add_argument("--repetitions", type=int, default=5, help="measured runs of every pattern")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    collections = set(db.list_collection_names())
+    report = {}
+    try:
+        for table_name in args.tables:
+            keys = RETURNS_TABLES[table_name]
+            if table_name not in collections:
+                print(f"Skipping {table_name}: the flat layout is not loaded")
+                continue
+            date_range, items = pattern_parameters(db[table_name], keys, args.window_days, args.items, args.seed)
+            report[table_name] = {}
+            for pattern in PATTERNS:
+                outcomes = {}
+                for layout in args.layouts:
+                    collection_name = f"{table_name}{LAYOUT_SUFFIXES[layout]}"
+                    if collection_name not in collections:
+                        continue
+                    if pattern == "reason totals" and layout != "embedded" and REASON_COLLECTION not in collections:
+                        print(f"Skipping {table_name} {pattern} ({layout}): the {REASON_COLLECTION} collection is not loaded")
+                        continue
+                    pipeline = pattern_pipeline(pattern, layout, keys, date_range, items)
+                    runs = measure_query(lambda query: run_pipeline(db[collection_name], query), pipeline,
+                                         args.warmup, args.repetitions)
+                    stats = summarize_metric(runs, "executionTime")
+                    row_counts = {run["rowCount"] for run in runs if "error" not in run}
+                    outcomes[layout] = {"collection": collection_name, "executionTime": stats,
+                                        "rowCount": row_counts.pop() if len(row_counts) == 1 else None}
+                    if stats.get("median") is not None:
+                        print(f"{table_name} {pattern} ({layout}): {stats['median']:.4f}s median, "
+                              f"{outcomes[layout]['rowCount']} rows")
+                if len({outcome["rowCount"] for outcome in outcomes.values()}) > 1:
+                    print(f"Warning: the layouts of {table_name} match different rows for {pattern}")
+                timed = {layout: outcome for layout, outcome in outcomes.items() if outcome["executionTime"].get("median") is not None}
+                if timed:
+                    fastest = min(timed, key=lambda layout: timed[layout]["executionTime"]["median"])
+                    print(f"Fastest layout of {table_name} for {pattern}: {fastest}")
+                report[table_name][pattern] = outcomes
+    finally:
+        client.close()
+
+    if not report:
+        print("No returns collection is loaded.")
+        return
+    os.makedirs(RESULTS_LOCAL_PATH, exist_ok=True)
+    output_file = os.path.join(RESULTS_LOCAL_PATH, "mongo-layouts.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=4)
+    print(f"Layout report saved to {output_file}")
+    plot_layout_chart(report, os.path.splitext(output_file)[0] + ".png")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError, PyMongoError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
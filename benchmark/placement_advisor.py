@@ -0,0 +1,273 @@
+import os
+import sys
+import json
+import random
+import argparse
+from collections import Counter
+from dotenv import load_dotenv
+from harness import (SCENARIOS_DIR, TABLE_PLACEHOLDER_PATTERN, load_query_templates, load_scenario, render_queries,
+                     results_path, save_rendered_queries, table_locations)
+
+load_dotenv()
+
+DATA_DIR = os.getenv("TEST_DATA_LOCAL_PATH")
+
+# Rough scan cost per row of the stores no earlier run measured
+DEFAULT_SECONDS_PER_ROW = {"postgres": 2e-7, "mongo": 1e-6, "cassandra": 5e-7}
+# Cost per row that crosses stores when an earlier run measured no exchange
+DEFAULT_EXCHANGE_SECONDS_PER_ROW = 1e-7
+# Rows assumed for a table with no measurement and no .dat file
+DEFAULT_TABLE_ROWS = 1000
+
+def query_table_usage(templates):
+    """Count how often each query template scans every table, so tables of one query are joined or scanned together."""
+    return {name: Counter(TABLE_PLACEHOLDER_PATTERN.findall(template)) for name, template in templates.items()}
+
+def catalog_stores(scenario):
+    """Map the connector names Presto reports for a scenario's catalogs to their stores."""
+    stores = {}
+    for store, catalog in scenario["catalogs"].items():
+        stores[catalog.split('.')[0] if catalog else store] = store
+    return stores
+
+def count_rows(table_name):
+    """Count the rows of a table's .dat file, or return None when there is no such file."""
+    if not DATA_DIR:
+        return None
+    file_path = os.path.join(DATA_DIR, f"{table_name}.dat")
+    if not os.path.exists(file_path):
+        return None
+    rows = 0
+    with open(file_path, 'rb') as data_file:
+        for block in iter(lambda: data_file.read(4 * 1024 * 1024), b''):
+            rows += block.count(b'\n')
+    return rows
+
+class CostModel:
+    """Predicts the latency of a query set under a table placement from the operators of earlier runs.
+
+    A query costs the scan time of each of its table scans in the store the table is placed in,
+    plus the exchange time of the rows of its tables outside the store that holds most of its
+    rows, since Presto joins them after moving them over the network. A scan never measured in a
+    store is estimated from the table's rows and the store's measured time per scanned row.
+    """
+
+    def __init__(self):
+        self._scans = {}
+        self._store_time = Counter()
+        self._store_rows = Counter()
+        self._exchange_time = 0.0
+        self._exchange_rows = 0
+        self.table_rows = {}
+
+    def add_run(self, scenario, operators):
+        """Record the operators of one query result of a scenario."""
+        stores = catalog_stores(scenario)
+        for operator in operators:
+            rows = operator.get("inputRows") or 0
+            wall_time = operator.get("wallTime") or 0.0
+            if operator.get("connector") and operator.get("table"):
+                store = stores.get(operator["connector"], operator["connector"])
+                self._scans.setdefault((store, operator["table"]), []).append(wall_time)
+                self._store_time[store] += wall_time
+                self._store_rows[store] += rows
+                self.table_rows[operator["table"]] = max(self.table_rows.get(operator["table"], 0), rows)
+            elif operator.get("networkBytes"):
+                self._exchange_time += wall_time
+                self._exchange_rows += rows
+
+    def load_results(self, scenario):
+        """Record every query result of a scenario's earlier runs and return how many had operators."""
+        path = results_path(scenario)
+        loaded = 0
+        if not os.path.isdir(path):
+            return loaded
+        for file in os.listdir(path):
+            if not file.endswith(".json") or file.startswith("throughput-"):
+                continue
+            with open(os.path.join(path, file), 'r') as f:
+                operators = json.load(f).get("operators")
+            if operators:
+                self.add_run(scenario, operators)
+                loaded += 1
+        return loaded
+
+    def seconds_per_row(self, store):
+        if self._store_rows[store]:
+            return self._store_time[store] / self._store_rows[store]
+        return DEFAULT_SECONDS_PER_ROW.get(store, max(DEFAULT_SECONDS_PER_ROW.values()))
+
+    def exchange_seconds_per_row(self):
+        if self._exchange_rows:
+            return self._exchange_time / self._exchange_rows
+        return DEFAULT_EXCHANGE_SECONDS_PER_ROW
+
+    def rows(self, table_name):
+        if table_name not in self.table_rows:
+            self.table_rows[table_name] = count_rows(table_name) or DEFAULT_TABLE_ROWS
+        return self.table_rows[table_name]
+
+    def scan_cost(self, table_name, store):
+        measured = self._scans.get((store, table_name))
+        if measured:
+            return sum(measured) / len(measured)
+        return self.rows(table_name) * self.seconds_per_row(store)
+
+    def query_cost(self, usage, placement):
+        """Predict the latency of one query, given its table scan counts, under a placement."""
+        cost = sum(count * self.scan_cost(table_name, placement[table_name]) for table_name, count in usage.items())
+        rows_per_store = Counter()
+        for table_name in usage:
+            rows_per_store[placement[table_name]] += self.rows(table_name)
+        if len(rows_per_store) > 1:
+            moved_rows = sum(rows_per_store.values()) - max(rows_per_store.values())
+            cost += moved_rows * self.exchange_seconds_per_row()
+        return cost
+
+    def workload_cost(self, usages, placement):
+        return sum(self.query_cost(usage, placement) for usage in usages.values())
+
+def greedy_placement(model, usages, tables, stores, pinned):
+    """Place the tables largest first, each in the store that adds the least to the predicted latency so far."""
+    placement = dict(pinned)
+    for table_name in sorted(tables, key=model.rows, reverse=True):
+        if table_name in placement:
+            continue
+        best_store = None
+        best_cost = None
+        for store in stores:
+            placement[table_name] = store
+            # Only the queries whose tables are all placed can be costed yet
+            cost = sum(model.query_cost(usage, placement) for usage in usages.values() if set(usage) <= set(placement))
+            if best_cost is None or cost < best_cost:
+                best_store, best_cost = store, cost
+        placement[table_name] = best_store
+    return placement
+
+def local_search(model, usages, placement, stores, pinned):
+    """Move single tables to the store that lowers the predicted latency most until no move helps."""
+    placement = dict(placement)
+    cost = model.workload_cost(usages, placement)
+    improved = True
+    while improved:
+        improved = False
+        best_move = None
+        for table_name in placement:
+            if table_name in pinned:
+                continue
+            current_store = placement[table_name]
+            for store in stores:
+                if store == current_store:
+                    continue
+                placement[table_name] = store
+                moved_cost = model.workload_cost(usages, placement)
+                if moved_cost < cost and (best_move is None or moved_cost < best_move[2]):
+                    best_move = (table_name, store, moved_cost)
+            placement[table_name] = current_store
+        if best_move is not None:
+            table_name, store, cost = best_move
+            placement[table_name] = store
+            improved = True
+    return placement, cost
+
+def search_placement(model, usages, tables, stores, pinned, starts, restarts, seed):
+    """Run the local search from the greedy placement, the given starts and random restarts, and keep the best."""
+    rng = random.Random(seed)
+    candidates = [greedy_placement(model, usages, tables, stores, pinned)] + list(starts)
+    for _ in range(restarts):
+        candidates.append({table_name: pinned.get(table_name, rng.choice(stores)) for table_name in tables})
+    best_placement, best_cost = None, None
+    for candidate in candidates:
+        placement, cost = local_search(model, usages, candidate, stores, pinned)
+        if best_cost is None or cost < best_cost:
+            best_placement, best_cost = placement, cost
+    return best_placement, best_cost
+
+def build_scenario(name, base_scenario, placement, stores, predicted_cost, base_cost):
+    """Build the scenario definition of a placement, with the catalogs and engine of the base scenario."""
+    return {
+        "name": name,
+        "description": (f"Placement found by placement_advisor.py from {base_scenario['name']}: predicted workload "
+                        f"latency {predicted_cost:.2f}s against {base_cost:.2f}s."),
+        "engine": base_scenario["engine"],
+        "catalogs": {store: base_scenario["catalogs"][store] for store in stores},
+        "tables": {store: sorted(table_name for table_name, placed in placement.items() if placed == store) for store in stores},
+    }
+
+def parse_pins(pins):
+    pinned = {}
+    for pin in pins or []:
+        table_name, _, store = pin.partition("=")
+        if not store:
+            raise ValueError(f"Pin '{pin}' must be written as table=store")
+        pinned[table_name] = store
+    return pinned
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Search table placements that minimize the predicted latency of the query set and emit them as a scenario.")
+    parser.add_argument("--base", default="scenario-2", help="scenario whose placement, catalogs and engine to start from")
+    parser.add_argument("--results", nargs="+", default=["scenario-0", "scenario-1", "scenario-2"],
+                        help="scenarios whose earlier results give the measured scan and exchange costs")
+    parser.add_argument("--name", default="scenario-advised", help="name of the scenario to write")
+    parser.add_argument("--stores", nargs="+", help="stores tables may be placed in (default: the base scenario's)")
+    parser.add_argument("--pin", nargs="+", metavar="TABLE=STORE", help="tables that must stay in a store")
+    parser.add_argument("--restarts", type=int, default=20, help="local searches started from random placements")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random restarts")
+    parser.add_argument("--render-dir", help="directory to write the rendered queries to (default: the scenario's results directory)")
+    parser.add_argument("--dry-run", action="store_true", help="print the placement without writing the scenario")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    base_scenario = load_scenario(args.base)
+    stores = args.stores or list(base_scenario["tables"])
+    missing = [store for store in stores if store not in base_scenario["catalogs"]]
+    if missing:
+        raise ValueError(f"Scenario {base_scenario['name']} has no catalog for {', '.join(missing)}")
+    pinned = parse_pins(args.pin)
+
+    model = CostModel()
+    for name in args.results:
+        try:
+            loaded = model.load_results(load_scenario(name))
+        except OSError as e:
+            print(f"Skipping results of {name}: {e}")
+            continue
+        print(f"Loaded the operators of {loaded} queries from {name}")
+
+    usages = query_table_usage(load_query_templates())
+    tables = sorted(set().union(*usages.values()))
+    base_locations = table_locations(base_scenario)
+    base_placement = {table_name: base_locations.get(table_name, base_locations.get("*")) for table_name in tables}
+    starts = [base_placement] if all(store in stores for store in base_placement.values()) else []
+    base_cost = model.workload_cost(usages, base_placement)
+
+    placement, cost = search_placement(model, usages, tables, stores, pinned, starts, args.restarts, args.seed)
+    print(f"Predicted workload latency: {base_cost:.2f}s for {base_scenario['name']}, {cost:.2f}s for {args.name}")
+    for table_name in tables:
+        if placement[table_name] != base_placement[table_name]:
+            print(f"  move {table_name}: {base_placement[table_name]} -> {placement[table_name]}")
+    for name, usage in sorted(usages.items()):
+        print(f"  {name}: {model.query_cost(usage, base_placement):.3f}s -> {model.query_cost(usage, placement):.3f}s")
+
+    if args.dry_run:
+        return
+    # Tables no query reads stay where the base scenario placed them, so the scenario still loads them
+    for table_name, store in base_locations.items():
+        if table_name != "*" and store in stores:
+            placement.setdefault(table_name, store)
+    scenario = build_scenario(args.name, base_scenario, placement, stores, cost, base_cost)
+    scenario_file = os.path.join(SCENARIOS_DIR, f"{args.name}.json")
+    with open(scenario_file, 'w') as output:
+        json.dump(scenario, output, indent=4)
+        output.write("\n")
+    print(f"Scenario saved to {scenario_file}")
+    save_rendered_queries(render_queries(scenario), args.render_dir or os.path.join(results_path(scenario), "queries"))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,186 @@
+from throughput import parse_presto_duration
+
+POSTGRES_BLOCK_SIZE = 8192
+DATA_SIZE_UNITS = {"B": 1, "kB": 1024, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4, "PB": 1024 ** 5}
+# Presto operators that receive pages from other stages over the network
+EXCHANGE_OPERATORS = {"ExchangeOperator", "MergeOperator"}
+
+def parse_presto_data_size(value):
+    """Convert a Presto data size such as '1.50MB' or '120B', or a number of bytes, to bytes."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    for unit in sorted(DATA_SIZE_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            try:
+                return int(float(value[:-len(unit)]) * DATA_SIZE_UNITS[unit])
+            except ValueError:
+                return None
+    return None
+
+def operator_record(engine, operator, node_id=None, stage=None, connector=None, table=None, input_rows=None,
+                    input_bytes=None, output_rows=None, output_bytes=None, wall_time=None, cpu_time=None,
+                    network_bytes=0):
+    """Build an operator in the schema shared by both engines, with times in seconds and sizes in bytes."""
+    return {
+        "engine": engine,
+        "stage": stage,
+        "nodeId": node_id,
+        "operator": operator,
+        "connector": connector,
+        "table": table,
+        "inputRows": input_rows,
+        "inputBytes": input_bytes,
+        "outputRows": output_rows,
+        "outputBytes": output_bytes,
+        "wallTime": wall_time,
+        "cpuTime": cpu_time,
+        "networkBytes": network_bytes,
+    }
+
+def _node_total(node, key):
+    return node.get(key, 0) * node.get("Actual Loops", 1)
+
+def postgres_operators(plan):
+    """Normalize the output of EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) into one record per plan node.
+
+    Times and buffers of a node include its children in the plan, so they are made exclusive by
+    subtracting the children's totals. PostgreSQL reports no CPU time per node.
+    """
+    if isinstance(plan, list):
+        plan = plan[0]
+    operators = []
+
+    def visit(node, node_id):
+        children = node.get("Plans", [])
+        total_time = _node_total(node, "Actual Total Time")
+        blocks = node.get("Shared Hit Blocks", 0) + node.get("Shared Read Blocks", 0)
+        child_time = sum(_node_total(child, "Actual Total Time") for child in children)
+        child_rows = sum(_node_total(child, "Actual Rows") for child in children)
+        child_blocks = sum(child.get("Shared Hit Blocks", 0) + child.get("Shared Read Blocks", 0) for child in children)
+        output_rows = _node_total(node, "Actual Rows")
+        relation = node.get("Relation Name")
+        if relation:
+            input_rows = output_rows + _node_total(node, "Rows Removed by Filter")
+        else:
+            input_rows = child_rows
+        operators.append(operator_record(
+            "postgres",
+            node.get("Node Type"),
+            node_id=str(node_id),
+            connector="postgres" if relation else None,
+            table=relation,
+            input_rows=input_rows,
+            input_bytes=max(blocks - child_blocks, 0) * POSTGRES_BLOCK_SIZE,
+            output_rows=output_rows,
+            output_bytes=output_rows * node.get("Plan Width", 0),
+            wall_time=max(total_time - child_time, 0) / 1000,
+        ))
+        next_id = node_id + 1
+        for child in children:
+            next_id = visit(child, next_id)
+        return next_id
+
+    visit(plan["Plan"], 0)
+    return operators
+
+def _handle_table_name(handle):
+    """Find the table name in a Presto connector table handle, whose layout differs per connector."""
+    if not isinstance(handle, dict):
+        return None
+    schema_table = handle.get("schemaTableName")
+    if isinstance(schema_table, dict):
+        return schema_table.get("table")
+    for key in ("tableName", "table", "collection"):
+        if isinstance(handle.get(key), str):
+            return handle[key]
+    return None
+
+def presto_table_scans(query_info):
+    """Map the plan node id of every table scan in a Presto query info to its connector and table."""
+    scans = {}
+
+    def walk(value):
+        if isinstance(value, dict):
+            table = value.get("table")
+            if isinstance(table, dict) and "connectorId" in table and "id" in value:
+                scans[str(value["id"])] = (table["connectorId"], _handle_table_name(table.get("connectorHandle")))
+            for child in value.values():
+                walk(child)
+        elif isinstance(value, list):
+            for child in value:
+                walk(child)
+
+    walk(query_info.get("outputStage", {}))
+    return scans
+
+def _sum_durations(summary, keys):
+    values = [parse_presto_duration(summary.get(key)) for key in keys]
+    return sum(value for value in values if value is not None)
+
+def _data_size(summary, key):
+    size = parse_presto_data_size(summary.get(key))
+    return size if size is not None else parse_presto_data_size(summary.get(f"{key}InBytes"))
+
+def presto_operators(query_info):
+    """Normalize the operator summaries of a Presto query info into one record per operator.
+
+    Scan operators are attributed to the connector of their table scan node. Exchange operators
+    count the bytes they received over the network.
+    """
+    scans = presto_table_scans(query_info)
+    operators = []
+    for summary in query_info.get("queryStats", {}).get("operatorSummaries", []):
+        node_id = str(summary.get("planNodeId"))
+        operator_type = summary.get("operatorType")
+        connector, table = scans.get(node_id, (None, None))
+        if operator_type not in ("ScanFilterAndProjectOperator", "TableScanOperator"):
+            connector, table = None, None
+        raw_input_bytes = _data_size(summary, "rawInputDataSize")
+        operators.append(operator_record(
+            "presto",
+            operator_type,
+            node_id=node_id,
+            stage=summary.get("stageId"),
+            connector=connector,
+            table=table,
+            input_rows=summary.get("rawInputPositions", summary.get("inputPositions")),
+            input_bytes=raw_input_bytes,
+            output_rows=summary.get("outputPositions"),
+            output_bytes=_data_size(summary, "outputDataSize"),
+            wall_time=_sum_durations(summary, ("addInputWall", "getOutputWall", "finishWall")),
+            cpu_time=_sum_durations(summary, ("addInputCpu", "getOutputCpu", "finishCpu")),
+            network_bytes=(raw_input_bytes or 0) if operator_type in EXCHANGE_OPERATORS else 0,
+        ))
+    return operators
+
+def connector_breakdown(operators):
+    """Sum the rows, bytes and time of the scan operators of each connector."""
+    connectors = {}
+    for operator in operators:
+        if operator["connector"] is None:
+            continue
+        totals = connectors.setdefault(operator["connector"], {
+            "operators": 0, "tables": [], "inputRows": 0, "inputBytes": 0, "wallTime": 0.0, "cpuTime": None,
+        })
+        totals["operators"] += 1
+        if operator["table"] and operator["table"] not in totals["tables"]:
+            totals["tables"].append(operator["table"])
+        totals["inputRows"] += operator["inputRows"] or 0
+        totals["inputBytes"] += operator["inputBytes"] or 0
+        totals["wallTime"] += operator["wallTime"] or 0.0
+        if operator["cpuTime"] is not None:
+            totals["cpuTime"] = (totals["cpuTime"] or 0.0) + operator["cpuTime"]
+    return connectors
+
+def summarize_operators(operators):
+    """Build the time breakdown of a query: per-connector totals, the bottleneck connector and network bytes."""
+    connectors = connector_breakdown(operators)
+    bottleneck = max(connectors, key=lambda name: connectors[name]["wallTime"]) if connectors else None
+    return {
+        "connectors": connectors,
+        "bottleneck": bottleneck,
+        "networkBytes": sum(operator["networkBytes"] or 0 for operator in operators),
+        "wallTime": sum(operator["wallTime"] or 0.0 for operator in operators),
+    }
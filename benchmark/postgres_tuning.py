@@ -0,0 +1,273 @@
+import os
+import sys
+import json
+import math
+import argparse
+import itertools
+import psycopg
+from dotenv import load_dotenv
+from executors import PostgresExecutor
+from harness import SCENARIOS_DIR, load_scenario, render_queries, results_path, run_benchmark
+from result_store import DEFAULT_MIN_CHANGE, ResultStore, compare_runs
+
+load_dotenv()
+
+# Session settings swept by default: parallel query, sort and hash memory, JIT and the join planner toggles
+DEFAULT_MATRIX = {
+    "max_parallel_workers_per_gather": ["0", "2", "4"],
+    "work_mem": ["4MB", "64MB", "256MB"],
+    "jit": ["on", "off"],
+    "enable_nestloop": ["on", "off"],
+    "enable_mergejoin": ["on", "off"],
+}
+DEFAULT_STATEMENT_TIMEOUT = "5min"
+TUNING_LABEL = "postgres tuning"
+
+def tuning_path(scenario):
+    return os.path.join(results_path(scenario), "tuning")
+
+def describe_settings(settings):
+    return ", ".join(f"{setting}={value}" for setting, value in settings.items()) or "server defaults"
+
+def settings_slug(settings):
+    return "_".join(f"{setting}-{value}" for setting, value in settings.items()) or "defaults"
+
+def parse_matrix(specs):
+    """Parse NAME=VALUE,VALUE... arguments into the values of every setting to sweep."""
+    if not specs:
+        return dict(DEFAULT_MATRIX)
+    matrix = {}
+    for spec in specs:
+        setting, _, values = spec.partition("=")
+        values = [value.strip() for value in values.split(",") if value.strip()]
+        if not setting or not values:
+            raise ValueError(f"Setting '{spec}' must be written as name=value,value")
+        matrix[setting.strip()] = values
+    return matrix
+
+def check_settings(conninfo, matrix, fixed):
+    """Try every value of the sweep in a rolled back transaction, so a typo fails before any query runs."""
+    with psycopg.connect(**conninfo) as conn:
+        for setting, values in [*((setting, [value]) for setting, value in fixed.items()), *matrix.items()]:
+            for value in values:
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT set_config(%s, %s, true)", (setting, value))
+                except psycopg.Error as e:
+                    raise ValueError(f"PostgreSQL rejects {setting}={value}: {e}") from e
+                finally:
+                    conn.rollback()
+
+def grid_configurations(matrix):
+    """Return every combination of the swept values."""
+    return [dict(zip(matrix, values)) for values in itertools.product(*matrix.values())]
+
+def workload_time(medians, queries):
+    """Return the summed median of the queries, or infinity when a configuration failed any of them."""
+    if not queries or any(medians.get(query) is None for query in queries):
+        return math.inf
+    return sum(medians[query] for query in queries)
+
+class Sweep:
+    """Runs the query set once per configuration of session settings and keeps every run's medians."""
+
+    def __init__(self, scenario, queries, fixed, warmup, repetitions, min_change=DEFAULT_MIN_CHANGE):
+        self.scenario = scenario
+        self.queries = queries
+        self.fixed = fixed
+        self.warmup = warmup
+        self.repetitions = repetitions
+        self.min_change = min_change
+        self.runs = []
+        self.baseline = None
+
+    def measure(self, settings):
+        """Run the query set with a configuration, unless it was already measured, and return its run."""
+        for run in self.runs:
+            if run["settings"] == settings:
+                return run
+        print(f"Running {len(self.queries)} queries with {describe_settings(settings)}")
+        executor = PostgresExecutor({**self.fixed, **settings})
+        try:
+            output_path = os.path.join(tuning_path(self.scenario), settings_slug(settings))
+            run_id, query_stats = run_benchmark(self.scenario, self.queries, executor, self.warmup, self.repetitions,
+                                                label=f"{TUNING_LABEL}: {describe_settings(settings)}",
+                                                output_path=output_path)
+        finally:
+            executor.close()
+        run = {
+            "settings": settings,
+            "runId": run_id,
+            "medians": {query: stats["median"] for query, stats in query_stats.items()},
+        }
+        if self.baseline is None:
+            self.baseline = run
+        run["workloadTime"] = workload_time(run["medians"], self.baseline_queries())
+        print(f"Workload time with {describe_settings(settings)}: {run['workloadTime']:.3f}s")
+        self.runs.append(run)
+        return run
+
+    def baseline_queries(self):
+        """Return the queries measured with the server defaults, which every configuration is scored on."""
+        return sorted(self.baseline["medians"])
+
+    def faster(self, run, other):
+        """Whether a run's workload time beats another's by more than the noise margin."""
+        return run["workloadTime"] < other["workloadTime"] * (1 - self.min_change)
+
+    def best(self):
+        """Return the fastest configuration, or the one that changes the fewest settings within the noise margin of it."""
+        fastest = min(self.runs, key=lambda run: run["workloadTime"])
+        return min([run for run in self.runs if not self.faster(fastest, run)],
+                   key=lambda run: (len(run["settings"]), run["workloadTime"]))
+
+def sweep_grid(sweep, matrix):
+    """Measure every combination of the swept values."""
+    for settings in grid_configurations(matrix):
+        sweep.measure(settings)
+
+def sweep_greedy(sweep, matrix):
+    """Tune one setting at a time, keeping the best value of each while the next ones are tried.
+
+    A value is only kept when it is faster than leaving the setting alone by more than the noise
+    margin. This measures as many configurations as there are values, instead of their product,
+    at the cost of missing interactions between settings that are only worth changing together.
+    """
+    chosen = sweep.measure({})
+    for setting, values in matrix.items():
+        runs = [sweep.measure({**chosen["settings"], setting: value}) for value in values]
+        best = min(runs, key=lambda run: run["workloadTime"])
+        if sweep.faster(best, chosen):
+            chosen = best
+        print(f"Best value of {setting}: {chosen['settings'].get(setting, 'server default')}")
+
+def best_per_query(sweep):
+    """Return the configuration with the lowest median of every query, next to its median with the server defaults."""
+    best = {}
+    for query in sorted(set().union(*(run["medians"] for run in sweep.runs))):
+        measured = [run for run in sweep.runs if run["medians"].get(query) is not None]
+        fastest = min(measured, key=lambda run: run["medians"][query])
+        baseline_median = sweep.baseline["medians"].get(query)
+        best[query] = {
+            "settings": fastest["settings"],
+            "median": fastest["medians"][query],
+            "baselineMedian": baseline_median,
+            "speedup": baseline_median / fastest["medians"][query]
+                       if baseline_median and fastest["medians"][query] > 0 else None,
+        }
+    return best
+
+def compare_to_baseline(sweep, run):
+    """Classify every query of a run against the server defaults with the result store's significance test."""
+    store = ResultStore()
+    try:
+        return compare_runs(store.query_times(sweep.baseline["runId"]), store.query_times(run["runId"]))
+    finally:
+        store.close()
+
+def write_scenario(scenario, name, settings):
+    """Write a copy of the scenario that runs its queries with the given session settings on top of its own."""
+    tuned = dict(scenario, name=name, settings={**scenario.get("settings", {}), **settings})
+    tuned["description"] = f"{scenario['name']} with the session settings tuned by postgres_tuning.py."
+    scenario_file = os.path.join(SCENARIOS_DIR, f"{name}.json")
+    with open(scenario_file, 'w') as output:
+        json.dump(tuned, output, indent=4)
+        output.write("\n")
+    print(f"Scenario saved to {scenario_file}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run a PostgreSQL scenario under a matrix of session settings and report the best configuration.")
+    parser.add_argument("scenario", nargs="?", default="scenario-0",
+                        help="scenario name in benchmark/scenarios (like scenario-0) or path of a scenario file")
+    parser.add_argument("--set", nargs="+", metavar="NAME=VALUES",
+                        help="settings to sweep with their comma-separated values, like work_mem=4MB,64MB "
+                             "(default: parallel workers, work_mem, jit, enable_nestloop and enable_mergejoin)")
+    parser.add_argument("--strategy", choices=["greedy", "grid"], default="greedy",
+                        help="tune one setting at a time, or measure every combination of the values")
+    parser.add_argument("--queries", nargs="+", help="query names to run (default: all)")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs of every query before the measured ones")
+    parser.add_argument("--repetitions", type=int, default=5, help="measured runs of every query")
+    parser.add_argument("--statement-timeout", default=DEFAULT_STATEMENT_TIMEOUT,
+                        help="statement_timeout of every configuration, so a bad plan fails instead of running for hours")
+    parser.add_argument("--min-change", type=float, default=DEFAULT_MIN_CHANGE,
+                        help="share of the workload time a setting must save to be kept over leaving it alone")
+    parser.add_argument("--write-scenario", nargs="?", const="", metavar="NAME",
+                        help="write the best configuration as a scenario (default name: <scenario>-tuned)")
+    parser.add_argument("--dry-run", action="store_true", help="only print the configurations that would be measured")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scenario = load_scenario(args.scenario)
+    if scenario["engine"] != PostgresExecutor.name:
+        raise ValueError(f"Scenario {scenario['name']} runs on {scenario['engine']}, not PostgreSQL")
+    matrix = parse_matrix(args.set)
+    fixed = {"statement_timeout": args.statement_timeout} if args.statement_timeout else {}
+    # Settings the scenario already has stay fixed unless they are swept
+    fixed.update({setting: value for setting, value in scenario.get("settings", {}).items() if setting not in matrix})
+    combinations = math.prod(len(values) for values in matrix.values())
+    configurations = combinations if args.strategy == "grid" else sum(len(values) for values in matrix.values())
+    print(f"Sweeping {describe_settings({setting: '|'.join(values) for setting, values in matrix.items()})}")
+    print(f"Up to {configurations + 1} configurations with {describe_settings(fixed)}, "
+          f"{args.warmup + args.repetitions} runs of every query each")
+    if args.dry_run:
+        return
+
+    check_settings(PostgresExecutor().conninfo, matrix, fixed)
+    sweep = Sweep(scenario, render_queries(scenario, args.queries), fixed, args.warmup, args.repetitions,
+                  args.min_change)
+    sweep.measure({})
+    if not sweep.baseline["medians"]:
+        raise ValueError("No query could be measured with the server defaults")
+    if args.strategy == "grid":
+        sweep_grid(sweep, matrix)
+    else:
+        sweep_greedy(sweep, matrix)
+
+    best = sweep.best()
+    per_query = best_per_query(sweep)
+    comparison = compare_to_baseline(sweep, best)
+    verdicts = [result["verdict"] for result in comparison.values()]
+    baseline_time = sweep.baseline["workloadTime"]
+    print(f"Best configuration: {describe_settings(best['settings'])}")
+    print(f"Workload time {baseline_time:.3f}s with server defaults, {best['workloadTime']:.3f}s tuned "
+          f"({baseline_time / best['workloadTime']:.2f}x); {verdicts.count('improvement')} queries improve "
+          f"and {verdicts.count('regression')} regress significantly")
+    # Queries another configuration runs faster than the best overall one
+    for query, result in per_query.items():
+        best_median = best["medians"].get(query)
+        if result["speedup"] and (best_median is None or result["median"] < best_median * (1 - args.min_change)):
+            print(f"  {query}: {result['baselineMedian']:.3f}s -> {result['median']:.3f}s "
+                  f"({result['speedup']:.2f}x) with {describe_settings(result['settings'])}")
+
+    path = tuning_path(scenario)
+    os.makedirs(path, exist_ok=True)
+    output_file = os.path.join(path, "tuning.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump({
+            "strategy": args.strategy,
+            "matrix": matrix,
+            "fixedSettings": fixed,
+            "configurations": [dict(run, workloadTime=run["workloadTime"] if run["workloadTime"] < math.inf else None)
+                               for run in sweep.runs],
+            "best": {
+                "settings": best["settings"],
+                "runId": best["runId"],
+                "workloadTime": best["workloadTime"],
+                "baselineWorkloadTime": baseline_time,
+                "comparison": comparison,
+            },
+            "bestPerQuery": per_query,
+        }, output, indent=4)
+    print(f"Tuning report saved to {output_file}")
+
+    if args.write_scenario is not None:
+        write_scenario(scenario, args.write_scenario or f"{scenario['name']}-tuned", best["settings"])
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError, psycopg.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,647 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from executors import make_executor
+from harness import load_scenario, render_queries, results_path, run_benchmark
+from result_store import compare_runs
+
+load_dotenv()
+
+RESULTS_LOCAL_PATH = os.getenv("RESULTS_LOCAL_PATH")
+CACHE_DIR = os.getenv("PRESTO_CACHE_DIR") or os.path.join(RESULTS_LOCAL_PATH or ".", "presto-cache")
+LOAD_JOURNAL_FILE = os.getenv("LOAD_JOURNAL_FILE") or os.path.join(
+    os.getenv("TEST_DATA_TMP_LOCAL_PATH") or ".", "load-journal.jsonl")
+
+DEFAULT_PORT = 8081
+DEFAULT_MEMORY_MB = 256
+DEFAULT_DISK_MB = 1024
+# Queries followed at once whose pages are being recorded, or served from the cache
+MAX_TRACKED_QUERIES = 1000
+# Request headers that change a query's results, and so its cache key
+KEY_HEADERS = ("X-Presto-Catalog", "X-Presto-Schema", "X-Presto-Session", "X-Presto-Time-Zone")
+# "on" serves and stores results, "refresh" only stores them, so every query runs cold, and "off" only forwards
+MODES = ("on", "refresh", "off")
+SQL_TOKEN_PATTERN = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/|\s+", re.DOTALL)
+LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|[^']+")
+IDENTIFIER_PATTERN = re.compile(r"[a-z_][a-z0-9_]*")
+QUALIFIED_TABLE_PATTERN = re.compile(r"\b(\w+)\.(\w+)\.(\w+)\b")
+ENTRY_FILE_PATTERN = re.compile(r"[0-9a-f]{64}\.json")
+HOP_HEADERS = ("connection", "keep-alive", "transfer-encoding", "content-length", "content-encoding", "server", "date")
+
+def normalize_sql(sql):
+    """Return a query without comments, a trailing semicolon or case and whitespace differences outside its literals."""
+    def token(match):
+        text = match.group()
+        return text if text.startswith("'") else " "
+    collapsed = SQL_TOKEN_PATTERN.sub(token, sql).strip().rstrip(";").strip()
+    return LITERAL_PATTERN.sub(lambda match: match.group() if match.group().startswith("'") else match.group().lower(),
+                               collapsed)
+
+def referenced_names(normalized):
+    """Return every identifier of a normalized query outside its literals, a superset of the tables it reads.
+
+    Invalidating by any of them can only drop an entry too often, never keep a stale one, and it
+    needs no knowledge of how the scenario qualifies or renames its tables.
+    """
+    return set(IDENTIFIER_PATTERN.findall(LITERAL_PATTERN.sub(
+        lambda match: " " if match.group().startswith("'") else match.group(), normalized)))
+
+def cache_key(normalized, headers):
+    """Hash a normalized query with the request headers that select its catalog, schema and session."""
+    digest = hashlib.sha256(normalized.encode("utf-8"))
+    for name in KEY_HEADERS:
+        digest.update(f"\n{name}: {headers.get(name) or ''}".encode("utf-8"))
+    return digest.hexdigest()
+
+class CacheEntry:
+    """The columns and result pages of one finished query, held in memory or spilled to a file."""
+
+    def __init__(self, key, sql, tables, columns, pages, source_query_id):
+        self.key = key
+        self.sql = sql
+        self.tables = tables
+        self.columns = columns
+        self.pages = pages
+        self.source_query_id = source_query_id
+        self.size = len(json.dumps([columns, pages]).encode("utf-8"))
+        self.path = None
+        self.hits = 0
+        self.created = time.time()
+
+    @property
+    def tier(self):
+        return "memory" if self.pages is not None else "disk"
+
+    def summary(self):
+        return {
+            "key": self.key, "sql": self.sql[:200], "bytes": self.size, "pages": None if self.pages is None else len(self.pages),
+            "tier": self.tier, "hits": self.hits, "sourceQueryId": self.source_query_id,
+            "qualifiedTables": sorted(".".join(name) for name in set(QUALIFIED_TABLE_PATTERN.findall(self.sql))),
+        }
+
+class ResultCache:
+    """An LRU cache of query results under a memory budget and a disk budget.
+
+    Entries beyond the memory budget are spilled to files in least recently used order while they
+    fit the disk budget, and dropped after that. A disk entry read again moves back to memory.
+    Every table invalidated bumps a counter, so a query recorded while one of its tables was
+    written is not stored.
+    """
+
+    def __init__(self, memory_budget, disk_budget, directory=CACHE_DIR):
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.version = 0
+        self.invalidated_at = {}
+        self.writing = {}
+        self.counters = {"hits": 0, "misses": 0, "stored": 0, "notStored": 0, "spilled": 0, "evicted": 0, "invalidated": 0}
+        # Entries do not outlive the proxy, whose journal position starts at the end
+        if os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                if ENTRY_FILE_PATTERN.fullmatch(file_name):
+                    os.remove(os.path.join(directory, file_name))
+        if disk_budget > 0:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """Return the entry of a key with its columns and pages and mark it most recently used, or None on a miss.
+
+        The columns and pages are returned apart from the entry, since another request may spill
+        the entry once the lock is released. An entry larger than the memory budget is read from
+        its file and stays on disk.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            if entry.pages is None:
+                if entry.size > self.memory_budget:
+                    columns, pages = self._read(entry)
+                    entry.hits += 1
+                    self.counters["hits"] += 1
+                    return entry, columns, pages
+                self._load(entry)
+                self._enforce_budgets(keep=key)
+            entry.hits += 1
+            self.counters["hits"] += 1
+            return entry, entry.columns, entry.pages
+
+    def put(self, entry, started_version):
+        """Store an entry unless one of its tables was written since its query started, or is being written."""
+        with self.lock:
+            if any(self.invalidated_at.get(table, -1) > started_version or self.writing.get(table)
+                   for table in entry.tables) or entry.size > max(self.memory_budget, self.disk_budget):
+                self.counters["notStored"] += 1
+                return False
+            self._remove(entry.key)
+            self.entries[entry.key] = entry
+            self.memory_bytes += entry.size
+            self.counters["stored"] += 1
+            self._enforce_budgets()
+            return entry.key in self.entries
+
+    def invalidate(self, tables, event=None):
+        """Drop the entries reading any of the tables, and track whether a load is writing them."""
+        tables = {table.lower() for table in tables}
+        with self.lock:
+            self.version += 1
+            for table in tables:
+                self.invalidated_at[table] = self.version
+                if event == "start":
+                    self.writing[table] = self.writing.get(table, 0) + 1
+                elif event == "end":
+                    self.writing[table] = max(self.writing.get(table, 0) - 1, 0)
+                elif event is None:
+                    self.writing.pop(table, None)
+            stale = [key for key, entry in self.entries.items() if entry.tables & tables]
+            for key in stale:
+                self._remove(key)
+            self.counters["invalidated"] += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.entries):
+                self._remove(key)
+            self.writing.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                **self.counters,
+                "entries": len(self.entries),
+                "memoryBytes": self.memory_bytes,
+                "memoryBudget": self.memory_budget,
+                "diskBytes": self.disk_bytes,
+                "diskBudget": self.disk_budget,
+                "tablesBeingWritten": sorted(table for table, count in self.writing.items() if count),
+            }
+
+    def summaries(self):
+        with self.lock:
+            return [entry.summary() for entry in reversed(self.entries.values())]
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.pages is not None:
+            self.memory_bytes -= entry.size
+        if entry.path is not None:
+            self.disk_bytes -= entry.size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _read(self, entry):
+        with open(entry.path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _load(self, entry):
+        entry.columns, entry.pages = self._read(entry)
+        os.remove(entry.path)
+        entry.path = None
+        self.disk_bytes -= entry.size
+        self.memory_bytes += entry.size
+
+    def _spill(self, entry):
+        entry.path = os.path.join(self.directory, f"{entry.key}.json")
+        with open(entry.path, "w", encoding="utf-8") as file:
+            json.dump([entry.columns, entry.pages], file)
+        entry.pages = None
+        self.memory_bytes -= entry.size
+        self.disk_bytes += entry.size
+        self.counters["spilled"] += 1
+
+    def _enforce_budgets(self, keep=None):
+        """Spill and then evict least recently used entries until both budgets hold, except the entry keep."""
+        for key, entry in list(self.entries.items()):
+            if self.memory_bytes <= self.memory_budget:
+                break
+            if entry.pages is None or key == keep:
+                continue
+            if entry.size <= self.disk_budget:
+                self._spill(entry)
+            else:
+                self._remove(key)
+                self.counters["evicted"] += 1
+        for key, entry in list(self.entries.items()):
+            if self.disk_bytes <= self.disk_budget:
+                break
+            if entry.path is not None:
+                self._remove(key)
+                self.counters["evicted"] += 1
+
+class JournalFollower:
+    """Reads the events the loaders append to the load journal since it was last read.
+
+    It starts at the end of the journal, since the cache starts empty. A journal that shrank was
+    replaced, and is read again from its start.
+    """
+
+    def __init__(self, path=LOAD_JOURNAL_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.offset = os.path.getsize(path) if os.path.exists(path) else 0
+
+    def read(self):
+        with self.lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return []
+            if size < self.offset:
+                self.offset = 0
+            if size == self.offset:
+                return []
+            with open(self.path, "rb") as file:
+                file.seek(self.offset)
+                data = file.read(size - self.offset)
+            # A line still being appended is read with the next events
+            complete = data.rfind(b"\n") + 1
+            self.offset += complete
+            events = []
+            for line in data[:complete].splitlines():
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+            return events
+
+class Recording:
+    """The pages of a query forwarded to Presto, collected as the client follows them."""
+
+    def __init__(self, key, sql, tables, version):
+        self.key = key
+        self.sql = sql
+        self.tables = tables
+        self.version = version
+        self.columns = None
+        self.pages = []
+
+class ServedQuery:
+    """A query answered from a cache entry, whose pages the client follows like Presto's."""
+
+    def __init__(self, entry, columns, pages):
+        self.id = f"cached_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:5]}"
+        self.entry = entry
+        self.columns = columns
+        self.pages = pages
+        self.created = time.perf_counter()
+        self.finished = None
+
+class PrestoCacheHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, body, status=200, headers=()):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _forward(self, method, body=None):
+        """Send the request to Presto and return its status, decoded JSON or raw body, and headers to pass on."""
+        request = urllib.request.Request(self.server.upstream + self.path, data=body, method=method)
+        for name, value in self.headers.items():
+            if name.lower().startswith("x-presto-") or name.lower() in ("content-type", "accept", "user-agent"):
+                request.add_header(name, value)
+        try:
+            with urllib.request.urlopen(request, timeout=self.server.upstream_timeout) as response:
+                status, payload, headers = response.status, response.read(), response.headers.items()
+        except urllib.error.HTTPError as e:
+            status, payload, headers = e.code, e.read(), e.headers.items()
+        headers = [(name, value) for name, value in headers
+                   if name.lower() not in HOP_HEADERS and name.lower() != "content-type"]
+        try:
+            return status, json.loads(payload), headers
+        except ValueError:
+            return status, payload, headers
+
+    def _relay(self, status, body, headers):
+        if isinstance(body, (bytes, bytearray)):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(body, status, headers)
+
+    def _through_proxy(self, body):
+        """Point the URIs of a Presto response at the proxy, so the client follows them through it."""
+        base = self._base_url()
+        for name in ("nextUri", "infoUri", "partialCancelUri"):
+            if body.get(name):
+                parts = urllib.parse.urlsplit(body[name])
+                body[name] = base + urllib.parse.urlunsplit(("", "", parts.path, parts.query, ""))
+        return body
+
+    def do_POST(self):
+        if self.path != "/v1/statement":
+            self._relay(*self._forward("POST", self._read_body()))
+            return
+        body = self._read_body()
+        server = self.server
+        server.apply_journal()
+        sql = body.decode("utf-8")
+        normalized = normalize_sql(sql)
+        key = cache_key(normalized, self.headers)
+        cached = server.cache.get(key) if server.mode == "on" else None
+        if cached is not None:
+            self._serve_cached(ServedQuery(*cached))
+            return
+        version = server.cache.version
+        status, response, headers = self._forward("POST", body)
+        if status == 200 and isinstance(response, dict) and response.get("id") and server.mode != "off":
+            server.track(server.recordings, response["id"],
+                         Recording(key, normalized, referenced_names(normalized), version))
+            self._record(response)
+        self._relay(status, self._through_proxy(response) if isinstance(response, dict) else response, headers)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts[:2] == ["v1", "cache"]:
+            self._cache_info(parts[2:])
+            return
+        if parts[:3] == ["v1", "statement", "cached"] and len(parts) == 5:
+            with self.server.lock:
+                served = self.server.served.get(parts[3])
+            if served is None:
+                self._send_json({"message": "Query not found"}, 404)
+            else:
+                self._serve_cached(served, int(parts[4]))
+            return
+        if parts[:2] == ["v1", "query"] and len(parts) == 3:
+            with self.server.lock:
+                served = self.server.served.get(parts[2])
+            if served is not None:
+                self._cached_query_info(served)
+                return
+        status, response, headers = self._forward("GET")
+        if isinstance(response, dict) and parts[:2] == ["v1", "statement"]:
+            if status == 200:
+                self._record(response)
+            response = self._through_proxy(response)
+        self._relay(status, response, headers)
+
+    def do_DELETE(self):
+        parts = self.path.strip("/").split("/")
+        if parts == ["v1", "cache"]:
+            self.server.cache.clear()
+            self._send_json(self.server.cache.stats())
+            return
+        if parts[:3] == ["v1", "cache", "tables"] and len(parts) == 4:
+            # Lets a loader on another host invalidate a table without the journal
+            dropped = self.server.cache.invalidate([parts[3]])
+            self._send_json({"table": parts[3], "invalidated": dropped})
+            return
+        with self.server.lock:
+            for query_id in list(self.server.recordings):
+                if query_id in self.path:
+                    self.server.recordings.pop(query_id)
+        self._relay(*self._forward("DELETE"))
+
+    def do_PUT(self):
+        parts = self.path.strip("/").split("/")
+        if parts[:3] != ["v1", "cache", "mode"] or len(parts) != 4 or parts[3] not in MODES:
+            self._relay(*self._forward("PUT", self._read_body()))
+            return
+        self.server.mode = parts[3]
+        self._send_json({"mode": self.server.mode})
+
+    def _record(self, response):
+        """Add the page of a forwarded response to its query's recording, and store it once the query finished."""
+        server = self.server
+        with server.lock:
+            recording = server.recordings.get(response.get("id"))
+        if recording is None:
+            return
+        if "error" in response:
+            with server.lock:
+                server.recordings.pop(response["id"], None)
+            return
+        recording.columns = response.get("columns") or recording.columns
+        if response.get("data"):
+            recording.pages.append(response["data"])
+        if response.get("nextUri"):
+            return
+        with server.lock:
+            server.recordings.pop(response["id"], None)
+        if response.get("stats", {}).get("state", "FINISHED") != "FINISHED" or recording.columns is None:
+            return
+        server.apply_journal()
+        server.cache.put(CacheEntry(recording.key, recording.sql, recording.tables, recording.columns,
+                                    recording.pages, response["id"]), recording.version)
+
+    def _serve_cached(self, served, token=0):
+        """Answer the POST with the first page of a cached result and every following GET with the next one."""
+        server = self.server
+        if token == 0:
+            server.track(server.served, served.id, served)
+        body = {"id": served.id, "infoUri": f"{self._base_url()}/v1/query/{served.id}",
+                "columns": served.columns, "stats": {"state": "FINISHED"}}
+        if token < len(served.pages):
+            body["data"] = served.pages[token]
+        if token + 1 < len(served.pages):
+            body["nextUri"] = f"{self._base_url()}/v1/statement/cached/{served.id}/{token + 1}"
+        elif served.finished is None:
+            served.finished = time.perf_counter()
+        self._send_json(body)
+
+    def _cached_query_info(self, served):
+        elapsed = format_seconds((served.finished or time.perf_counter()) - served.created)
+        self._send_json({
+            "queryId": served.id,
+            "query": served.entry.sql,
+            "state": "FINISHED",
+            "queryStats": {"queuedTime": format_seconds(0.0), "executionTime": elapsed, "elapsedTime": elapsed},
+            "cache": {"hit": True, "sourceQueryId": served.entry.source_query_id, "bytes": served.entry.size},
+        })
+
+    def _cache_info(self, parts):
+        server = self.server
+        server.apply_journal()
+        if parts == ["entries"]:
+            self._send_json(server.cache.summaries())
+        elif not parts:
+            self._send_json({"mode": server.mode, **server.cache.stats()})
+        else:
+            self._send_json({"message": "Not found"}, 404)
+
+def format_seconds(seconds):
+    """Format seconds as a Presto duration in milliseconds, which parse_presto_duration reads back."""
+    return f"{seconds * 1000:.2f}ms"
+
+class PrestoCacheServer(ThreadingHTTPServer):
+    """Proxies the Presto REST protocol to a coordinator and answers repeated queries from a ResultCache."""
+
+    daemon_threads = True
+
+    def __init__(self, address, upstream, cache, journal, mode="on", upstream_timeout=300, verbose=False):
+        super().__init__(address, PrestoCacheHandler)
+        self.upstream = upstream.rstrip("/")
+        self.cache = cache
+        self.journal = journal
+        self.mode = mode
+        self.upstream_timeout = upstream_timeout
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.recordings = OrderedDict()
+        self.served = OrderedDict()
+
+    def apply_journal(self):
+        """Invalidate the tables the loaders wrote since the journal was last read."""
+        for event in self.journal.read():
+            dropped = self.cache.invalidate(event.get("tables", []), event.get("event"))
+            if dropped and self.verbose:
+                print(f"{event.get('store')} {event.get('event')} of {', '.join(event.get('tables', []))} "
+                      f"invalidated {dropped} cached results")
+
+    def track(self, queries, query_id, query):
+        """Remember a query by id, forgetting the oldest ones that clients stopped following."""
+        with self.lock:
+            queries[query_id] = query
+            while len(queries) > MAX_TRACKED_QUERIES:
+                queries.popitem(last=False)
+
+def start_presto_cache(upstream, host="127.0.0.1", port=0, memory_mb=DEFAULT_MEMORY_MB, disk_mb=DEFAULT_DISK_MB,
+                       cache_dir=CACHE_DIR, journal_file=LOAD_JOURNAL_FILE, mode="on", verbose=False):
+    """Start the proxy in a background thread and return the server, whose server_port is bound."""
+    cache = ResultCache(int(memory_mb * 1024 * 1024), int(disk_mb * 1024 * 1024), cache_dir)
+    server = PrestoCacheServer((host, port), upstream, cache, JournalFollower(journal_file), mode, verbose=verbose)
+    threading.Thread(target=server.serve_forever, name="presto-cache", daemon=True).start()
+    return server
+
+def default_upstream():
+    return f"http://{os.getenv('PRESTO_HOST')}:{os.getenv('PRESTO_PORT')}"
+
+def times_of(output_path, queries, metric="wallTimes"):
+    """Return the client wall times of every query's result file in a directory."""
+    times = {}
+    for name in queries:
+        path = os.path.join(output_path, f"{name}.json")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                times[name] = [value for value in json.load(file).get(metric) or [] if value is not None]
+    return times
+
+def compare(args):
+    """Run a scenario's queries through an in-process proxy cold and then cached, and save their comparison.
+
+    The cold run forwards every repetition to Presto while storing the results, so the cached
+    run that follows is answered from the cache. Both are compared on the client wall time,
+    since a cached query has no execution on the coordinator.
+    """
+    scenario = load_scenario(args.scenario)
+    if scenario["engine"] != "presto":
+        raise ValueError(f"Scenario {scenario['name']} runs on {scenario['engine']}, the cache proxy is for presto")
+    queries = render_queries(scenario, args.queries)
+    server = start_presto_cache(args.upstream or default_upstream(), memory_mb=args.memory_mb, disk_mb=args.disk_mb,
+                                mode="refresh")
+    path = os.path.join(results_path(scenario), "cache")
+    executor = make_executor(scenario["engine"], scenario.get("settings"))
+    executor.host, executor.port = "127.0.0.1", server.server_port
+    try:
+        cold_run, _ = run_benchmark(scenario, queries, executor, args.warmup, args.repetitions,
+                                    label="cache: cold", output_path=os.path.join(path, "cold"))
+        server.mode = "on"
+        cached_run, _ = run_benchmark(scenario, queries, executor, 0, args.repetitions,
+                                      label="cache: cached", output_path=os.path.join(path, "cached"))
+    finally:
+        executor.close()
+        server.shutdown()
+        server.server_close()
+
+    comparison = compare_runs(times_of(os.path.join(path, "cold"), queries),
+                              times_of(os.path.join(path, "cached"), queries))
+    for query, outcome in comparison.items():
+        print(f"  {outcome['verdict']:<11} {query}: {outcome['baseMedian']:.3f}s -> {outcome['newMedian']:.3f}s "
+              f"({outcome['change']:+.1%})")
+    report = {"coldRun": cold_run, "cachedRun": cached_run, "cache": server.cache.stats(), "queries": comparison}
+    output_file = os.path.join(path, "cache_comparison.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=4)
+    print(f"Cache comparison saved to {output_file}")
+
+def serve(args):
+    server = start_presto_cache(args.upstream or default_upstream(), args.host, args.port, args.memory_mb, args.disk_mb,
+                                args.cache_dir, args.journal, args.mode, verbose=True)
+    print(f"Presto cache proxy for {server.upstream} listening on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Proxy the Presto REST protocol and answer repeated queries from a cache of their result pages.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the proxy until interrupted")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the results spilled to disk")
+    serve_parser.add_argument("--journal", default=LOAD_JOURNAL_FILE, help="load journal the loaders append their writes to")
+    serve_parser.add_argument("--mode", choices=MODES, default="on",
+                              help="serve and store results, only store them, or only forward queries")
+    compare_parser = commands.add_parser("compare", help="measure a scenario's queries cold and cached through the proxy")
+    compare_parser.add_argument("scenario", help="scenario name in benchmark/scenarios or path of a scenario file")
+    compare_parser.add_argument("--queries", nargs="+", help="query names to run (default: all)")
+    compare_parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs of every query before the cold ones")
+    compare_parser.add_argument("--repetitions", type=int, default=5, help="measured runs of every query, cold and cached")
+    for command in (serve_parser, compare_parser):
+        command.add_argument("--upstream", help="Presto coordinator URL (default: PRESTO_HOST and PRESTO_PORT)")
+        command.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="memory budget of cached results")
+        command.add_argument("--disk-mb", type=float, default=DEFAULT_DISK_MB,
+                             help="disk budget of the results spilled from memory, 0 to only keep them in memory")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "serve":
+        serve(args)
+    else:
+        compare(args)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,144 @@
+import time
+import asyncio
+import threading
+import aiohttp
+from plans import presto_operators
+from throughput import parse_presto_duration
+
+# Delays between retries of a request the coordinator answered with 503, as the protocol asks
+RETRY_DELAYS = (0.05, 0.1, 0.2, 0.5, 1.0)
+DEFAULT_POOL_SIZE = 16
+
+class PrestoError(Exception):
+    """A query failed or the coordinator answered with an unexpected status."""
+
+class PrestoClient:
+    """Asynchronous client of the Presto REST protocol that shares one pool of HTTP connections.
+
+    Every nextUri is followed as soon as its response arrives, since the coordinator already
+    holds each request until it has new data or state, and result pages are drained as they
+    come so memory stays constant however many rows a query returns.
+    """
+
+    def __init__(self, host, port, user, catalog=None, schema=None, pool_size=DEFAULT_POOL_SIZE):
+        self.base_url = f"http://{host}:{port}"
+        self.headers = {"X-Presto-User": user}
+        if catalog:
+            self.headers["X-Presto-Catalog"] = catalog
+        if schema:
+            self.headers["X-Presto-Schema"] = schema
+        self.pool_size = pool_size
+        self._session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method, url, data=None):
+        """Send a request, retrying while the coordinator is busy, and return the decoded JSON."""
+        for delay in RETRY_DELAYS + (None,):
+            async with self._session.request(method, url, data=data) as response:
+                if response.status == 200:
+                    return await response.json(content_type=None)
+                if response.status != 503 or delay is None:
+                    raise PrestoError(f"Presto request failed with status {response.status}: {await response.text()}")
+            await asyncio.sleep(delay)
+
+    async def execute(self, query, on_rows=None):
+        """Run a query to completion and return its row count, client wall time, coordinator stats and operators.
+
+        on_rows, when given, is called with the columns and rows of every result page.
+        """
+        started = time.perf_counter()
+        await self.open()
+        response = await self._request("POST", f"{self.base_url}/v1/statement", data=query.encode("utf-8"))
+        query_id = response.get("id")
+        row_count = 0
+        pages = 0
+        columns = None
+        while True:
+            columns = response.get("columns") or columns
+            data = response.get("data")
+            if data:
+                row_count += len(data)
+                pages += 1
+                if on_rows is not None:
+                    on_rows(columns, data)
+            if "error" in response:
+                message = response["error"].get("message", "Unknown error")
+                raise PrestoError(f"Query {query_id} failed: {message}")
+            # Keep following nextUri after the state reads FINISHED, the remaining pages hold results
+            next_uri = response.get("nextUri")
+            if not next_uri:
+                break
+            response = await self._request("GET", next_uri)
+        wall_time = time.perf_counter() - started
+
+        query_info = await self._request("GET", f"{self.base_url}/v1/query/{query_id}")
+        query_stats = query_info.get("queryStats", {})
+        optimizer_plan_data = query_info.get("optimizerInformation", [])
+        return {
+            "queryId": query_id,
+            "state": response.get("stats", {}).get("state", "UNKNOWN"),
+            "rowCount": row_count,
+            "pages": pages,
+            "wallTime": wall_time,
+            "executionTime": parse_presto_duration(query_stats.get("executionTime")),
+            "queuedTime": parse_presto_duration(query_stats.get("queuedTime")),
+            "elapsedTime": parse_presto_duration(query_stats.get("elapsedTime")),
+            "optimizerPlan": list({entry["optimizerName"] for entry in optimizer_plan_data}),
+            "operators": presto_operators(query_info),
+        }
+
+    async def active_workers(self):
+        """Return the number of active workers, the nodes /v1/node lists besides the coordinator itself."""
+        await self.open()
+        nodes = await self._request("GET", f"{self.base_url}/v1/node")
+        return len(nodes)
+
+class BlockingPrestoClient:
+    """Runs a PrestoClient on an event loop in a background thread for synchronous callers.
+
+    It is safe to call execute() from several threads, which then share the connection pool.
+    """
+
+    def __init__(self, host, port, user, catalog=None, schema=None, pool_size=DEFAULT_POOL_SIZE):
+        self.client = PrestoClient(host, port, user, catalog, schema, pool_size)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="presto-client", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def execute(self, query, on_rows=None):
+        return self._run(self.client.execute(query, on_rows))
+
+    def active_workers(self):
+        return self._run(self.client.active_workers())
+
+    def close(self):
+        if self._loop.is_running():
+            self._run(self.client.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop.close()
@@ -3,16 +3,16 @@ WITH customer_total_return
      AS (SELECT sr_customer_sk     AS ctr_customer_sk, 
                 sr_store_sk        AS ctr_store_sk, 
                 Sum(sr_return_amt) AS ctr_total_return
-         FROM   mongo.is_db.store_returns,
-                postgres.public.date_dim
+         FROM   {{store_returns}},
+                {{date_dim}}
          WHERE  sr_returned_date_sk = d_date_sk
                 AND d_year = 2001
          GROUP  BY sr_customer_sk,
                    sr_store_sk)
 SELECT c_customer_id
 FROM   customer_total_return ctr1,
-       postgres.public.store,
-       postgres.public.customer
+       {{store}},
+       {{customer}}
 WHERE  ctr1.ctr_total_return > (SELECT Avg(ctr_total_return) * 1.2
                                 FROM   customer_total_return ctr2
                                 WHERE  ctr1.ctr_store_sk = ctr2.ctr_store_sk)
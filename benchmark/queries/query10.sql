@@ -13,32 +13,32 @@ SELECT cd_gender,
                Count(*) cnt5, 
                cd_dep_college_count, 
                Count(*) cnt6 
-FROM   customer c, 
-       customer_address ca, 
-       customer_demographics 
-WHERE  c.c_current_addr_sk = ca.ca_address_sk 
+FROM   {{customer}} c,
+       {{customer_address}} ca,
+       {{customer_demographics}}
+WHERE  c.c_current_addr_sk = ca.ca_address_sk
        AND ca_county IN ( 'Lycoming County', 'Sheridan County', 
                           'Kandiyohi County', 
                           'Pike County', 
                                            'Greene County' ) 
        AND cd_demo_sk = c.c_current_cdemo_sk 
        AND EXISTS (SELECT * 
-                   FROM   store_sales, 
-                          date_dim 
+                   FROM   {{store_sales}},
+                          {{date_dim}}
                    WHERE  c.c_customer_sk = ss_customer_sk 
                           AND ss_sold_date_sk = d_date_sk 
                           AND d_year = 2002 
                           AND d_moy BETWEEN 4 AND 4 + 3) 
        AND ( EXISTS (SELECT * 
-                     FROM   web_sales, 
-                            date_dim 
+                     FROM   {{web_sales}},
+                            {{date_dim}}
                      WHERE  c.c_customer_sk = ws_bill_customer_sk 
                             AND ws_sold_date_sk = d_date_sk 
                             AND d_year = 2002 
                             AND d_moy BETWEEN 4 AND 4 + 3) 
               OR EXISTS (SELECT * 
-                         FROM   catalog_sales, 
-                                date_dim 
+                         FROM   {{catalog_sales}},
+                                {{date_dim}}
                          WHERE  c.c_customer_sk = cs_ship_customer_sk 
                                 AND cs_sold_date_sk = d_date_sk 
                                 AND d_year = 2002 
@@ -59,4 +59,4 @@ ORDER  BY cd_gender,
           cd_dep_count, 
           cd_dep_employed_count, 
           cd_dep_college_count
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
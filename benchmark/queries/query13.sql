@@ -3,12 +3,12 @@ SELECT Avg(ss_quantity),
        Avg(ss_ext_sales_price), 
        Avg(ss_ext_wholesale_cost), 
        Sum(ss_ext_wholesale_cost) 
-FROM   store_sales, 
-       store, 
-       customer_demographics, 
-       household_demographics, 
-       customer_address, 
-       date_dim 
+FROM   {{store_sales}},
+       {{store}},
+       {{customer_demographics}},
+       {{household_demographics}},
+       {{customer_address}},
+       {{date_dim}}
 WHERE  s_store_sk = ss_store_sk 
        AND ss_sold_date_sk = d_date_sk 
        AND d_year = 2001 
@@ -41,4 +41,4 @@ WHERE  s_store_sk = ss_store_sk
               OR ( ss_addr_sk = ca_address_sk 
                    AND ca_country = 'United States' 
                    AND ca_state IN ( 'GA', 'TX', 'NJ' ) 
-                   AND ss_net_profit BETWEEN 50 AND 250 ) ); 
+                   AND ss_net_profit BETWEEN 50 AND 250 ) )
\ No newline at end of file
@@ -1,13 +1,13 @@
 -- start query 14 in stream 0 using template query14.tpl 
 WITH cross_items 
      AS (SELECT i_item_sk ss_item_sk 
-         FROM   item, 
+         FROM   {{item}},
                 (SELECT iss.i_brand_id    brand_id, 
                         iss.i_class_id    class_id, 
                         iss.i_category_id category_id 
-                 FROM   store_sales, 
-                        item iss, 
-                        date_dim d1 
+                 FROM   {{store_sales}},
+                        {{item}} iss,
+                        {{date_dim}} d1
                  WHERE  ss_item_sk = iss.i_item_sk 
                         AND ss_sold_date_sk = d1.d_date_sk 
                         AND d1.d_year BETWEEN 1999 AND 1999 + 2 
@@ -15,9 +15,9 @@ WITH cross_items
                  SELECT ics.i_brand_id, 
                         ics.i_class_id, 
                         ics.i_category_id 
-                 FROM   catalog_sales, 
-                        item ics, 
-                        date_dim d2 
+                 FROM   {{catalog_sales}},
+                        {{item}} ics,
+                        {{date_dim}} d2
                  WHERE  cs_item_sk = ics.i_item_sk 
                         AND cs_sold_date_sk = d2.d_date_sk 
                         AND d2.d_year BETWEEN 1999 AND 1999 + 2 
@@ -25,9 +25,9 @@ WITH cross_items
                  SELECT iws.i_brand_id, 
                         iws.i_class_id, 
                         iws.i_category_id 
-                 FROM   web_sales, 
-                        item iws, 
-                        date_dim d3 
+                 FROM   {{web_sales}},
+                        {{item}} iws,
+                        {{date_dim}} d3
                  WHERE  ws_item_sk = iws.i_item_sk 
                         AND ws_sold_date_sk = d3.d_date_sk 
                         AND d3.d_year BETWEEN 1999 AND 1999 + 2) 
@@ -38,22 +38,22 @@ WITH cross_items
      AS (SELECT Avg(quantity * list_price) average_sales 
          FROM   (SELECT ss_quantity   quantity, 
                         ss_list_price list_price 
-                 FROM   store_sales, 
-                        date_dim 
+                 FROM   {{store_sales}},
+                        {{date_dim}}
                  WHERE  ss_sold_date_sk = d_date_sk 
                         AND d_year BETWEEN 1999 AND 1999 + 2 
                  UNION ALL 
                  SELECT cs_quantity   quantity, 
                         cs_list_price list_price 
-                 FROM   catalog_sales, 
-                        date_dim 
+                 FROM   {{catalog_sales}},
+                        {{date_dim}}
                  WHERE  cs_sold_date_sk = d_date_sk 
                         AND d_year BETWEEN 1999 AND 1999 + 2 
                  UNION ALL 
                  SELECT ws_quantity   quantity, 
                         ws_list_price list_price 
-                 FROM   web_sales, 
-                        date_dim 
+                 FROM   {{web_sales}},
+                        {{date_dim}}
                  WHERE  ws_sold_date_sk = d_date_sk 
                         AND d_year BETWEEN 1999 AND 1999 + 2) x) 
 SELECT channel, 
@@ -68,9 +68,9 @@ FROM  (SELECT 'store'                          channel,
               i_category_id, 
               Sum(ss_quantity * ss_list_price) sales, 
               Count(*)                         number_sales 
-       FROM   store_sales, 
-              item, 
-              date_dim 
+       FROM   {{store_sales}},
+              {{item}},
+              {{date_dim}}
        WHERE  ss_item_sk IN (SELECT ss_item_sk 
                              FROM   cross_items) 
               AND ss_item_sk = i_item_sk 
@@ -89,9 +89,9 @@ FROM  (SELECT 'store'                          channel,
               i_category_id, 
               Sum(cs_quantity * cs_list_price) sales, 
               Count(*)                         number_sales 
-       FROM   catalog_sales, 
-              item, 
-              date_dim 
+       FROM   {{catalog_sales}},
+              {{item}},
+              {{date_dim}}
        WHERE  cs_item_sk IN (SELECT ss_item_sk 
                              FROM   cross_items) 
               AND cs_item_sk = i_item_sk 
@@ -110,9 +110,9 @@ FROM  (SELECT 'store'                          channel,
               i_category_id, 
               Sum(ws_quantity * ws_list_price) sales, 
               Count(*)                         number_sales 
-       FROM   web_sales, 
-              item, 
-              date_dim 
+       FROM   {{web_sales}},
+              {{item}},
+              {{date_dim}}
        WHERE  ws_item_sk IN (SELECT ss_item_sk 
                              FROM   cross_items) 
               AND ws_item_sk = i_item_sk 
@@ -129,5 +129,4 @@ ORDER  BY channel,
           i_brand_id, 
           i_class_id, 
           i_category_id
-LIMIT 100; 
-
+LIMIT 100
\ No newline at end of file
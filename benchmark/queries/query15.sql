@@ -1,10 +1,10 @@
 -- start query 15 in stream 0 using template query15.tpl 
 SELECT ca_zip, 
                Sum(cs_sales_price) 
-FROM   catalog_sales,
-       customer,
-       customer_address,
-       date_dim
+FROM   {{catalog_sales}},
+       {{customer}},
+       {{customer_address}},
+       {{date_dim}}
 WHERE  cs_bill_customer_sk = c_customer_sk
        AND c_current_addr_sk = ca_address_sk
        AND ( Substr(ca_zip, 1, 5) IN ( '85669', '86197', '88274', '83405',
@@ -17,4 +17,4 @@ WHERE  cs_bill_customer_sk = c_customer_sk
        AND d_year = 1998
 GROUP  BY ca_zip
 ORDER  BY ca_zip
-LIMIT 100;
+LIMIT 100
\ No newline at end of file
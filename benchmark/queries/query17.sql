@@ -26,14 +26,14 @@ SELECT i_item_id,
                catalog_sales_quantitystdev, 
                Stddev_samp(cs_quantity) / Avg(cs_quantity)               AS 
                catalog_sales_quantitycov 
-FROM   store_sales, 
-       store_returns, 
-       catalog_sales, 
-       date_dim d1, 
-       date_dim d2, 
-       date_dim d3, 
-       store, 
-       item 
+FROM   {{store_sales}},
+       {{store_returns}},
+       {{catalog_sales}},
+       {{date_dim}} d1,
+       {{date_dim}} d2,
+       {{date_dim}} d3,
+       {{store}},
+       {{item}}
 WHERE  d1.d_quarter_name = '1999Q1' 
        AND d1.d_date_sk = ss_sold_date_sk 
        AND i_item_sk = ss_item_sk 
@@ -53,4 +53,4 @@ GROUP  BY i_item_id,
 ORDER  BY i_item_id, 
           i_item_desc, 
           s_state
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
@@ -10,13 +10,13 @@ SELECT i_item_id,
                Avg(Cast(cs_net_profit AS decimal(12, 2)))    agg5,
                Avg(Cast(c_birth_year AS decimal(12, 2)))     agg6,
                Avg(Cast(cd1.cd_dep_count AS decimal(12, 2))) agg7
-FROM   cassandra.is_keyspace.catalog_sales,
-       postgres.public.customer_demographics cd1,
-       postgres.public.customer_demographics cd2,
-       postgres.public.customer,
-       mongo.is_db.customer_address,
-       postgres.public.date_dim,
-       postgres.public.item
+FROM   {{catalog_sales}},
+       {{customer_demographics}} cd1,
+       {{customer_demographics}} cd2,
+       {{customer}},
+       {{customer_address}},
+       {{date_dim}},
+       {{item}}
 WHERE  cs_sold_date_sk = d_date_sk 
        AND cs_item_sk = i_item_sk 
        AND cs_bill_cdemo_sk = cd1.cd_demo_sk 
@@ -4,12 +4,12 @@ SELECT i_brand_id              brand_id,
                i_manufact_id, 
                i_manufact, 
                Sum(ss_ext_sales_price) ext_price 
-FROM   date_dim, 
-       store_sales, 
-       item, 
-       customer, 
-       customer_address, 
-       store 
+FROM   {{date_dim}},
+       {{store_sales}},
+       {{item}},
+       {{customer}},
+       {{customer_address}},
+       {{store}}
 WHERE  d_date_sk = ss_sold_date_sk 
        AND ss_item_sk = i_item_sk 
        AND i_manager_id = 38 
@@ -28,4 +28,4 @@ ORDER  BY ext_price DESC,
           i_brand_id, 
           i_manufact_id, 
           i_manufact
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
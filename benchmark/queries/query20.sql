@@ -7,9 +7,9 @@ SELECT
          i_current_price , 
          Sum(cs_ext_sales_price)                                                              AS itemrevenue ,
          Sum(cs_ext_sales_price)*100/Sum(Sum(cs_ext_sales_price)) OVER (partition BY i_class) AS revenueratio
-FROM     catalog_sales , 
-         item , 
-         date_dim 
+FROM     {{catalog_sales}} ,
+         {{item}} ,
+         {{date_dim}}
 WHERE    cs_item_sk = i_item_sk 
 AND      i_category IN ('Children', 
                         'Women', 
@@ -27,5 +27,4 @@ ORDER BY i_category ,
          i_item_id , 
          i_item_desc , 
          revenueratio 
-LIMIT 100; 
-
+LIMIT 100
\ No newline at end of file
@@ -4,10 +4,10 @@ SELECT i_product_name,
                i_class, 
                i_category, 
                Avg(inv_quantity_on_hand) qoh 
-FROM   inventory, 
-       date_dim, 
-       item, 
-       warehouse 
+FROM   {{inventory}},
+       {{date_dim}},
+       {{item}},
+       {{warehouse}}
 WHERE  inv_date_sk = d_date_sk 
        AND inv_item_sk = i_item_sk 
        AND inv_warehouse_sk = w_warehouse_sk 
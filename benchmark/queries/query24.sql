@@ -11,12 +11,12 @@ WITH ssales
                 i_units,
                 i_size,
                 Sum(ss_net_profit) netpaid
-         FROM   cassandra.is_keyspace.store_sales,
-                mongo.is_db.store_returns,
-                postgres.public.store,
-                postgres.public.item,
-                postgres.public.customer,
-                mongo.is_db.customer_address
+         FROM   {{store_sales}},
+                {{store_returns}},
+                {{store}},
+                {{item}},
+                {{customer}},
+                {{customer_address}}
          WHERE  ss_ticket_number = sr_ticket_number
                 AND ss_item_sk = sr_item_sk
                 AND ss_customer_sk = c_customer_sk
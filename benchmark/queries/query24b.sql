@@ -10,12 +10,12 @@ WITH ssales
                 i_units,
                 i_size,
                 Sum(ss_net_profit) netpaid
-         FROM   store_sales,
-                store_returns,
-                store,
-                item,
-                customer,
-                customer_address
+         FROM   {{store_sales}},
+                {{store_returns}},
+                {{store}},
+                {{item}},
+                {{customer}},
+                {{customer_address}}
          WHERE  ss_ticket_number = sr_ticket_number
                 AND ss_item_sk = sr_item_sk
                 AND ss_customer_sk = c_customer_sk
@@ -44,4 +44,4 @@ GROUP  BY c_last_name,
           c_first_name,
           s_store_name
 HAVING Sum(netpaid) > (SELECT 0.05 * Avg(netpaid)
-                       FROM   ssales);
\ No newline at end of file
+                       FROM   ssales)
\ No newline at end of file
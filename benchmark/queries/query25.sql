@@ -6,14 +6,14 @@ SELECT i_item_id,
                Max(ss_net_profit) AS store_sales_profit, 
                Max(sr_net_loss)   AS store_returns_loss, 
                Max(cs_net_profit) AS catalog_sales_profit 
-FROM   store_sales, 
-       store_returns, 
-       catalog_sales, 
-       date_dim d1, 
-       date_dim d2, 
-       date_dim d3, 
-       store, 
-       item 
+FROM   {{store_sales}},
+       {{store_returns}},
+       {{catalog_sales}},
+       {{date_dim}} d1,
+       {{date_dim}} d2,
+       {{date_dim}} d3,
+       {{store}},
+       {{item}}
 WHERE  d1.d_moy = 4 
        AND d1.d_year = 2001 
        AND d1.d_date_sk = ss_sold_date_sk 
@@ -38,4 +38,4 @@ ORDER  BY i_item_id,
           i_item_desc, 
           s_store_id, 
           s_store_name
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
@@ -4,11 +4,11 @@ SELECT i_item_id,
                Avg(cs_list_price)  agg2, 
                Avg(cs_coupon_amt)  agg3, 
                Avg(cs_sales_price) agg4 
-FROM   catalog_sales, 
-       customer_demographics, 
-       date_dim, 
-       item, 
-       promotion 
+FROM   {{catalog_sales}},
+       {{customer_demographics}},
+       {{date_dim}},
+       {{item}},
+       {{promotion}}
 WHERE  cs_sold_date_sk = d_date_sk 
        AND cs_item_sk = i_item_sk 
        AND cs_bill_cdemo_sk = cd_demo_sk 
@@ -21,4 +21,4 @@ WHERE  cs_sold_date_sk = d_date_sk
        AND d_year = 2000 
 GROUP  BY i_item_id 
 ORDER  BY i_item_id
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
@@ -6,11 +6,11 @@ SELECT i_item_id,
                Avg(ss_list_price)  agg2, 
                Avg(ss_coupon_amt)  agg3, 
                Avg(ss_sales_price) agg4 
-FROM   store_sales, 
-       customer_demographics, 
-       date_dim, 
-       store, 
-       item 
+FROM   {{store_sales}},
+       {{customer_demographics}},
+       {{date_dim}},
+       {{store}},
+       {{item}}
 WHERE  ss_sold_date_sk = d_date_sk 
        AND ss_item_sk = i_item_sk 
        AND ss_store_sk = s_store_sk 
@@ -24,4 +24,4 @@ WHERE  ss_sold_date_sk = d_date_sk
 GROUP  BY rollup ( i_item_id, s_state ) 
 ORDER  BY i_item_id, 
           s_state
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
@@ -6,14 +6,14 @@ SELECT i_item_id,
                Avg(ss_quantity)        AS store_sales_quantity, 
                Avg(sr_return_quantity) AS store_returns_quantity, 
                Avg(cs_quantity)        AS catalog_sales_quantity 
-FROM   store_sales, 
-       store_returns, 
-       catalog_sales, 
-       date_dim d1, 
-       date_dim d2, 
-       date_dim d3, 
-       store, 
-       item 
+FROM   {{store_sales}},
+       {{store_returns}},
+       {{catalog_sales}},
+       {{date_dim}} d1,
+       {{date_dim}} d2,
+       {{date_dim}} d3,
+       {{store}},
+       {{item}}
 WHERE  d1.d_moy = 4 
        AND d1.d_year = 1998 
        AND d1.d_date_sk = ss_sold_date_sk 
@@ -37,4 +37,4 @@ ORDER  BY i_item_id,
           i_item_desc, 
           s_store_id, 
           s_store_name
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
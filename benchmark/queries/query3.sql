@@ -3,9 +3,9 @@ SELECT dt.d_year,
                item.i_brand_id          brand_id, 
                item.i_brand             brand, 
                Sum(ss_ext_discount_amt) sum_agg 
-FROM   date_dim dt, 
-       store_sales, 
-       item 
+FROM   {{date_dim}} dt,
+       {{store_sales}},
+       {{item}}
 WHERE  dt.d_date_sk = store_sales.ss_sold_date_sk 
        AND store_sales.ss_item_sk = item.i_item_sk 
        AND item.i_manufact_id = 427 
@@ -16,4 +16,4 @@ GROUP  BY dt.d_year,
 ORDER  BY dt.d_year, 
           sum_agg DESC, 
           brand_id
-LIMIT 100;
+LIMIT 100
\ No newline at end of file
@@ -3,9 +3,9 @@ WITH customer_total_return
      AS (SELECT wr_returning_customer_sk AS ctr_customer_sk, 
                 ca_state                 AS ctr_state, 
                 Sum(wr_return_amt)       AS ctr_total_return 
-         FROM   web_returns, 
-                date_dim, 
-                customer_address 
+         FROM   {{web_returns}},
+                {{date_dim}},
+                {{customer_address}}
          WHERE  wr_returned_date_sk = d_date_sk 
                 AND d_year = 2000 
                 AND wr_returning_addr_sk = ca_address_sk 
@@ -24,9 +24,9 @@ SELECT c_customer_id,
                c_email_address, 
                c_last_review_date, 
                ctr_total_return 
-FROM   customer_total_return ctr1, 
-       customer_address, 
-       customer 
+FROM   customer_total_return ctr1,
+       {{customer_address}},
+       {{customer}}
 WHERE  ctr1.ctr_total_return > (SELECT Avg(ctr_total_return) * 1.2 
                                 FROM   customer_total_return ctr2 
                                 WHERE  ctr1.ctr_state = ctr2.ctr_state) 
@@ -46,4 +46,4 @@ ORDER  BY c_customer_id,
           c_email_address, 
           c_last_review_date, 
           ctr_total_return
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
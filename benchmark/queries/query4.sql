@@ -16,9 +16,9 @@ WITH year_total
                       + 
                           ss_ext_sales_price ) / 2) year_total, 
                 's'                                 sale_type 
-         FROM   customer, 
-                store_sales, 
-                date_dim 
+         FROM   {{customer}},
+                {{store_sales}},
+                {{date_dim}}
          WHERE  c_customer_sk = ss_customer_sk 
                 AND ss_sold_date_sk = d_date_sk 
          GROUP  BY c_customer_id, 
@@ -49,9 +49,9 @@ WITH year_total
                         ) + 
                               cs_ext_sales_price ) / 2 )) year_total, 
                 'c'                                       sale_type 
-         FROM   customer, 
-                catalog_sales, 
-                date_dim 
+         FROM   {{customer}},
+                {{catalog_sales}},
+                {{date_dim}}
          WHERE  c_customer_sk = cs_bill_customer_sk 
                 AND cs_sold_date_sk = d_date_sk 
          GROUP  BY c_customer_id, 
@@ -82,9 +82,9 @@ WITH year_total
                         ) + 
                               ws_ext_sales_price ) / 2 )) year_total, 
                 'w'                                       sale_type 
-         FROM   customer, 
-                web_sales, 
-                date_dim 
+         FROM   {{customer}},
+                {{web_sales}},
+                {{date_dim}}
          WHERE  c_customer_sk = ws_bill_customer_sk 
                 AND ws_sold_date_sk = d_date_sk 
          GROUP  BY c_customer_id, 
@@ -149,4 +149,4 @@ ORDER  BY t_s_secyear.customer_id,
           t_s_secyear.customer_first_name, 
           t_s_secyear.customer_last_name, 
           t_s_secyear.customer_preferred_cust_flag
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
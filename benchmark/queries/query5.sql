@@ -13,7 +13,7 @@ WITH ssr AS
                                 ss_net_profit           AS profit, 
                                 Cast(0 AS DECIMAL(7,2)) AS return_amt, 
                                 Cast(0 AS DECIMAL(7,2)) AS net_loss 
-                         FROM   cassandra.is_keyspace.store_sales
+                         FROM   {{store_sales}}
                          UNION ALL
                          SELECT sr_store_sk             AS store_sk,
                                 sr_returned_date_sk     AS date_sk,
@@ -21,9 +21,9 @@ WITH ssr AS
                                 Cast(0 AS DECIMAL(7,2)) AS profit,
                                 sr_return_amt           AS return_amt,
                                 sr_net_loss             AS net_loss
-                         FROM   mongo.is_db.store_returns ) salesreturns,
-                  postgres.public.date_dim,
-                  postgres.public.store
+                         FROM   {{store_returns}} ) salesreturns,
+                  {{date_dim}},
+                  {{store}}
          WHERE    date_sk = d_date_sk
          AND      d_date BETWEEN Cast('2002-08-22' AS DATE) AND      (
                            Cast('2002-08-22' AS DATE) + INTERVAL '14' day)
@@ -42,7 +42,7 @@ WITH ssr AS
                                 cs_net_profit           AS profit,
                                 cast(0 AS decimal(7,2)) AS return_amt,
                                 cast(0 AS decimal(7,2)) AS net_loss
-                         FROM   cassandra.is_keyspace.catalog_sales
+                         FROM   {{catalog_sales}}
                          UNION ALL
                          SELECT cr_catalog_page_sk      AS page_sk,
                                 cr_returned_date_sk     AS date_sk,
@@ -50,9 +50,9 @@ WITH ssr AS
                                 cast(0 AS decimal(7,2)) AS profit,
                                 cr_return_amount        AS return_amt,
                                 cr_net_loss             AS net_loss
-                         FROM   mongo.is_db.catalog_returns ) salesreturns,
-                  postgres.public.date_dim,
-                  postgres.public.catalog_page
+                         FROM   {{catalog_returns}} ) salesreturns,
+                  {{date_dim}},
+                  {{catalog_page}}
          WHERE    date_sk = d_date_sk
          AND      d_date BETWEEN cast('2002-08-22' AS date) AND      (
                            cast('2002-08-22' AS date) + INTERVAL '14' day)
@@ -71,7 +71,7 @@ WITH ssr AS
                                 ws_net_profit           AS profit,
                                 cast(0 AS decimal(7,2)) AS return_amt,
                                 cast(0 AS decimal(7,2)) AS net_loss
-                         FROM   cassandra.is_keyspace.web_sales
+                         FROM   {{web_sales}}
                          UNION ALL
                          SELECT          ws_web_site_sk          AS wsr_web_site_sk,
                                          wr_returned_date_sk     AS date_sk,
@@ -79,13 +79,13 @@ WITH ssr AS
                                          cast(0 AS decimal(7,2)) AS profit,
                                          wr_return_amt           AS return_amt,
                                          wr_net_loss             AS net_loss
-                         FROM            mongo.is_db.web_returns
-                         LEFT OUTER JOIN cassandra.is_keyspace.web_sales
+                         FROM            {{web_returns}}
+                         LEFT OUTER JOIN {{web_sales}}
                          ON              (
                                                          wr_item_sk = ws_item_sk
                                          AND             wr_order_number = ws_order_number) ) salesreturns,
-                  postgres.public.date_dim,
-                  postgres.public.web_site
+                  {{date_dim}},
+                  {{web_site}}
          WHERE    date_sk = d_date_sk
          AND      d_date BETWEEN cast('2002-08-22' AS date) AND      (
                            cast('2002-08-22' AS date) + INTERVAL '14' day)
@@ -1,21 +1,21 @@
 -- start query 6 in stream 0 using template query6.tpl 
 SELECT a.ca_state state, 
                Count(*)   cnt 
-FROM   mongo.is_db.customer_address a,
-       postgres.public.customer c,
-       cassandra.is_keyspace.store_sales s,
-       postgres.public.date_dim d,
-       postgres.public.item i
+FROM   {{customer_address}} a,
+       {{customer}} c,
+       {{store_sales}} s,
+       {{date_dim}} d,
+       {{item}} i
 WHERE  a.ca_address_sk = c.c_current_addr_sk
        AND c.c_customer_sk = s.ss_customer_sk
        AND s.ss_sold_date_sk = d.d_date_sk
        AND s.ss_item_sk = i.i_item_sk
        AND d.d_month_seq = (SELECT DISTINCT ( d_month_seq )
-                            FROM   postgres.public.date_dim
+                            FROM   {{date_dim}}
                             WHERE  d_year = 1998
                                    AND d_moy = 7)
        AND i.i_current_price > 1.2 * (SELECT Avg(j.i_current_price)
-                                      FROM   postgres.public.item j
+                                      FROM   {{item}} j
                                       WHERE  j.i_category = i.i_category)
 GROUP  BY a.ca_state
 HAVING Count(*) >= 10
@@ -4,11 +4,11 @@ SELECT i_item_id,
                Avg(ss_list_price)  agg2, 
                Avg(ss_coupon_amt)  agg3, 
                Avg(ss_sales_price) agg4 
-FROM   store_sales, 
-       customer_demographics, 
-       date_dim, 
-       item, 
-       promotion 
+FROM   {{store_sales}},
+       {{customer_demographics}},
+       {{date_dim}},
+       {{item}},
+       {{promotion}}
 WHERE  ss_sold_date_sk = d_date_sk 
        AND ss_item_sk = i_item_sk 
        AND ss_cdemo_sk = cd_demo_sk 
@@ -21,4 +21,4 @@ WHERE  ss_sold_date_sk = d_date_sk
        AND d_year = 1998 
 GROUP  BY i_item_id 
 ORDER  BY i_item_id
-LIMIT 100; 
+LIMIT 100
\ No newline at end of file
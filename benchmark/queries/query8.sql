@@ -1,12 +1,12 @@
 -- start query 8 in stream 0 using template query8.tpl 
 SELECT s_store_name, 
                Sum(ss_net_profit) 
-FROM   store_sales, 
-       date_dim, 
-       store, 
+FROM   {{store_sales}},
+       {{date_dim}},
+       {{store}},
        (SELECT ca_zip 
         FROM   (SELECT Substr(ca_zip, 1, 5) ca_zip 
-                FROM   customer_address 
+                FROM   {{customer_address}}
                 WHERE  Substr(ca_zip, 1, 5) IN ( '67436', '26121', '38443', 
                                                  '63157', 
                                                  '68856', '19485', '86425', 
@@ -211,9 +211,9 @@ FROM   store_sales,
                 SELECT ca_zip 
                 FROM   (SELECT Substr(ca_zip, 1, 5) ca_zip, 
                                Count(*)             cnt 
-                        FROM   customer_address, 
-                               customer 
-                        WHERE  ca_address_sk = c_current_addr_sk 
+                        FROM   {{customer_address}},
+                               {{customer}}
+                        WHERE  ca_address_sk = c_current_addr_sk
                                AND c_preferred_cust_flag = 'Y' 
                         GROUP  BY ca_zip 
                         HAVING Count(*) > 10)A1)A2) V1 
@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import math
+import sqlite3
+import argparse
+import itertools
+import subprocess
+import statistics
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESULTS_LOCAL_PATH = os.getenv("RESULTS_LOCAL_PATH")
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH") or os.path.join(RESULTS_LOCAL_PATH or ".", "results.sqlite")
+
+# Changes smaller than this fraction of the base median are never reported, however significant
+DEFAULT_MIN_CHANGE = 0.05
+DEFAULT_ALPHA = 0.05
+# Largest number of rank arrangements the exact Mann-Whitney test enumerates before approximating
+EXACT_TEST_LIMIT = 200000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario TEXT NOT NULL,
+    engine TEXT,
+    workers INTEGER,
+    git_revision TEXT,
+    started_at TEXT NOT NULL,
+    label TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_scenario ON runs (scenario, started_at);
+CREATE INDEX IF NOT EXISTS runs_workers ON runs (scenario, workers);
+CREATE INDEX IF NOT EXISTS runs_git_revision ON runs (git_revision);
+CREATE TABLE IF NOT EXISTS query_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    query TEXT NOT NULL,
+    execution_times TEXT NOT NULL,
+    wall_times TEXT,
+    median REAL,
+    p95 REAL,
+    errors INTEGER NOT NULL DEFAULT 0,
+    row_count INTEGER,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, query)
+);
+CREATE INDEX IF NOT EXISTS query_results_query ON query_results (query, run_id);
+"""
+
+def git_revision():
+    """Return the current git revision, marked -dirty when the work tree has changes, or None outside git."""
+    try:
+        repo_dir = os.path.dirname(os.path.abspath(__file__))
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo_dir, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        return f"{revision}-dirty" if status else revision
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class ResultStore:
+    """Append-only store of benchmark runs and their per-query latency distributions in SQLite."""
+
+    def __init__(self, db_path=RESULTS_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, scenario, engine=None, workers=None, label=None):
+        """Record a new run and return its id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (scenario, engine, workers, git_revision, started_at, label) VALUES (?, ?, ?, ?, ?, ?)",
+                (scenario, engine, workers, git_revision(), _now(), label))
+        return cursor.lastrowid
+
+    def add_query_result(self, run_id, query, result):
+        """Record the result of a query in a run, as written to its result file by the harness."""
+        execution_stats = result.get("statistics", {}).get("executionTime", {})
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO query_results (run_id, query, execution_times, wall_times, median, p95, errors, row_count,"
+                " recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, query, json.dumps(result.get("executionTimes", [])),
+                 json.dumps(result["wallTimes"]) if "wallTimes" in result else None,
+                 execution_stats.get("median"), execution_stats.get("p95"), execution_stats.get("errors", 0),
+                 result.get("rowCount"), _now()))
+
+    def runs(self, scenario=None, workers=None, limit=None, label=None):
+        """Return the runs, newest first, optionally of one scenario, worker count and label.
+
+        A label of "" only returns the runs recorded without one.
+        """
+        sql = "SELECT runs.*, COUNT(query_results.query) AS queries FROM runs LEFT JOIN query_results ON run_id = id"
+        conditions, parameters = [], []
+        if label == "":
+            conditions.append("(label IS NULL OR label = '')")
+        elif label is not None:
+            conditions.append("label = ?")
+            parameters.append(label)
+        if scenario is not None:
+            conditions.append("scenario = ?")
+            parameters.append(scenario)
+        if workers is not None:
+            conditions.append("workers = ?")
+            parameters.append(workers)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " GROUP BY id ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, parameters)]
+
+    def run(self, run_id):
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"No run with id {run_id}")
+        return dict(row)
+
+    def query_times(self, run_id):
+        """Return the measured execution times of every query of a run."""
+        rows = self.conn.execute("SELECT query, execution_times FROM query_results WHERE run_id = ?", (run_id,))
+        return {row["query"]: [value for value in json.loads(row["execution_times"]) if value is not None] for row in rows}
+
+def _normal_cdf(value):
+    return 0.5 * (1 + math.erf(value / math.sqrt(2)))
+
+def mann_whitney_u(first, second):
+    """Return the U statistic of first and the two-sided p-value of the Mann-Whitney U test.
+
+    Small samples, like the few repetitions of a benchmark run, use the exact distribution of U
+    over every arrangement of the ranks; larger ones use the normal approximation with a tie
+    correction.
+    """
+    n1, n2 = len(first), len(second)
+    combined = sorted((value, group) for group, values in enumerate((first, second)) for value in values)
+    ranks = [0.0] * len(combined)
+    index = 0
+    tie_term = 0
+    while index < len(combined):
+        end = index
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[index][0]:
+            end += 1
+        for position in range(index, end + 1):
+            ranks[position] = (index + end) / 2 + 1
+        tie_term += (end - index + 1) ** 3 - (end - index + 1)
+        index = end + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean_u = n1 * n2 / 2
+
+    if math.comb(n1 + n2, n1) <= EXACT_TEST_LIMIT:
+        observed = abs(u - mean_u)
+        extreme = 0
+        total = 0
+        for positions in itertools.combinations(range(n1 + n2), n1):
+            total += 1
+            arranged_u = sum(ranks[position] for position in positions) - n1 * (n1 + 1) / 2
+            if abs(arranged_u - mean_u) >= observed - 1e-9:
+                extreme += 1
+        return u, extreme / total
+
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (abs(u - mean_u) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, 2 * (1 - _normal_cdf(z)))
+
+def compare_runs(base_times, new_times, alpha=DEFAULT_ALPHA, min_change=DEFAULT_MIN_CHANGE):
+    """Classify every query both runs measured as a regression, an improvement or unchanged.
+
+    A change is reported when the Mann-Whitney test finds the two samples different at alpha and
+    the medians differ by more than min_change of the base median.
+    """
+    comparison = {}
+    for query in sorted(set(base_times) & set(new_times)):
+        base, new = base_times[query], new_times[query]
+        if not base or not new:
+            continue
+        base_median, new_median = statistics.median(base), statistics.median(new)
+        change = (new_median - base_median) / base_median if base_median > 0 else 0.0
+        _, p_value = mann_whitney_u(base, new)
+        if p_value < alpha and abs(change) > min_change:
+            verdict = "regression" if change > 0 else "improvement"
+        else:
+            verdict = "unchanged"
+        comparison[query] = {
+            "baseMedian": base_median,
+            "newMedian": new_median,
+            "change": change,
+            "pValue": p_value,
+            "verdict": verdict,
+        }
+    return comparison
+
+def describe_run(run):
+    workers = f", {run['workers']} workers" if run.get("workers") is not None else ""
+    label = f", {run['label']}" if run.get("label") else ""
+    return f"run {run['id']} ({run['scenario']}{workers}, {run['git_revision'] or 'no revision'}, {run['started_at']}{label})"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="List benchmark runs and compare the latencies of two of them.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = subparsers.add_parser("runs", help="list the recorded runs, newest first")
+    runs_parser.add_argument("--scenario", help="only list runs of this scenario")
+    runs_parser.add_argument("--workers", type=int, help="only list runs with this many Presto workers")
+    runs_parser.add_argument("--label", help="only list runs with this label")
+    runs_parser.add_argument("--limit", type=int, default=20)
+
+    compare_parser = subparsers.add_parser("compare", help="flag significant latency changes between two runs")
+    compare_parser.add_argument("runs", nargs="*", type=int,
+                                help="ids of the base and new runs (default: the two latest runs of --scenario)")
+    compare_parser.add_argument("--scenario", help="scenario whose two latest runs to compare")
+    compare_parser.add_argument("--workers", type=int, help="only consider runs with this many Presto workers")
+    compare_parser.add_argument("--label", default="",
+                                help="only consider runs with this label, like 'rollups: on' (default: unlabeled runs, "
+                                     "so the runs of the tuning, rollup and cache tools are not compared with them)")
+    compare_parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="significance level of the test")
+    compare_parser.add_argument("--min-change", type=float, default=DEFAULT_MIN_CHANGE,
+                                help="smallest relative change of the median to report")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    store = ResultStore()
+    try:
+        if args.command == "runs":
+            for run in store.runs(args.scenario, args.workers, args.limit, args.label):
+                print(f"{describe_run(run)}: {run['queries']} queries")
+            return
+
+        if len(args.runs) == 2:
+            base_run, new_run = store.run(args.runs[0]), store.run(args.runs[1])
+        elif not args.runs and args.scenario:
+            latest = store.runs(args.scenario, args.workers, limit=2, label=args.label)
+            if len(latest) < 2:
+                labelled = f"labelled '{args.label}'" if args.label else "without a label"
+                raise ValueError(f"Scenario {args.scenario} has fewer than two recorded runs {labelled}")
+            new_run, base_run = latest
+        else:
+            raise ValueError("Give the ids of two runs or a --scenario")
+
+        comparison = compare_runs(store.query_times(base_run["id"]), store.query_times(new_run["id"]),
+                                  args.alpha, args.min_change)
+        print(f"Comparing {describe_run(new_run)} with {describe_run(base_run)}")
+        for query, outcome in comparison.items():
+            if outcome["verdict"] != "unchanged":
+                print(f"  {outcome['verdict']:<11} {query}: {outcome['baseMedian']:.3f}s -> {outcome['newMedian']:.3f}s "
+                      f"({outcome['change']:+.1%}, p={outcome['pValue']:.3f})")
+        verdicts = [outcome["verdict"] for outcome in comparison.values()]
+        print(f"{verdicts.count('regression')} regressions, {verdicts.count('improvement')} improvements, "
+              f"{verdicts.count('unchanged')} unchanged of {len(comparison)} queries")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,454 @@
+import os
+import re
+import sys
+import json
+import argparse
+from collections import defaultdict
+import psycopg
+from dotenv import load_dotenv
+from executors import PostgresExecutor, make_executor
+from harness import (BENCHMARK_DIR, TABLE_PLACEHOLDER_PATTERN, load_query_templates, load_scenario, qualify_table,
+                     render_query, results_path, run_benchmark, table_locations)
+from index_advisor import load_postgres_schema, object_name
+from result_store import ResultStore, compare_runs
+from verify import DEFAULT_PRECISION, ResultHasher
+
+load_dotenv()
+
+ROLLUPS_FILE = os.path.join(BENCHMARK_DIR, "rollups.json")
+# Tables built by this module, so --drop removes only those
+ROLLUP_PREFIX = "rollup_"
+# Store the rollups are built in, the one with indexes and a planner for small tables
+ROLLUP_STORE = "postgres"
+DEFAULT_MIN_QUERIES = 2
+DEFAULT_MAX_KEYS = 3
+# A rollup is only kept when it has at most 1/min_reduction of the rows of its source
+DEFAULT_MIN_REDUCTION = 2.0
+
+# Aggregates whose value over a rollup differs from their value over the rows it sums up
+OTHER_AGGREGATE_PATTERN = re.compile(r"\b(?:count|avg|min|max|stddev\w*|var_\w+|variance)\s*\(")
+# Operations that remove duplicate rows, which a rollup has fewer of
+DEDUPLICATION_PATTERN = re.compile(r"\bunion\b(?!\s+all\b)|\bintersect\b|\bexcept\b|\bdistinct\b")
+CLAUSE_PATTERN = re.compile(r"[()]|\b(?:select|from|where|group|order|having|on|partition)\b")
+# Words that can precede a column without making it an alias definition
+KEYWORDS = {"select", "distinct", "then", "else", "when", "and", "or", "not", "by", "on", "where", "from", "in",
+            "is", "case", "as", "having", "between", "like", "all", "union", "join", "set"}
+FOLLOWING_KEYWORDS = ("where", "group", "order", "having", "limit", "union", "join", "inner", "left", "right",
+                      "full", "cross", "on", "natural", "except", "intersect", "window")
+
+def normalize(template):
+    """Replace the table placeholders by their names, drop comments, and lower-case a query template."""
+    sql = TABLE_PLACEHOLDER_PATTERN.sub(lambda match: match.group(1), template)
+    return re.sub(r"--[^\n]*", "", sql).lower()
+
+def fact_tables(schema):
+    """Return the key and measure columns of every fact table, the tables without a single surrogate key.
+
+    Keys are the *_sk columns, and measures the decimal columns. Integer columns are left out,
+    since on PostgreSQL the sum of their sums is numeric where their sum is bigint, which would
+    turn integer divisions of the totals into exact ones.
+    """
+    facts = {}
+    for table_name, table in schema.items():
+        if len(table["primaryKey"]) == 1 and table["primaryKey"][0].endswith("_sk"):
+            continue
+        keys = [column for column in table["columns"] if column.endswith("_sk")]
+        measures = [column for column in table["columns"] if table["types"][column].startswith(("decimal", "numeric"))]
+        if keys and measures:
+            facts[table_name] = {"columns": table["columns"], "keys": keys, "measures": measures,
+                                 "primaryKey": table["primaryKey"]}
+    return facts
+
+def enclosing_functions(sql, position):
+    """Return the (name, open parenthesis position) of every call a position of the SQL is nested in, innermost first."""
+    functions = []
+    depth = 0
+    for index in range(position - 1, -1, -1):
+        if sql[index] == ")":
+            depth += 1
+        elif sql[index] == "(":
+            if depth:
+                depth -= 1
+                continue
+            name = re.search(r"(\w+)\s*$", sql[:index])
+            functions.append((name.group(1) if name else "", index))
+    return functions
+
+def closing_parenthesis(sql, open_position):
+    depth = 0
+    for index in range(open_position, len(sql)):
+        if sql[index] == "(":
+            depth += 1
+        elif sql[index] == ")":
+            depth -= 1
+            if not depth:
+                return index
+    return len(sql)
+
+def enclosing_clause(sql, position):
+    """Return the clause keyword a position of the SQL is in, or '(' when it is inside parentheses of that clause."""
+    depth = 0
+    for match in reversed(list(CLAUSE_PATTERN.finditer(sql, 0, position))):
+        token = match.group(0)
+        if token == ")":
+            depth += 1
+        elif token == "(":
+            if not depth:
+                return "("
+            depth -= 1
+        elif not depth:
+            return token
+    return None
+
+def is_alias_definition(sql, start):
+    """Tell whether a name at a position is the alias given to the expression before it."""
+    before = re.search(r"(\w+|\))\s+(?:as\s+)?$", sql[:start])
+    return before is not None and before.group(1) not in KEYWORDS and not sql[:before.start()].rstrip().endswith(".")
+
+def projection_alias(sql, start, end):
+    """Return the name a column is selected under when it is selected as is, or None for any other use."""
+    if enclosing_clause(sql, start) != "select":
+        return None
+    before = sql[:start].rstrip()
+    if not (before.endswith(",") or re.search(r"\bselect$", before)):
+        return None
+    after = re.match(r"\s*(?:(?:as\s+)?(?!from\b)(\w+)\s*)?(?:,|\bfrom\b)", sql[end:])
+    if after is None:
+        return None
+    return after.group(1) or sql[start:end]
+
+def summed_only(sql, name, measures, seen=frozenset()):
+    """Tell whether every value of a measure, or of an alias it is selected under, only reaches the result through SUM().
+
+    A summed use must be a plain aggregate, not a window over the rows, and must not multiply or
+    divide the measure by another measure, since a sum of products is not a product of sums.
+    A column selected as is, possibly under another name, must be summed under that name.
+    """
+    summed = False
+    for occurrence in re.finditer(rf"(?<!\w){name}\b", sql):
+        start, end = occurrence.span()
+        if name not in measures and is_alias_definition(sql, start):
+            continue
+        sums = [position for function, position in enclosing_functions(sql, start) if function == "sum"]
+        if sums:
+            closing = closing_parenthesis(sql, sums[0])
+            if re.match(r"\s*over\b", sql[closing + 1:]):
+                return False
+            argument = sql[sums[0] + 1:closing]
+            others = {word for word in re.findall(r"\w+", argument) if word != name and (word in measures or word in seen)}
+            if others and re.search(r"[*/]", argument):
+                return False
+            summed = True
+            continue
+        alias = projection_alias(sql, start, end)
+        if alias is None:
+            return False
+        if alias == name or alias in seen:
+            continue
+        if not summed_only(sql, alias, measures, seen | {alias}):
+            return False
+        summed = True
+    return summed
+
+def query_rollup_needs(template, facts):
+    """Return the key columns and summed measures every fact table of a query needs from a rollup of it.
+
+    A fact table qualifies when every column of it the query reads is a key, which a rollup
+    groups by, or a measure that only reaches the result through SUM(), which gives the same
+    total over rollup rows. Queries with other aggregates or with duplicate removal do not
+    qualify at all.
+    """
+    sql = normalize(template)
+    if OTHER_AGGREGATE_PATTERN.search(sql) or DEDUPLICATION_PATTERN.search(sql):
+        return {}
+    all_measures = {measure for fact in facts.values() for measure in fact["measures"]}
+    words = set(re.findall(r"\w+", sql))
+    needs = {}
+    for table_name in set(TABLE_PLACEHOLDER_PATTERN.findall(template)):
+        if table_name not in facts:
+            continue
+        fact = facts[table_name]
+        columns = {column for column in fact["columns"] if column in words}
+        keys = [column for column in fact["keys"] if column in columns]
+        measures = [column for column in fact["measures"] if column in columns]
+        if columns - set(keys) - set(measures) or not measures:
+            continue
+        if all(summed_only(sql, measure, all_measures) for measure in measures):
+            needs[table_name] = {"keys": keys, "measures": measures}
+    return needs
+
+def design_rollups(templates, facts, min_queries=DEFAULT_MIN_QUERIES, max_keys=DEFAULT_MAX_KEYS):
+    """Pick the rollups that serve the most queries, grouping every fact table by as few keys as possible.
+
+    The key set of every query is a candidate, and serves every query whose keys it contains.
+    The candidate serving the most remaining queries, with the fewest keys on ties, is picked
+    until no candidate serves min_queries queries. A rollup sums every measure its queries use,
+    and key sets containing the whole primary key are left out, as they would not reduce anything.
+    """
+    by_table = defaultdict(dict)
+    for name, template in templates.items():
+        for table_name, need in query_rollup_needs(template, facts).items():
+            if len(need["keys"]) <= max_keys and not set(facts[table_name]["primaryKey"]) <= set(need["keys"]):
+                by_table[table_name][name] = need
+
+    rollups = {}
+    for table_name, needs in sorted(by_table.items()):
+        remaining = dict(needs)
+        while remaining:
+            candidates = {tuple(need["keys"]) for need in remaining.values()}
+            served = {keys: [name for name, need in remaining.items() if set(need["keys"]) <= set(keys)]
+                      for keys in candidates}
+            keys = min(served, key=lambda keys: (-len(served[keys]), len(keys), keys))
+            if len(served[keys]) < min_queries:
+                break
+            measures = {measure for name in served[keys] for measure in remaining[name]["measures"]}
+            short_keys = [key.split("_", 1)[1][:-len("_sk")] for key in keys]
+            rollups[object_name(ROLLUP_PREFIX, table_name, short_keys)] = {
+                "source": table_name,
+                "keys": list(keys),
+                "measures": [measure for measure in facts[table_name]["measures"] if measure in measures],
+                "queries": sorted(served[keys]),
+            }
+            for name in served[keys]:
+                del remaining[name]
+    return rollups
+
+def rewrite_query(template, rollups, facts):
+    """Make a query template read the smallest rollup that has every key and measure it needs of each fact table.
+
+    The rollups keep the column names of their source, so only the table placeholder changes; it
+    keeps the source's name as alias for the columns qualified with it. Returns the template and
+    the rollups it reads.
+    """
+    used = []
+    for table_name, need in sorted(query_rollup_needs(template, facts).items()):
+        matching = [name for name, rollup in rollups.items() if rollup["source"] == table_name
+                    and set(need["keys"]) <= set(rollup["keys"]) and set(need["measures"]) <= set(rollup["measures"])]
+        if not matching:
+            continue
+        rollup_name = min(matching, key=lambda name: (len(rollups[name]["keys"]), name))
+        used.append(rollup_name)
+
+        def replace(match, rollup_name=rollup_name, table_name=table_name):
+            if match.group(1) != table_name:
+                return match.group(0)
+            following = re.match(r"\s*(?:as\s+)?(\w+)", template[match.end():], re.IGNORECASE)
+            aliased = following is not None and following.group(1).lower() not in FOLLOWING_KEYWORDS
+            return f"{{{{{rollup_name}}}}}" + ("" if aliased else f" {table_name}")
+        template = TABLE_PLACEHOLDER_PATTERN.sub(replace, template)
+    return template, used
+
+def load_rollups(rollups_file=ROLLUPS_FILE):
+    with open(rollups_file, "r") as file:
+        return json.load(file)
+
+def built_rollups_path(scenario):
+    return os.path.join(results_path(scenario), "rollups", "built.json")
+
+def load_built_rollups(scenario):
+    """Return the rollups built for a scenario and kept for their reduction."""
+    path = built_rollups_path(scenario)
+    if not os.path.exists(path):
+        raise ValueError(f"No rollups are built for {scenario['name']}, run rollups.py build {scenario['name']} first")
+    with open(path, "r") as file:
+        return {name: rollup for name, rollup in json.load(file).items() if rollup["kept"]}
+
+def rollup_scenario(scenario, rollups):
+    """Return a copy of a scenario that also places the rollups in the rollup store."""
+    if ROLLUP_STORE not in scenario["catalogs"]:
+        raise ValueError(f"Scenario {scenario['name']} has no {ROLLUP_STORE} catalog to build rollups in")
+    scenario = dict(scenario, tables=dict(scenario["tables"]))
+    tables = scenario["tables"].get(ROLLUP_STORE, [])
+    if tables != "*":
+        scenario["tables"][ROLLUP_STORE] = list(tables) + sorted(rollups)
+    return scenario
+
+def render_rewritten_queries(scenario, names=None):
+    """Render the queries of a scenario that read a built rollup, rewritten and as they are, keyed by query name."""
+    rollups = load_built_rollups(scenario)
+    facts = fact_tables(load_postgres_schema())
+    extended = rollup_scenario(scenario, rollups)
+    locations = table_locations(scenario)
+    extended_locations = table_locations(extended)
+    original, rewritten = {}, {}
+    for name, template in load_query_templates(names).items():
+        rewritten_template, used = rewrite_query(template, rollups, facts)
+        if used:
+            print(f"{name} reads {', '.join(used)}")
+            original[name] = render_query(template, scenario, locations)
+            rewritten[name] = render_query(rewritten_template, extended, extended_locations)
+    return original, rewritten
+
+def rollup_sql(scenario, name, rollup):
+    """Return the CREATE TABLE AS statement of a rollup, reading its source from the store the scenario places it in."""
+    locations = table_locations(scenario)
+    source = qualify_table(scenario, locations, rollup["source"])
+    extended = rollup_scenario(scenario, {name: rollup})
+    target = qualify_table(extended, table_locations(extended), name)
+    # Wide enough for the sum of every row, and the same type on every engine
+    sums = [f"CAST(SUM({measure}) AS DECIMAL(38,2)) AS {measure}" for measure in rollup["measures"]]
+    keys = ", ".join(rollup["keys"])
+    return target, f"CREATE TABLE {target} AS SELECT {keys}, {', '.join(sums)} FROM {source} GROUP BY {keys}"
+
+def scalar(executor, query):
+    """Return the single value of a query's result."""
+    values = []
+    executor.stream_rows(query, lambda columns, rows: values.extend(row[0] for row in rows))
+    return values[0]
+
+def build_rollups(scenario, rollups, executor, min_reduction=DEFAULT_MIN_REDUCTION):
+    """Build every rollup in the rollup store, and drop those that do not reduce their source enough.
+
+    On PostgreSQL the statements run directly, and on Presto the rollup of a source in another
+    store is computed by Presto and written through its PostgreSQL catalog. Returns the row
+    counts, reduction and build time of every rollup, and whether it is kept.
+    """
+    locations = table_locations(scenario)
+    built = {}
+    for name, rollup in sorted(rollups.items()):
+        target, create = rollup_sql(scenario, name, rollup)
+        print(f"Building {target} from {rollup['source']} by {', '.join(rollup['keys'])}")
+        if scenario["engine"] == "postgres":
+            with psycopg.connect(**PostgresExecutor().conninfo, autocommit=True) as conn:
+                conn.execute(f"DROP TABLE IF EXISTS {target}")
+                started = conn.execute("SELECT clock_timestamp()").fetchone()[0]
+                conn.execute(create)
+                conn.execute(f"ANALYZE {target}")
+                seconds = (conn.execute("SELECT clock_timestamp()").fetchone()[0] - started).total_seconds()
+        else:
+            executor.run(f"DROP TABLE IF EXISTS {target}")
+            seconds = executor.run(create).get("wallTime")
+        rows = scalar(executor, f"SELECT COUNT(*) FROM {target}")
+        source_rows = scalar(executor, f"SELECT COUNT(*) FROM {qualify_table(scenario, locations, rollup['source'])}")
+        reduction = source_rows / rows if rows else None
+        kept = reduction is not None and reduction >= min_reduction
+        if not kept:
+            print(f"Dropping {target}: {rows} rows of {source_rows} is less than a {min_reduction}x reduction")
+            if scenario["engine"] == "postgres":
+                with psycopg.connect(**PostgresExecutor().conninfo, autocommit=True) as conn:
+                    conn.execute(f"DROP TABLE IF EXISTS {target}")
+            else:
+                executor.run(f"DROP TABLE IF EXISTS {target}")
+        else:
+            print(f"Built {target}: {rows} rows of {source_rows} ({reduction:.1f}x fewer)")
+        built[name] = dict(rollup, rows=rows, sourceRows=source_rows, reduction=reduction, buildSeconds=seconds, kept=kept)
+    return built
+
+def drop_rollups(conninfo):
+    """Drop every rollup table built in PostgreSQL."""
+    with psycopg.connect(**conninfo, autocommit=True) as conn:
+        tables = [row[0] for row in conn.execute(
+            "SELECT tablename FROM pg_tables WHERE schemaname = 'public' AND starts_with(tablename, %s)", (ROLLUP_PREFIX,))]
+        for name in tables:
+            conn.execute(f"DROP TABLE IF EXISTS public.{name}")
+    print(f"Dropped {len(tables)} rollup tables")
+
+def verify_rewrites(executor, original, rewritten, precision=DEFAULT_PRECISION):
+    """Tell for every rewritten query whether it returns the same rows as the original."""
+    outcomes = {}
+    for name in rewritten:
+        hashes = []
+        for query in (original[name], rewritten[name]):
+            hasher = ResultHasher(precision)
+            executor.stream_rows(query, hasher.update)
+            hashes.append((hasher.row_count, hasher.hexdigest()))
+        outcomes[name] = hashes[0] == hashes[1]
+        if not outcomes[name]:
+            print(f"Warning: the rewritten {name} returns different rows ({hashes[1][0]} instead of {hashes[0][0]})")
+    return outcomes
+
+def compare(scenario, args):
+    """Run the rewritable queries as they are and rewritten to the rollups, and save their comparison."""
+    original, rewritten = render_rewritten_queries(scenario, args.queries)
+    if not rewritten:
+        raise ValueError(f"No query of {scenario['name']} reads a built rollup")
+    path = os.path.join(results_path(scenario), "rollups")
+    executor = make_executor(scenario["engine"], scenario.get("settings"))
+    try:
+        verified = verify_rewrites(executor, original, rewritten) if args.verify else None
+        base_run, _ = run_benchmark(scenario, original, executor, args.warmup, args.repetitions,
+                                    label="rollups: off", output_path=os.path.join(path, "off"))
+        rollup_run, _ = run_benchmark(scenario, rewritten, executor, args.warmup, args.repetitions,
+                                      label="rollups: on", output_path=os.path.join(path, "on"))
+    finally:
+        executor.close()
+
+    store = ResultStore()
+    try:
+        queries = compare_runs(store.query_times(base_run), store.query_times(rollup_run))
+    finally:
+        store.close()
+    for query, outcome in queries.items():
+        if verified is not None:
+            outcome["verified"] = verified.get(query)
+        print(f"  {outcome['verdict']:<11} {query}: {outcome['baseMedian']:.3f}s -> {outcome['newMedian']:.3f}s "
+              f"({outcome['change']:+.1%})")
+    report = {"baseRun": base_run, "rollupRun": rollup_run, "queries": queries}
+    output_file = os.path.join(path, "rollup_comparison.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=4)
+    print(f"Rollup comparison saved to {output_file}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Find the aggregates the queries repeat over the fact tables, build them as rollup tables, "
+                    "and run the queries rewritten to read them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    design = commands.add_parser("design", help="find the rollups the query templates share and write rollups.json")
+    design.add_argument("--min-queries", type=int, default=DEFAULT_MIN_QUERIES,
+                        help="queries a rollup must serve for it to be designed")
+    design.add_argument("--max-keys", type=int, default=DEFAULT_MAX_KEYS,
+                        help="most key columns a rollup groups by, since more keys reduce less")
+    design.add_argument("--dry-run", action="store_true", help="print the rollups without writing them")
+    build = commands.add_parser("build", help="build the rollups of rollups.json in PostgreSQL for a scenario")
+    build.add_argument("scenario", help="scenario whose stores the rollups are computed from")
+    build.add_argument("--min-reduction", type=float, default=DEFAULT_MIN_REDUCTION,
+                       help="times fewer rows than its source a rollup must have to be kept")
+    run = commands.add_parser("compare", help="run the rewritable queries with and without the rollups")
+    run.add_argument("scenario", help="scenario whose queries to run")
+    run.add_argument("--queries", nargs="+", help="query names to run (default: all that read a rollup)")
+    run.add_argument("--warmup", type=int, default=1, help="unmeasured runs of every query before the measured ones")
+    run.add_argument("--repetitions", type=int, default=5, help="measured runs of every query")
+    run.add_argument("--verify", action="store_true", help="first check that every rewritten query returns the same rows")
+    commands.add_parser("drop", help="drop every rollup table in PostgreSQL")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "drop":
+        drop_rollups(PostgresExecutor().conninfo)
+        return
+    if args.command == "design":
+        facts = fact_tables(load_postgres_schema())
+        rollups = design_rollups(load_query_templates(), facts, args.min_queries, args.max_keys)
+        for name, rollup in rollups.items():
+            print(f"{name}: {rollup['source']} by {', '.join(rollup['keys'])}, summing {len(rollup['measures'])} "
+                  f"measures for {', '.join(rollup['queries'])}")
+        if not args.dry_run:
+            with open(ROLLUPS_FILE, "w") as rollups_file:
+                json.dump(rollups, rollups_file, indent=4)
+                rollups_file.write("\n")
+            print(f"Rollups written to {ROLLUPS_FILE}")
+        return
+
+    scenario = load_scenario(args.scenario)
+    if args.command == "build":
+        executor = make_executor(scenario["engine"], scenario.get("settings"))
+        try:
+            built = build_rollups(scenario, load_rollups(), executor, args.min_reduction)
+        finally:
+            executor.close()
+        output_file = built_rollups_path(scenario)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as output:
+            json.dump(built, output, indent=4)
+        print(f"Built rollups saved to {output_file}")
+        return
+    compare(scenario, args)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError, psycopg.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
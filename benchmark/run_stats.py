@@ -0,0 +1,137 @@
+import os
+import json
+import math
+import statistics
+import matplotlib.pyplot as plt
+
+# A query is noisy when the standard deviation of its runs is more than this fraction of their mean
+NOISE_CV_THRESHOLD = 0.10
+# Runs further than this many scaled median absolute deviations from the median are outliers
+OUTLIER_MAD_THRESHOLD = 3.5
+# ...as long as they are also this fraction of the median away, so timer jitter on very stable queries is ignored
+OUTLIER_MIN_DEVIATION = 0.05
+
+def percentile(values, p):
+    """Return the p-th percentile of values, interpolating linearly between the closest ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * p / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def find_outliers(values):
+    """Return the indexes of the values that are outliers by the modified z-score."""
+    if len(values) < 3:
+        return []
+    median = statistics.median(values)
+    mad = statistics.median(abs(value - median) for value in values)
+    if mad == 0:
+        return []
+    return [
+        index for index, value in enumerate(values)
+        if 0.6745 * abs(value - median) / mad > OUTLIER_MAD_THRESHOLD
+        and abs(value - median) > OUTLIER_MIN_DEVIATION * median
+    ]
+
+def summarize_runs(values, errors=0):
+    """Build the distribution of the measured runs of a query and flag it when it is flaky or noisy."""
+    values = [value for value in values if value is not None]
+    if not values:
+        return {"runs": 0, "errors": errors, "flaky": False, "noisy": False}
+    mean = statistics.fmean(values)
+    stddev = statistics.stdev(values) if len(values) > 1 else 0.0
+    outliers = find_outliers(values)
+    return {
+        "runs": len(values),
+        "errors": errors,
+        "min": min(values),
+        "median": statistics.median(values),
+        "mean": mean,
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+        "stddev": stddev,
+        "cv": stddev / mean if mean > 0 else 0.0,
+        "outliers": outliers,
+        # Flaky queries failed in some runs and succeeded in others
+        "flaky": errors > 0,
+        "noisy": bool(outliers) or (mean > 0 and stddev / mean > NOISE_CV_THRESHOLD),
+    }
+
+def measure_query(run_query, query, warmup=1, repetitions=5):
+    """Run a query warmup times unmeasured and then repetitions times, and return the measured results.
+
+    run_query(query) must return a dictionary of the run's stats. Failed runs are returned as
+    {"error": message}.
+    """
+    for iteration in range(warmup):
+        try:
+            run_query(query)
+        except Exception as e:
+            print(f"Warmup run {iteration + 1} failed: {e}")
+    runs = []
+    for iteration in range(repetitions):
+        try:
+            runs.append(run_query(query))
+        except Exception as e:
+            print(f"Run {iteration + 1} failed: {e}")
+            runs.append({"error": str(e)})
+    return runs
+
+def summarize_metric(runs, metric):
+    """Summarize one metric, such as executionTime or wallTime, over the measured runs."""
+    errors = sum(1 for run in runs if "error" in run)
+    return summarize_runs([run.get(metric) for run in runs if "error" not in run], errors)
+
+def load_statistics(results_path):
+    """Read the executionTime statistics of every query result file in a results directory.
+
+    Result files written before repetitions existed only hold one executionTime, which is used
+    as a distribution of a single run.
+    """
+    query_stats = {}
+    if not os.path.isdir(results_path):
+        return query_stats
+    for file in sorted(os.listdir(results_path)):
+        if not file.endswith(".json") or file.startswith("throughput-"):
+            continue
+        with open(os.path.join(results_path, file), 'r') as f:
+            data = json.load(f)
+        stats = data.get("statistics", {}).get("executionTime")
+        if stats is None and data.get("executionTime") is not None:
+            try:
+                stats = summarize_runs([float(data["executionTime"])])
+            except (TypeError, ValueError):
+                print(f"Skipping {file} due to invalid execution time format: {data['executionTime']}")
+                continue
+        if stats and stats.get("runs"):
+            query_stats[file.replace(".json", "")] = stats
+    return query_stats
+
+def plot_latency_chart(query_stats, chart_path, title, color):
+    """Save a bar chart of the median latency of every query with min to p95 error bars.
+
+    Flaky and noisy queries are hatched.
+    """
+    names = list(query_stats.keys())
+    medians = [query_stats[name]["median"] for name in names]
+    lower = [query_stats[name]["median"] - query_stats[name]["min"] for name in names]
+    upper = [query_stats[name]["p95"] - query_stats[name]["median"] for name in names]
+
+    plt.figure(figsize=(10, 5))
+    bars = plt.bar(names, medians, yerr=[lower, upper], capsize=3, color=color, ecolor='dimgray')
+    for bar, name in zip(bars, names):
+        if query_stats[name]["flaky"] or query_stats[name]["noisy"]:
+            bar.set_hatch('//')
+    plt.xlabel("SQL File Name")
+    plt.ylabel("Query Latency (seconds, median with min to p95)")
+    plt.title(title)
+    plt.xticks(rotation=45, ha="right")
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+
+    os.makedirs(os.path.dirname(chart_path), exist_ok=True)
+    plt.savefig(chart_path, bbox_inches='tight')
+    print(f"Query latency chart saved to {chart_path}")
+    plt.close()
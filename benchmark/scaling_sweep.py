@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import matplotlib.pyplot as plt
+from dotenv import load_dotenv
+from executors import make_executor
+from harness import load_scenario, render_queries, results_path, run_benchmark
+from result_store import ResultStore
+
+load_dotenv()
+
+DEFAULT_SCALE_COMMAND = "docker-compose up -d --scale prestodb-worker={workers}"
+DEFAULT_WAIT_TIMEOUT = 300
+POLL_INTERVAL = 2
+# Share of the ideal speedup gain that adding workers must bring for a query to still scale
+MIN_MARGINAL_EFFICIENCY = 0.1
+SWEEP_LABEL = "scaling sweep"
+
+def scale_workers(command, workers):
+    """Run the command that sets the number of Presto workers, like docker-compose --scale."""
+    command = command.format(workers=workers)
+    print(f"Scaling to {workers} workers: {command}")
+    subprocess.run(command, shell=True, check=True)
+
+def wait_for_workers(executor, workers, timeout=DEFAULT_WAIT_TIMEOUT):
+    """Wait until the coordinator reports exactly the given number of active workers."""
+    deadline = time.monotonic() + timeout
+    active = None
+    while time.monotonic() < deadline:
+        active = executor.active_workers()
+        if active == workers:
+            print(f"{active} workers active")
+            return
+        time.sleep(POLL_INTERVAL)
+    raise TimeoutError(f"Presto reports {active} active workers after {timeout}s instead of {workers}")
+
+def sweep_path(scenario):
+    return os.path.join(results_path(scenario), "scaling")
+
+def load_medians(store, scenario, workers):
+    """Return the median execution time of every query in the latest sweep run with each worker count."""
+    medians = {}
+    for count in workers:
+        # Only the sweep's own runs, so tuning, rollup or cache runs with the same workers are not charted
+        runs = store.runs(scenario["name"], count, limit=1, label=SWEEP_LABEL)
+        if not runs:
+            print(f"No recorded sweep run of {scenario['name']} with {count} workers")
+            continue
+        print(f"Using {runs[0]['queries']} queries of run {runs[0]['id']} with {count} workers")
+        medians[count] = {query: statistics.median(times) for query, times in store.query_times(runs[0]["id"]).items() if times}
+    return medians
+
+def load_bottleneck(scenario, workers, query):
+    """Return the slowest connector of a query in the sweep's result file for a worker count, if it has one."""
+    result_file = os.path.join(sweep_path(scenario), f"workers-{workers}", f"{query}.json")
+    if not os.path.exists(result_file):
+        return None
+    with open(result_file, 'r') as f:
+        return json.load(f).get("operatorSummary", {}).get("bottleneck")
+
+def scaling_curves(medians, min_marginal_efficiency=MIN_MARGINAL_EFFICIENCY):
+    """Compute the speedup and parallel efficiency of every query over the worker counts, from their medians.
+
+    Speedup is relative to the smallest worker count that measured the query, and efficiency is
+    the speedup divided by the growth in workers. A query stops scaling at the first worker count
+    whose gain in speedup over the previous count is less than min_marginal_efficiency of the
+    gain more workers would ideally bring.
+    """
+    curves = {}
+    queries = sorted(set().union(*medians.values())) if medians else []
+    for query in queries:
+        points = [(count, medians[count][query]) for count in sorted(medians)
+                  if medians[count].get(query)]
+        if len(points) < 2:
+            continue
+        base_workers, base_median = points[0]
+        speedups = [base_median / median for _, median in points]
+        curve = {
+            "workers": [count for count, _ in points],
+            "medians": [median for _, median in points],
+            "speedup": speedups,
+            "efficiency": [speedup * base_workers / count for (count, _), speedup in zip(points, speedups)],
+            "stopsScalingAt": None,
+        }
+        for index in range(1, len(points)):
+            ideal_gain = points[index][0] / points[index - 1][0] - 1
+            gain = speedups[index] / speedups[index - 1] - 1
+            if gain < min_marginal_efficiency * ideal_gain:
+                curve["stopsScalingAt"] = points[index][0]
+                break
+        curves[query] = curve
+    return curves
+
+def plot_scaling_chart(curves, metric, chart_path, title, ylabel):
+    """Save a line chart of a scaling metric over the worker counts, one line per query.
+
+    Queries that stop scaling are drawn in colour and named in the legend, the others in grey.
+    """
+    worker_counts = sorted(set().union(*(curve["workers"] for curve in curves.values())))
+    plt.figure(figsize=(10, 6))
+    if metric == "speedup":
+        plt.plot(worker_counts, [count / worker_counts[0] for count in worker_counts], 'k--', label="ideal")
+    else:
+        plt.axhline(1.0, color='k', linestyle='--', label="ideal")
+    for query, curve in curves.items():
+        if curve["stopsScalingAt"] is None:
+            plt.plot(curve["workers"], curve[metric], color='lightgray', linewidth=1)
+        else:
+            plt.plot(curve["workers"], curve[metric], marker='o', linewidth=1.5,
+                     label=f"{query} (stops at {curve['stopsScalingAt']})")
+    plt.xticks(worker_counts)
+    plt.xlabel("Presto Workers")
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.legend(loc='center left', bbox_to_anchor=(1, 0.5), fontsize='small')
+    plt.grid(linestyle='--', alpha=0.7)
+
+    os.makedirs(os.path.dirname(chart_path), exist_ok=True)
+    plt.savefig(chart_path, bbox_inches='tight')
+    print(f"{metric.capitalize()} chart saved to {chart_path}")
+    plt.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run a scenario with increasing numbers of Presto workers and chart the speedup of every query.")
+    parser.add_argument("scenario", help="scenario name in benchmark/scenarios (like scenario-1) or path of a scenario file")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4], help="worker counts to run the queries with")
+    parser.add_argument("--queries", nargs="+", help="query names to run (default: all)")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs of every query before the measured ones")
+    parser.add_argument("--repetitions", type=int, default=5, help="measured runs of every query")
+    parser.add_argument("--scale-command", default=DEFAULT_SCALE_COMMAND,
+                        help="command that sets the number of workers, with {workers} replaced by the count")
+    parser.add_argument("--no-scale", action="store_true",
+                        help="do not run the scale command, only wait for the workers to be scaled by hand")
+    parser.add_argument("--wait-timeout", type=int, default=DEFAULT_WAIT_TIMEOUT,
+                        help="seconds to wait for the workers to register with the coordinator")
+    parser.add_argument("--from-store", action="store_true",
+                        help="chart the latest recorded run with each worker count instead of running the queries")
+    parser.add_argument("--min-marginal-efficiency", type=float, default=MIN_MARGINAL_EFFICIENCY,
+                        help="share of the ideal gain below which a query has stopped scaling")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scenario = load_scenario(args.scenario)
+    worker_counts = sorted(set(args.workers))
+    if len(worker_counts) < 2:
+        raise ValueError("Give at least two worker counts to sweep")
+
+    if args.from_store:
+        store = ResultStore()
+        try:
+            medians = load_medians(store, scenario, worker_counts)
+        finally:
+            store.close()
+    else:
+        queries = render_queries(scenario, args.queries)
+        executor = make_executor(scenario["engine"], scenario.get("settings"))
+        medians = {}
+        try:
+            if executor.active_workers() is None:
+                raise ValueError(f"Cannot read the active workers of the {scenario['engine']} engine")
+            for count in worker_counts:
+                if not args.no_scale:
+                    scale_workers(args.scale_command, count)
+                wait_for_workers(executor, count, args.wait_timeout)
+                output_path = os.path.join(sweep_path(scenario), f"workers-{count}")
+                _, query_stats = run_benchmark(scenario, queries, executor, args.warmup, args.repetitions, count,
+                                               SWEEP_LABEL, output_path)
+                medians[count] = {query: stats["median"] for query, stats in query_stats.items()}
+        finally:
+            executor.close()
+
+    curves = scaling_curves(medians, args.min_marginal_efficiency)
+    if not curves:
+        print("No query was measured with at least two worker counts.")
+        return
+    for query, curve in curves.items():
+        if curve["stopsScalingAt"] is not None:
+            bottleneck = load_bottleneck(scenario, curve["stopsScalingAt"], query)
+            curve["bottleneck"] = bottleneck
+            print(f"{query} stops scaling at {curve['stopsScalingAt']} workers"
+                  + (f", slowest connector {bottleneck}" if bottleneck else ""))
+    stopped = sum(curve["stopsScalingAt"] is not None for curve in curves.values())
+    print(f"{stopped} of {len(curves)} queries stop scaling between {worker_counts[0]} and {worker_counts[-1]} workers")
+
+    path = sweep_path(scenario)
+    os.makedirs(path, exist_ok=True)
+    output_file = os.path.join(path, "scaling.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump({"workers": sorted(medians), "queries": curves}, output, indent=4)
+    print(f"Scaling report saved to {output_file}")
+    plot_scaling_chart(curves, "speedup", os.path.join(path, "speedup_chart.png"),
+                       f"Query Speedup over Workers ({scenario['name']})", "Speedup (median latency)")
+    plot_scaling_chart(curves, "efficiency", os.path.join(path, "efficiency_chart.png"),
+                       f"Parallel Efficiency over Workers ({scenario['name']})", "Parallel Efficiency")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -1,56 +0,0 @@
--- start query 17 in stream 0 using template query17.tpl 
-SELECT i_item_id, 
-               i_item_desc, 
-               s_state, 
-               Count(ss_quantity)                                        AS 
-               store_sales_quantitycount, 
-               Avg(ss_quantity)                                          AS 
-               store_sales_quantityave, 
-               Stddev_samp(ss_quantity)                                  AS 
-               store_sales_quantitystdev, 
-               Stddev_samp(ss_quantity) / Avg(ss_quantity)               AS 
-               store_sales_quantitycov, 
-               Count(sr_return_quantity)                                 AS 
-               store_returns_quantitycount, 
-               Avg(sr_return_quantity)                                   AS 
-               store_returns_quantityave, 
-               Stddev_samp(sr_return_quantity)                           AS 
-               store_returns_quantitystdev, 
-               Stddev_samp(sr_return_quantity) / Avg(sr_return_quantity) AS 
-               store_returns_quantitycov, 
-               Count(cs_quantity)                                        AS 
-               catalog_sales_quantitycount, 
-               Avg(cs_quantity)                                          AS 
-               catalog_sales_quantityave, 
-               Stddev_samp(cs_quantity) / Avg(cs_quantity)               AS 
-               catalog_sales_quantitystdev, 
-               Stddev_samp(cs_quantity) / Avg(cs_quantity)               AS 
-               catalog_sales_quantitycov 
-FROM   cassandra.is_keyspace.store_sales,
-       mongo.is_db.store_returns,
-       cassandra.is_keyspace.catalog_sales,
-       postgres.public.date_dim d1,
-       postgres.public.date_dim d2,
-       postgres.public.date_dim d3,
-       postgres.public.store,
-       postgres.public.item
-WHERE  d1.d_quarter_name = '1999Q1' 
-       AND d1.d_date_sk = ss_sold_date_sk 
-       AND i_item_sk = ss_item_sk 
-       AND s_store_sk = ss_store_sk 
-       AND ss_customer_sk = sr_customer_sk 
-       AND ss_item_sk = sr_item_sk 
-       AND ss_ticket_number = sr_ticket_number 
-       AND sr_returned_date_sk = d2.d_date_sk 
-       AND d2.d_quarter_name IN ( '1999Q1', '1999Q2', '1999Q3' ) 
-       AND sr_customer_sk = cs_bill_customer_sk 
-       AND sr_item_sk = cs_item_sk 
-       AND cs_sold_date_sk = d3.d_date_sk 
-       AND d3.d_quarter_name IN ( '1999Q1', '1999Q2', '1999Q3' ) 
-GROUP  BY i_item_id, 
-          i_item_desc, 
-          s_state 
-ORDER  BY i_item_id, 
-          i_item_desc, 
-          s_state
-LIMIT 100
\ No newline at end of file
@@ -1,47 +0,0 @@
-WITH ssales
-     AS (SELECT c_last_name,
-                c_first_name,
-                s_store_name,
-                ca_state,
-                s_state,
-                i_color,
-                i_current_price,
-                i_manager_id,
-                i_units,
-                i_size,
-                Sum(ss_net_profit) netpaid
-         FROM   cassandra.is_keyspace.store_sales,
-                mongo.is_db.store_returns,
-                postgres.public.store,
-                postgres.public.item,
-                postgres.public.customer,
-                mongo.is_db.customer_address
-         WHERE  ss_ticket_number = sr_ticket_number
-                AND ss_item_sk = sr_item_sk
-                AND ss_customer_sk = c_customer_sk
-                AND ss_item_sk = i_item_sk
-                AND ss_store_sk = s_store_sk
-                AND c_birth_country = Upper(ca_country)
-                AND s_zip = ca_zip
-                AND s_market_id = 6
-         GROUP  BY c_last_name,
-                   c_first_name,
-                   s_store_name,
-                   ca_state,
-                   s_state,
-                   i_color,
-                   i_current_price,
-                   i_manager_id,
-                   i_units,
-                   i_size)
-SELECT c_last_name,
-       c_first_name,
-       s_store_name,
-       Sum(netpaid) paid
-FROM   ssales
-WHERE  i_color = 'chartreuse'
-GROUP  BY c_last_name,
-          c_first_name,
-          s_store_name
-HAVING Sum(netpaid) > (SELECT 0.05 * Avg(netpaid)
-                       FROM   ssales)
\ No newline at end of file
@@ -1,24 +0,0 @@
--- start query 7 in stream 0 using template query7.tpl 
-SELECT i_item_id, 
-               Avg(ss_quantity)    agg1, 
-               Avg(ss_list_price)  agg2, 
-               Avg(ss_coupon_amt)  agg3, 
-               Avg(ss_sales_price) agg4 
-FROM   cassandra.is_keyspace.store_sales,
-       postgres.public.customer_demographics,
-       postgres.public.date_dim,
-       postgres.public.item,
-       postgres.public.promotion
-WHERE  ss_sold_date_sk = d_date_sk 
-       AND ss_item_sk = i_item_sk 
-       AND ss_cdemo_sk = cd_demo_sk 
-       AND ss_promo_sk = p_promo_sk 
-       AND cd_gender = 'F' 
-       AND cd_marital_status = 'W' 
-       AND cd_education_status = '2 yr Degree' 
-       AND ( p_channel_email = 'N' 
-              OR p_channel_event = 'N' ) 
-       AND d_year = 1998 
-GROUP  BY i_item_id 
-ORDER  BY i_item_id
-LIMIT 100
\ No newline at end of file
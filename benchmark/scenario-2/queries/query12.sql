@@ -1,30 +0,0 @@
--- start query 12 in stream 0 using template query12.tpl 
-SELECT
-         i_item_id , 
-         i_item_desc , 
-         i_category , 
-         i_class , 
-         i_current_price , 
-         Sum(ws_ext_sales_price)                                                              AS itemrevenue ,
-         Sum(ws_ext_sales_price)*100/Sum(Sum(ws_ext_sales_price)) OVER (partition BY i_class) AS revenueratio
-FROM     cassandra.is_keyspace.web_sales ,
-         cassandra.is_keyspace.item  ,
-         postgres.public.date_dim
-WHERE    ws_item_sk = i_item_sk 
-AND      i_category IN ('Home', 
-                        'Men', 
-                        'Women') 
-AND      ws_sold_date_sk = d_date_sk 
-AND      d_date BETWEEN Cast('2000-05-11' AS DATE) AND      ( 
-                  Cast('2000-05-11' AS DATE) + INTERVAL '30' day) 
-GROUP BY i_item_id , 
-         i_item_desc , 
-         i_category , 
-         i_class , 
-         i_current_price 
-ORDER BY i_category , 
-         i_class , 
-         i_item_id , 
-         i_item_desc , 
-         revenueratio 
-LIMIT 100
\ No newline at end of file
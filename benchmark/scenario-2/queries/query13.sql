@@ -1,44 +0,0 @@
--- start query 13 in stream 0 using template query13.tpl 
-SELECT Avg(ss_quantity), 
-       Avg(ss_ext_sales_price), 
-       Avg(ss_ext_wholesale_cost), 
-       Sum(ss_ext_wholesale_cost) 
-FROM   cassandra.is_keyspace.store_sales,
-       postgres.public.store,
-       postgres.public.customer_demographics,
-       postgres.public.household_demographics,
-       postgres.public.customer_address,
-       postgres.public.date_dim
-WHERE  s_store_sk = ss_store_sk 
-       AND ss_sold_date_sk = d_date_sk 
-       AND d_year = 2001 
-       AND ( ( ss_hdemo_sk = hd_demo_sk 
-               AND cd_demo_sk = ss_cdemo_sk 
-               AND cd_marital_status = 'U' 
-               AND cd_education_status = 'Advanced Degree' 
-               AND ss_sales_price BETWEEN 100.00 AND 150.00 
-               AND hd_dep_count = 3 ) 
-              OR ( ss_hdemo_sk = hd_demo_sk 
-                   AND cd_demo_sk = ss_cdemo_sk 
-                   AND cd_marital_status = 'M' 
-                   AND cd_education_status = 'Primary' 
-                   AND ss_sales_price BETWEEN 50.00 AND 100.00 
-                   AND hd_dep_count = 1 ) 
-              OR ( ss_hdemo_sk = hd_demo_sk 
-                   AND cd_demo_sk = ss_cdemo_sk 
-                   AND cd_marital_status = 'D' 
-                   AND cd_education_status = 'Secondary' 
-                   AND ss_sales_price BETWEEN 150.00 AND 200.00 
-                   AND hd_dep_count = 1 ) ) 
-       AND ( ( ss_addr_sk = ca_address_sk 
-               AND ca_country = 'United States' 
-               AND ca_state IN ( 'AZ', 'NE', 'IA' ) 
-               AND ss_net_profit BETWEEN 100 AND 200 ) 
-              OR ( ss_addr_sk = ca_address_sk 
-                   AND ca_country = 'United States' 
-                   AND ca_state IN ( 'MS', 'CA', 'NV' ) 
-                   AND ss_net_profit BETWEEN 150 AND 300 ) 
-              OR ( ss_addr_sk = ca_address_sk 
-                   AND ca_country = 'United States' 
-                   AND ca_state IN ( 'GA', 'TX', 'NJ' ) 
-                   AND ss_net_profit BETWEEN 50 AND 250 ) )
\ No newline at end of file
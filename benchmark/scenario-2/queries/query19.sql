@@ -1,31 +0,0 @@
--- start query 19 in stream 0 using template query19.tpl 
-SELECT i_brand_id              brand_id, 
-               i_brand                 brand, 
-               i_manufact_id, 
-               i_manufact, 
-               Sum(ss_ext_sales_price) ext_price 
-FROM   postgres.public.date_dim,
-       cassandra.is_keyspace.store_sales,
-       cassandra.is_keyspace.item,
-       postgres.public.customer,
-       postgres.public.customer_address,
-       postgres.public.store
-WHERE  d_date_sk = ss_sold_date_sk 
-       AND ss_item_sk = i_item_sk 
-       AND i_manager_id = 38 
-       AND d_moy = 12 
-       AND d_year = 1998 
-       AND ss_customer_sk = c_customer_sk 
-       AND c_current_addr_sk = ca_address_sk 
-       AND Substr(ca_zip, 1, 5) <> Substr(s_zip, 1, 5) 
-       AND ss_store_sk = s_store_sk 
-GROUP  BY i_brand, 
-          i_brand_id, 
-          i_manufact_id, 
-          i_manufact 
-ORDER  BY ext_price DESC, 
-          i_brand, 
-          i_brand_id, 
-          i_manufact_id, 
-          i_manufact
-LIMIT 100
\ No newline at end of file
@@ -1,41 +0,0 @@
--- start query 25 in stream 0 using template query25.tpl 
-SELECT i_item_id, 
-               i_item_desc, 
-               s_store_id, 
-               s_store_name, 
-               Max(ss_net_profit) AS store_sales_profit, 
-               Max(sr_net_loss)   AS store_returns_loss, 
-               Max(cs_net_profit) AS catalog_sales_profit 
-FROM   cassandra.is_keyspace.store_sales,
-       mongo.is_db.store_returns,
-       cassandra.is_keyspace.catalog_sales,
-       postgres.public.date_dim d1,
-       postgres.public.date_dim d2,
-       postgres.public.date_dim d3,
-       postgres.public.store,
-       cassandra.is_keyspace.item
-WHERE  d1.d_moy = 4 
-       AND d1.d_year = 2001 
-       AND d1.d_date_sk = ss_sold_date_sk 
-       AND i_item_sk = ss_item_sk 
-       AND s_store_sk = ss_store_sk 
-       AND ss_customer_sk = sr_customer_sk 
-       AND ss_item_sk = sr_item_sk 
-       AND ss_ticket_number = sr_ticket_number 
-       AND sr_returned_date_sk = d2.d_date_sk 
-       AND d2.d_moy BETWEEN 4 AND 10 
-       AND d2.d_year = 2001 
-       AND sr_customer_sk = cs_bill_customer_sk 
-       AND sr_item_sk = cs_item_sk 
-       AND cs_sold_date_sk = d3.d_date_sk 
-       AND d3.d_moy BETWEEN 4 AND 10 
-       AND d3.d_year = 2001 
-GROUP  BY i_item_id, 
-          i_item_desc, 
-          s_store_id, 
-          s_store_name 
-ORDER  BY i_item_id, 
-          i_item_desc, 
-          s_store_id, 
-          s_store_name
-LIMIT 100
\ No newline at end of file
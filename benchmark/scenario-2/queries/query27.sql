@@ -1,27 +0,0 @@
--- start query 27 in stream 0 using template query27.tpl 
-SELECT i_item_id, 
-               s_state, 
-               Grouping(s_state)   g_state, 
-               Avg(ss_quantity)    agg1, 
-               Avg(ss_list_price)  agg2, 
-               Avg(ss_coupon_amt)  agg3, 
-               Avg(ss_sales_price) agg4 
-FROM   cassandra.is_keyspace.store_sales,
-       postgres.public.customer_demographics,
-       postgres.public.date_dim,
-       postgres.public.store,
-       cassandra.is_keyspace.item
-WHERE  ss_sold_date_sk = d_date_sk 
-       AND ss_item_sk = i_item_sk 
-       AND ss_store_sk = s_store_sk 
-       AND ss_cdemo_sk = cd_demo_sk 
-       AND cd_gender = 'M' 
-       AND cd_marital_status = 'D' 
-       AND cd_education_status = 'College' 
-       AND d_year = 2000 
-       AND s_state IN ( 'TN', 'TN', 'TN', 'TN', 
-                        'TN', 'TN' ) 
-GROUP  BY rollup ( i_item_id, s_state ) 
-ORDER  BY i_item_id, 
-          s_state
-LIMIT 100
\ No newline at end of file
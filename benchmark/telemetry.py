@@ -0,0 +1,599 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+from contextlib import contextmanager
+import matplotlib.pyplot as plt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESULTS_LOCAL_PATH = os.getenv("RESULTS_LOCAL_PATH")
+LOAD_JOURNAL_FILE = os.getenv("LOAD_JOURNAL_FILE") or os.path.join(
+    os.getenv("TEST_DATA_TMP_LOCAL_PATH") or ".", "load-journal.jsonl")
+
+# Containers of docker-compose.yml, matched as parts of the running container names so scaled workers match too
+DEFAULT_CONTAINERS = ("mongodb", "cassandra", "postgres", "prestodb-coordinator", "prestodb-worker")
+# Seconds between samples: "full" reads every counter, "light" only CPU and memory, and less often
+MODES = {"full": 0.2, "light": 1.0}
+CGROUP_ROOT = "/sys/fs/cgroup"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+# cgroup v1 reports an unlimited memory limit as a page-rounded 2^63
+UNLIMITED_BYTES = 2 ** 60
+# Share of a resource a phase must use, or be stalled on, to be bound by it
+BOUND_THRESHOLD = 0.5
+# Counters that grow over time and are charted as rates, and those sampled as levels
+RATE_METRICS = {
+    "cpu": "cpuCores",
+    "read": "readMbPerSec",
+    "write": "writeMbPerSec",
+    "rx": "receiveMbPerSec",
+    "tx": "transmitMbPerSec",
+    "cpuStall": "cpuStall",
+    "ioStall": "ioStall",
+    "memoryStall": "memoryStall",
+}
+LEVEL_METRICS = {"memory": "memoryMb"}
+MEGABYTE = 1024 * 1024
+MAX_LABELLED_PHASES = 30
+
+def read_text(path):
+    try:
+        with open(path, "r") as file:
+            return file.read()
+    except OSError:
+        return None
+
+def parse_cpu_stat(text):
+    for line in text.splitlines():
+        if line.startswith("usage_usec "):
+            return int(line.split()[1]) / 1e6
+    return None
+
+def parse_io_stat(text):
+    """Sum the bytes read and written over every device of a cgroup v2 io.stat."""
+    read = write = 0
+    for line in text.splitlines():
+        for field in line.split()[1:]:
+            name, _, value = field.partition("=")
+            if name == "rbytes":
+                read += int(value)
+            elif name == "wbytes":
+                write += int(value)
+    return read, write
+
+def parse_blkio(text):
+    """Sum the bytes read and written over every device of a cgroup v1 blkio.throttle.io_service_bytes."""
+    read = write = 0
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) == 3 and fields[1] == "Read":
+            read += int(fields[2])
+        elif len(fields) == 3 and fields[1] == "Write":
+            write += int(fields[2])
+    return read, write
+
+def parse_pressure(text):
+    """Return the seconds some task of a cgroup was stalled on a resource, from its PSI file."""
+    for line in text.splitlines():
+        if line.startswith("some "):
+            return int(line.rsplit("total=", 1)[1]) / 1e6
+    return None
+
+def parse_net_dev(text):
+    """Sum the bytes received and sent over every interface but loopback of a network namespace."""
+    received = sent = 0
+    for line in text.splitlines()[2:]:
+        interface, _, counters = line.partition(":")
+        if interface.strip() == "lo":
+            continue
+        fields = counters.split()
+        received += int(fields[0])
+        sent += int(fields[8])
+    return received, sent
+
+def cgroup_dirs(pid):
+    """Return the cgroup v2 directory of a process and its cgroup v1 directory of every controller."""
+    text = read_text(f"/proc/{pid}/cgroup")
+    if text is None:
+        raise OSError(f"Cannot read the cgroups of process {pid}")
+    unified_root = CGROUP_ROOT if os.path.exists(os.path.join(CGROUP_ROOT, "cgroup.controllers")) \
+        else os.path.join(CGROUP_ROOT, "unified")
+    unified, controllers = None, {}
+    for line in text.splitlines():
+        _, names, path = line.split(":", 2)
+        if not names:
+            unified = os.path.join(unified_root, path.lstrip("/"))
+            continue
+        for name in names.split(","):
+            for mount in (name, names):
+                directory = os.path.join(CGROUP_ROOT, mount, path.lstrip("/"))
+                if os.path.isdir(directory):
+                    controllers[name] = directory
+                    break
+    return unified, controllers
+
+class CgroupSource:
+    """Samples the cgroup of a container, or of any process, from the host.
+
+    Every counter is read from cgroup v2 when the file exists there and from the cgroup v1
+    controller otherwise, so hybrid hosts work too. Pressure stalls are only kept by cgroup v2.
+    Memory includes the page cache the cgroup is charged for. Light sources only read CPU time
+    and memory.
+    """
+
+    kind = "cgroup"
+
+    def __init__(self, name, pid, full=True):
+        self.name = name
+        self.pid = pid
+        unified, controllers = cgroup_dirs(pid)
+        candidates = {
+            "cpu": [(unified, "cpu.stat", parse_cpu_stat),
+                    (controllers.get("cpuacct"), "cpuacct.usage", lambda text: int(text) / 1e9)],
+            "memory": [(unified, "memory.current", int),
+                       (controllers.get("memory"), "memory.usage_in_bytes", int)],
+        }
+        if full:
+            candidates.update({
+                "io": [(unified, "io.stat", parse_io_stat),
+                       (controllers.get("blkio"), "blkio.throttle.io_service_bytes_recursive", parse_blkio)],
+                "cpuStall": [(unified, "cpu.pressure", parse_pressure)],
+                "ioStall": [(unified, "io.pressure", parse_pressure)],
+                "memoryStall": [(unified, "memory.pressure", parse_pressure)],
+                "net": [(f"/proc/{pid}", "net/dev", parse_net_dev)],
+            })
+        # Resolve every counter to a file once, so a sample only reads files
+        self.files = {}
+        for metric, options in candidates.items():
+            for directory, file_name, parse in options:
+                if directory is not None and read_text(os.path.join(directory, file_name)) is not None:
+                    self.files[metric] = (os.path.join(directory, file_name), parse)
+                    break
+        self.limits = self._limits(unified, controllers)
+
+    def _limits(self, unified, controllers):
+        cores = os.cpu_count()
+        quota = read_text(os.path.join(unified, "cpu.max")) if unified else None
+        if quota and not quota.startswith("max"):
+            limit, period = quota.split()
+            cores = int(limit) / int(period)
+        elif controllers.get("cpu"):
+            limit = read_text(os.path.join(controllers["cpu"], "cpu.cfs_quota_us"))
+            period = read_text(os.path.join(controllers["cpu"], "cpu.cfs_period_us"))
+            if limit and period and int(limit) > 0:
+                cores = int(limit) / int(period)
+        memory = read_text(os.path.join(unified, "memory.max")) if unified else None
+        if memory is None and controllers.get("memory"):
+            memory = read_text(os.path.join(controllers["memory"], "memory.limit_in_bytes"))
+        memory_mb = int(memory) / MEGABYTE if memory and memory.strip() != "max" and int(memory) < UNLIMITED_BYTES else None
+        return {"cpuCores": cores, "memoryMb": memory_mb}
+
+    def sample(self):
+        counters = {}
+        for metric, (path, parse) in self.files.items():
+            text = read_text(path)
+            if text is None:
+                continue
+            value = parse(text)
+            if metric == "io":
+                counters["read"], counters["write"] = value
+            elif metric == "net":
+                counters["rx"], counters["tx"] = value
+            elif value is not None:
+                counters[metric] = value
+        return counters
+
+class ProcessTreeSource:
+    """Samples a process and all its descendants, like a loader and its worker processes, from /proc.
+
+    The CPU time of children that exited is kept through the cumulative times of their parent.
+    """
+
+    kind = "process"
+
+    def __init__(self, name, pid, full=True):
+        self.name = name
+        self.pid = pid
+        self.full = full
+        self.limits = {"cpuCores": os.cpu_count(), "memoryMb": None}
+
+    def pids(self):
+        pids, pending = [], [self.pid]
+        while pending:
+            pid = pending.pop()
+            pids.append(pid)
+            try:
+                for task in os.listdir(f"/proc/{pid}/task"):
+                    children = read_text(f"/proc/{pid}/task/{task}/children")
+                    pending.extend(int(child) for child in (children or "").split())
+            except OSError:
+                continue
+        return pids
+
+    def sample(self):
+        counters = {"cpu": 0.0, "memory": 0}
+        if self.full:
+            counters.update(read=0, write=0)
+        for pid in self.pids():
+            stat = read_text(f"/proc/{pid}/stat")
+            statm = read_text(f"/proc/{pid}/statm")
+            if stat is None or statm is None:
+                continue
+            # Fields after the command name, which may contain spaces, start with the state
+            fields = stat.rsplit(")", 1)[1].split()
+            counters["cpu"] += sum(int(value) for value in fields[11:15]) / CLOCK_TICKS
+            counters["memory"] += int(statm.split()[1]) * PAGE_SIZE
+            if self.full:
+                for line in (read_text(f"/proc/{pid}/io") or "").splitlines():
+                    name, _, value = line.partition(": ")
+                    if name == "read_bytes":
+                        counters["read"] += int(value)
+                    elif name == "write_bytes":
+                        counters["write"] += int(value)
+        return counters
+
+def discover_containers(patterns=DEFAULT_CONTAINERS, full=True):
+    """Return a source for every running container whose name contains one of the patterns."""
+    try:
+        names = subprocess.run(["docker", "ps", "--format", "{{.Names}}"], capture_output=True, text=True,
+                               check=True).stdout.split()
+        names = sorted(name for name in names if any(pattern in name for pattern in patterns))
+        if not names:
+            return []
+        pids = subprocess.run(["docker", "inspect", "--format", "{{.State.Pid}}", *names], capture_output=True,
+                              text=True, check=True).stdout.split()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not list the running containers: {e}")
+        return []
+    sources = []
+    for name, pid in zip(names, pids):
+        try:
+            sources.append(CgroupSource(name, int(pid), full))
+        except (OSError, ValueError) as e:
+            print(f"Skipping container {name}: {e}")
+    return sources
+
+def make_telemetry(mode="full", patterns=DEFAULT_CONTAINERS, interval=None):
+    """Create the telemetry of the matching containers, or of the whole host when none is running."""
+    full = mode == "full"
+    sources = discover_containers(patterns, full)
+    if not sources:
+        print("No matching container is running, sampling the whole host instead")
+        sources = [CgroupSource("host", 1, full)]
+    print(f"Sampling {', '.join(source.name for source in sources)} every {interval or MODES[mode]}s ({mode} mode)")
+    return Telemetry(sources, mode, interval)
+
+class Telemetry:
+    """Samples the resource counters of a set of sources in a background thread while a recording is open."""
+
+    def __init__(self, sources, mode="full", interval=None):
+        self.sources = sources
+        self.mode = mode
+        self.interval = interval or MODES[mode]
+
+    @contextmanager
+    def recording(self):
+        recording = Recording(self.sources, self.interval, self.mode)
+        recording.start()
+        try:
+            yield recording
+        finally:
+            recording.stop()
+
+class Recording:
+    """The samples of one recording, like one query or one load, and the phases it went through."""
+
+    def __init__(self, sources, interval, mode):
+        self.sources = sources
+        self.interval = interval
+        self.mode = mode
+        self.samples = []
+        self.phases = []
+        self.sampler_cpu_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        self.samples.append((time.time(), {source.name: source.sample() for source in self.sources}))
+
+    def _run(self):
+        started = time.thread_time()
+        self._sample()
+        while not self._stop.wait(self.interval):
+            self._sample()
+        # A last sample at the end, so even phases shorter than the interval are covered
+        self._sample()
+        self.sampler_cpu_seconds = time.thread_time() - started
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="telemetry-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def add_phase(self, name, start, end):
+        self.phases.append({"name": name, "start": start, "end": end})
+
+    @contextmanager
+    def phase(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_phase(name, start, time.time())
+
+    def phased(self, run_query, warmup):
+        """Wrap a query runner so its warmup runs and measured runs are recorded as phases."""
+        calls = []
+
+        def run(query):
+            calls.append(None)
+            name = f"warmup-{len(calls)}" if len(calls) <= warmup else f"run-{len(calls) - warmup}"
+            with self.phase(name):
+                return run_query(query)
+        return run
+
+    def report(self):
+        """Turn the samples into per-source time series, and summarize them over every phase."""
+        started = self.samples[0][0] if self.samples else time.time()
+        wall = self.samples[-1][0] - started if self.samples else 0.0
+        phases = [{"name": phase["name"], "start": phase["start"] - started, "end": phase["end"] - started}
+                  for phase in self.phases]
+        sources = {}
+        for source in self.sources:
+            series = source_series(self.samples, source.name, started)
+            summaries = {phase["name"]: summarize(series, source.limits, phase["start"], phase["end"]) for phase in phases}
+            sources[source.name] = {
+                "kind": source.kind,
+                "limits": source.limits,
+                "series": series,
+                "overall": summarize(series, source.limits, 0.0, wall),
+                "phases": summaries,
+                "peaks": peaks(series, phases),
+            }
+        return {
+            "mode": self.mode,
+            "interval": self.interval,
+            "startedAt": started,
+            "wallSeconds": wall,
+            "samples": len(self.samples),
+            "samplerCpuSeconds": self.sampler_cpu_seconds,
+            # Share of one core the sampler itself used, its overhead on the measured engines
+            "overhead": self.sampler_cpu_seconds / wall if wall > 0 else None,
+            "phases": phases,
+            "sources": sources,
+        }
+
+def source_series(samples, name, started):
+    """Return the rates and levels of a source between consecutive samples, at the end time of each interval."""
+    series = {"time": []}
+    metrics = set().union(*(counters.get(name, {}) for _, counters in samples)) if samples else set()
+    for metric in metrics:
+        series[RATE_METRICS.get(metric) or LEVEL_METRICS[metric]] = []
+    for (previous_time, previous), (sample_time, current) in zip(samples, samples[1:]):
+        previous, current = previous.get(name, {}), current.get(name, {})
+        elapsed = sample_time - previous_time
+        series["time"].append(sample_time - started)
+        for metric in metrics:
+            key = RATE_METRICS.get(metric) or LEVEL_METRICS[metric]
+            if metric in LEVEL_METRICS:
+                value = current[metric] / MEGABYTE if metric in current else None
+            elif metric in current and metric in previous and elapsed > 0:
+                # Counters of exited processes drop out of a process tree, so a rate is never negative
+                value = max(current[metric] - previous[metric], 0) / elapsed
+                if metric in ("read", "write", "rx", "tx"):
+                    value /= MEGABYTE
+            else:
+                value = None
+            series[key].append(value)
+    return series
+
+def overlapping(series, start, end):
+    """Return the indexes of the sample intervals overlapping a time window."""
+    times = series["time"]
+    return [index for index, time_end in enumerate(times)
+            if time_end > start and (times[index - 1] if index else 0.0) < end]
+
+def summarize(series, limits, start, end):
+    """Summarize a source over a time window: mean and peak of every metric, and the resource it was bound by.
+
+    A window is bound by CPU when it used at least BOUND_THRESHOLD of the cores the source may use,
+    and by I/O or memory when it was stalled on them at least that share of the time.
+    """
+    indexes = overlapping(series, start, end)
+    summary = {}
+    for key, values in series.items():
+        values = [values[index] for index in indexes if values[index] is not None] if key != "time" else None
+        if values:
+            summary[key] = {"mean": sum(values) / len(values), "peak": max(values)}
+    pressure = {}
+    if "cpuCores" in summary and limits.get("cpuCores"):
+        pressure["cpu"] = summary["cpuCores"]["mean"] / limits["cpuCores"]
+    for resource in ("io", "memory"):
+        if f"{resource}Stall" in summary:
+            pressure[resource] = summary[f"{resource}Stall"]["mean"]
+    if "memoryMb" in summary and limits.get("memoryMb"):
+        summary["memoryUsed"] = summary["memoryMb"]["peak"] / limits["memoryMb"]
+    summary["pressure"] = pressure
+    resource = max(pressure, key=pressure.get) if pressure else None
+    summary["boundBy"] = resource if resource is not None and pressure[resource] >= BOUND_THRESHOLD else None
+    return summary
+
+def peaks(series, phases):
+    """Return when every metric of a source peaked and the phases it peaked in."""
+    result = {}
+    for key, values in series.items():
+        if key == "time":
+            continue
+        measured = [(value, index) for index, value in enumerate(values) if value is not None]
+        if not measured:
+            continue
+        value, index = max(measured)
+        at_end = series["time"][index]
+        at_start = series["time"][index - 1] if index else 0.0
+        result[key] = {
+            "value": value,
+            "at": at_end,
+            "phases": [phase["name"] for phase in phases if phase["start"] < at_end and phase["end"] > at_start],
+        }
+    return result
+
+def bound_sources(report):
+    """Describe the sources that were bound by a resource during a recording, like 'postgres cpu'."""
+    return [f"{name} {source['overall']['boundBy']}" for name, source in report["sources"].items()
+            if source["overall"]["boundBy"]]
+
+def plot_telemetry(report, chart_path, title):
+    """Save the CPU, memory and disk series of every source as a chart, with the phases shaded behind them."""
+    panels = [("cpuCores", "CPU (cores)"), ("memoryMb", "Memory (MB)"), ("readMbPerSec", "Disk read (MB/s)"),
+              ("writeMbPerSec", "Disk write (MB/s)")]
+    panels = [(key, label) for key, label in panels
+              if any(key in source["series"] for source in report["sources"].values())]
+    figure, axes = plt.subplots(len(panels), 1, figsize=(12, 2.5 * len(panels)), sharex=True, squeeze=False)
+    for (key, label), axis in zip(panels, axes[:, 0]):
+        for index, phase in enumerate(report["phases"]):
+            axis.axvspan(phase["start"], phase["end"], color="lightgray" if index % 2 else "whitesmoke", zorder=0)
+        for name, source in report["sources"].items():
+            if key in source["series"]:
+                # Every value covers the interval up to its sample time, the first one from the first sample
+                values = source["series"][key]
+                axis.step([0.0] + source["series"]["time"], values[:1] + values, where="pre", linewidth=1, label=name)
+        axis.ticklabel_format(axis="y", useOffset=False)
+        axis.set_ylabel(label)
+        axis.grid(linestyle="--", alpha=0.7)
+    top = axes[0, 0]
+    # Name the phases along the top while there is room for them, with the title above the longest name
+    labelled = report["phases"] if len(report["phases"]) <= MAX_LABELLED_PHASES else []
+    for phase in labelled:
+        top.annotate(phase["name"], ((phase["start"] + phase["end"]) / 2, 1), xycoords=("data", "axes fraction"),
+                     rotation=90, fontsize="x-small", ha="center", va="bottom")
+    top.set_title(title, pad=10 + 4.5 * max((len(phase["name"]) for phase in labelled), default=0))
+    top.legend(loc="center left", bbox_to_anchor=(1, 0.5), fontsize="small")
+    axes[-1, 0].set_xlabel("Seconds")
+
+    os.makedirs(os.path.dirname(os.path.abspath(chart_path)), exist_ok=True)
+    plt.savefig(chart_path, bbox_inches="tight")
+    print(f"Telemetry chart saved to {chart_path}")
+    plt.close(figure)
+
+def journal_windows(path, offset):
+    """Return the table writes the loaders appended to the load journal after an offset, as named time windows."""
+    try:
+        with open(path, "rb") as file:
+            file.seek(offset)
+            lines = file.read().splitlines()
+    except OSError:
+        return []
+    started, windows = {}, []
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        key = (event["store"], tuple(event["tables"]), event["pid"])
+        if event["event"] == "start":
+            started.setdefault(key, []).append(event["time"])
+        elif started.get(key):
+            windows.append({"name": f"{event['store']}:{','.join(event['tables'])}",
+                            "start": started[key].pop(0), "end": event["time"]})
+    return sorted(windows, key=lambda window: window["start"])
+
+def record_load(args):
+    """Run a loader command while sampling it and the containers, with every table it writes as a phase."""
+    if not args.loader:
+        raise ValueError("Give the loader command to run after --, like -- python load/multi-loader.py --scenarios 0")
+    full = args.mode == "full"
+    sources = discover_containers(args.containers, full)
+    journal_offset = os.path.getsize(args.journal) if os.path.exists(args.journal) else 0
+    process = subprocess.Popen(args.loader)
+    sources.append(ProcessTreeSource("loader", process.pid, full))
+    telemetry = Telemetry(sources, args.mode, args.interval)
+    print(f"Sampling {', '.join(source.name for source in sources)} every {telemetry.interval}s ({args.mode} mode)")
+    try:
+        with telemetry.recording() as recording:
+            return_code = process.wait()
+    except KeyboardInterrupt:
+        process.terminate()
+        raise
+    for window in journal_windows(args.journal, journal_offset):
+        recording.add_phase(window["name"], window["start"], window["end"])
+
+    report = recording.report()
+    report["command"] = args.loader
+    report["returnCode"] = return_code
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=4)
+    print(f"Load telemetry saved to {args.output}")
+    for name, source in report["sources"].items():
+        for phase, summary in source["phases"].items():
+            if summary["boundBy"]:
+                print(f"  {phase}: {name} bound by {summary['boundBy']}")
+    plot_telemetry(report, os.path.splitext(args.output)[0] + ".png", "Resource Usage during the Load")
+    if return_code:
+        raise ValueError(f"The loader exited with code {return_code}")
+
+def chart(args):
+    """Chart the telemetry of a load report or of a query result file."""
+    with open(args.file, "r") as file:
+        report = json.load(file)
+    report = report.get("telemetry", report)
+    if "sources" not in report:
+        raise ValueError(f"{args.file} holds no telemetry, run the harness with --telemetry")
+    name = os.path.splitext(os.path.basename(args.file))[0]
+    plot_telemetry(report, args.output or os.path.splitext(args.file)[0] + "_telemetry.png", f"Resource Usage of {name}")
+
+def list_sources(args):
+    """Print the sources that would be sampled and the counters readable for each."""
+    sources = discover_containers(args.containers) or [CgroupSource("host", 1)]
+    for source in sources:
+        cores = source.limits["cpuCores"]
+        memory = f"{source.limits['memoryMb']:.0f} MB" if source.limits["memoryMb"] else "no memory limit"
+        print(f"{source.name} (pid {source.pid}): {', '.join(sorted(source.sample()))}; {cores:g} cores, {memory}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Sample the CPU, memory, disk and network use of the benchmark containers and processes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sources_parser = commands.add_parser("sources", help="list the containers that would be sampled and their counters")
+    load_parser = commands.add_parser("load", help="run a loader command and sample it, with its tables as phases")
+    load_parser.add_argument("--mode", choices=sorted(MODES), default="full",
+                             help="read every counter, or only CPU and memory at a longer interval")
+    load_parser.add_argument("--interval", type=float, help="seconds between samples (default: 0.2 full, 1 light)")
+    load_parser.add_argument("--journal", default=LOAD_JOURNAL_FILE, help="load journal the loaders append their writes to")
+    load_parser.add_argument("--output", default=os.path.join(RESULTS_LOCAL_PATH or ".", "telemetry", "load-telemetry.json"),
+                             help="JSON report to write, with a chart next to it")
+    load_parser.add_argument("loader", nargs=argparse.REMAINDER, help="loader command, after --")
+    chart_parser = commands.add_parser("chart", help="chart the telemetry of a load report or a query result file")
+    chart_parser.add_argument("file", help="load telemetry report, or query result JSON of a --telemetry harness run")
+    chart_parser.add_argument("--output", help="chart file (default: next to the file)")
+    for command in (sources_parser, load_parser):
+        command.add_argument("--containers", nargs="+", default=list(DEFAULT_CONTAINERS),
+                             help="parts of the names of the containers to sample")
+    args = parser.parse_args()
+    if getattr(args, "loader", None) and args.loader[0] == "--":
+        args.loader = args.loader[1:]
+    return args
+
+def main():
+    args = parse_args()
+    if args.command == "sources":
+        list_sources(args)
+    elif args.command == "load":
+        record_load(args)
+    else:
+        chart(args)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+def parse_presto_duration(value):
+    """Convert a Presto duration string such as '1.50s', '350.00ms' or '2.10m' to seconds."""
+    if not value:
+        return None
+    units = {"ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600, "d": 86400}
+    for unit in ("ns", "us", "ms", "s", "m", "h", "d"):
+        if value.endswith(unit):
+            try:
+                return float(value[:-len(unit)]) * units[unit]
+            except ValueError:
+                return None
+    return None
+
+def stream_order(query_names, stream, seed):
+    """Return the query order of a stream, a reproducible permutation like the TPC-DS throughput test.
+
+    Stream 0 runs the queries in their original order.
+    """
+    order = sorted(query_names)
+    if stream > 0:
+        random.Random(seed + stream).shuffle(order)
+    return order
+
+def run_throughput_test(queries, run_query, streams, seed=0):
+    """Run every query once in each of the concurrent streams and collect per-execution stats.
+
+    queries maps a query name to its SQL. run_query(sql) must return a dictionary that may
+    contain "executionTime" and "queuedTime" in seconds. Client wall time is measured here.
+    """
+    executions = []
+    lock = threading.Lock()
+
+    def run_stream(stream):
+        for name in stream_order(queries.keys(), stream, seed):
+            started = time.perf_counter()
+            error = None
+            stats = {}
+            try:
+                stats = run_query(queries[name]) or {}
+            except Exception as e:
+                error = str(e)
+            finished = time.perf_counter()
+            with lock:
+                executions.append({
+                    "stream": stream,
+                    "query": name,
+                    "start": started - test_started,
+                    "wallTime": finished - started,
+                    "executionTime": stats.get("executionTime"),
+                    "queuedTime": stats.get("queuedTime"),
+                    "error": error,
+                })
+            print(f"Stream {stream}: {name} finished in {finished - started:.3f}s" + (f" with error: {error}" if error else ""))
+
+    test_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=streams) as executor:
+        list(executor.map(run_stream, range(streams)))
+    elapsed = time.perf_counter() - test_started
+    return summarize(executions, streams, elapsed)
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+def summarize(executions, streams, elapsed):
+    """Build the throughput report: queries per hour and per-query latency and queueing under load."""
+    completed = [execution for execution in executions if execution["error"] is None]
+    per_query = {}
+    for name in sorted({execution["query"] for execution in executions}):
+        runs = [execution for execution in completed if execution["query"] == name]
+        per_query[name] = {
+            "runs": len(runs),
+            "errors": sum(1 for execution in executions if execution["query"] == name and execution["error"]),
+            "meanWallTime": _mean(run["wallTime"] for run in runs),
+            "maxWallTime": max((run["wallTime"] for run in runs), default=None),
+            "meanExecutionTime": _mean(run["executionTime"] for run in runs),
+            "meanQueuedTime": _mean(run["queuedTime"] for run in runs),
+        }
+    return {
+        "streams": streams,
+        "elapsedTime": elapsed,
+        "completedQueries": len(completed),
+        "failedQueries": len(executions) - len(completed),
+        "queriesPerHour": len(completed) * 3600 / elapsed if elapsed > 0 else None,
+        "queries": per_query,
+        "executions": sorted(executions, key=lambda execution: execution["start"]),
+    }
+
+def save_throughput_report(report, results_path):
+    """Write the throughput report next to the per-query results and print its summary."""
+    os.makedirs(results_path, exist_ok=True)
+    output_file = os.path.join(results_path, f"throughput-{report['streams']}-streams.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=4)
+    rate = f": {report['queriesPerHour']:.1f} queries/hour" if report["queriesPerHour"] is not None else ""
+    print(f"{report['completedQueries']} queries in {report['elapsedTime']:.2f}s with {report['streams']} streams"
+          f"{rate} ({report['failedQueries']} failed)")
+    print(f"Throughput report saved to {output_file}")
@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+import matplotlib.pyplot as plt
+from dotenv import load_dotenv
+from executors import make_executor
+from harness import RESULTS_LOCAL_PATH, load_scenario, render_queries, results_path
+from run_stats import load_statistics
+
+load_dotenv()
+
+VERIFICATION_FILE = "verification.json"
+# Decimal places numbers are rounded to before hashing, as engines compute averages with different scales
+DEFAULT_PRECISION = 2
+HASH_MODULUS = 2 ** 64
+NUMERIC_TYPE_PREFIXES = ("decimal", "double", "real", "bigint", "integer", "smallint", "tinyint")
+
+def canonical_value(value, type_name=None, precision=DEFAULT_PRECISION):
+    """Encode a value the same way whichever engine returned it.
+
+    Numbers are rounded to precision decimal places, strings lose the padding of CHAR columns,
+    dates and timestamps use ISO format and NULL is encoded as \\N.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    numeric_type = type_name is not None and type_name.lower().startswith(NUMERIC_TYPE_PREFIXES)
+    if isinstance(value, (int, float, Decimal)) or (numeric_type and isinstance(value, str)):
+        try:
+            number = Decimal(str(value)).quantize(Decimal(1).scaleb(-precision), rounding=ROUND_HALF_EVEN)
+            # Avoid "-0.00" and "0.00" hashing differently
+            return str(number + 0)
+        except InvalidOperation:
+            return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value).rstrip()
+
+class ResultHasher:
+    """Order-insensitive hash of a result set, updated a page at a time.
+
+    Every row is hashed on its own and the row hashes are added modulo 2^64, so the hash does
+    not depend on the row order, duplicate rows still count, and only the running sum is kept.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.row_count = 0
+        self.column_count = None
+        self._sum = 0
+
+    def update(self, columns, rows):
+        types = [type_name for _, type_name in columns]
+        self.column_count = len(columns)
+        for row in rows:
+            encoded = "\x1f".join(canonical_value(value, type_name, self.precision) for value, type_name in zip(row, types))
+            row_hash = hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).digest()
+            self._sum = (self._sum + int.from_bytes(row_hash, "big")) % HASH_MODULUS
+            self.row_count += 1
+
+    def hexdigest(self):
+        return f"{self._sum:016x}"
+
+def verify_scenario(scenario, names=None, precision=DEFAULT_PRECISION):
+    """Stream the results of every query of a scenario, and save their row counts and hashes."""
+    queries = render_queries(scenario, names)
+    executor = make_executor(scenario["engine"], scenario.get("settings"))
+    verification = {}
+    try:
+        for name, query in queries.items():
+            hasher = ResultHasher(precision)
+            try:
+                executor.stream_rows(query, hasher.update)
+                verification[name] = {"rowCount": hasher.row_count, "columnCount": hasher.column_count,
+                                      "hash": hasher.hexdigest()}
+                print(f"{scenario['name']} {name}: {hasher.row_count} rows, hash {hasher.hexdigest()}")
+            except Exception as e:
+                verification[name] = {"error": str(e)}
+                print(f"Error verifying {scenario['name']} {name}: {e}")
+    finally:
+        executor.close()
+
+    path = results_path(scenario)
+    os.makedirs(path, exist_ok=True)
+    output_file = os.path.join(path, VERIFICATION_FILE)
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump({"precision": precision, "queries": verification}, output, indent=4)
+    print(f"Verification saved to {output_file}")
+    return verification
+
+def load_verification(scenario):
+    with open(os.path.join(results_path(scenario), VERIFICATION_FILE), 'r') as verification_file:
+        return json.load(verification_file)["queries"]
+
+def compare_verifications(reference_name, verifications):
+    """Compare the results of every scenario with the reference scenario's, query by query.
+
+    A query is verified in a scenario when both ran it without error and returned the same number
+    of rows with the same hash.
+    """
+    reference = verifications[reference_name]
+    report = {}
+    for name in sorted(reference):
+        expected = reference[name]
+        outcomes = {}
+        for scenario_name, verification in verifications.items():
+            if scenario_name == reference_name:
+                continue
+            actual = verification.get(name)
+            if actual is None:
+                outcomes[scenario_name] = "missing"
+            elif "error" in actual or "error" in expected:
+                outcomes[scenario_name] = "error"
+            elif actual["rowCount"] != expected["rowCount"]:
+                outcomes[scenario_name] = f"row count {actual['rowCount']} instead of {expected['rowCount']}"
+            elif actual["hash"] != expected["hash"]:
+                outcomes[scenario_name] = "different rows"
+            else:
+                outcomes[scenario_name] = "verified"
+        report[name] = outcomes
+    return report
+
+def verified_queries(report, scenario_names):
+    """Return the queries whose results matched the reference in all the given scenarios."""
+    return [name for name, outcomes in report.items()
+            if all(outcomes.get(scenario_name, "verified") == "verified" for scenario_name in scenario_names)]
+
+def plot_comparison_chart(query_stats, queries, chart_path):
+    """Save a grouped bar chart of the median latency of the verified queries in every scenario."""
+    scenario_names = list(query_stats)
+    width = 0.8 / len(scenario_names)
+    plt.figure(figsize=(12, 5))
+    for index, scenario_name in enumerate(scenario_names):
+        positions = [query_index + index * width for query_index in range(len(queries))]
+        medians = [query_stats[scenario_name].get(name, {}).get("median", 0) for name in queries]
+        plt.bar(positions, medians, width=width, label=scenario_name)
+    plt.xticks([query_index + 0.4 - width / 2 for query_index in range(len(queries))], queries, rotation=45, ha="right")
+    plt.xlabel("SQL File Name")
+    plt.ylabel("Query Latency (seconds, median)")
+    plt.title("Query Execution Times of Verified Queries")
+    plt.legend()
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    os.makedirs(os.path.dirname(chart_path), exist_ok=True)
+    plt.savefig(chart_path, bbox_inches='tight')
+    print(f"Comparison chart saved to {chart_path}")
+    plt.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Verify the query results of scenarios against a reference scenario and compare only verified queries.")
+    parser.add_argument("scenarios", nargs="+", help="scenarios to compare, the first one is the reference (like scenario-0)")
+    parser.add_argument("--run", action="store_true",
+                        help="run the queries and hash their results first, instead of reading earlier verification files")
+    parser.add_argument("--queries", nargs="+", help="query names to verify (default: all)")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help="decimal places numbers are rounded to before hashing")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scenarios = [load_scenario(name) for name in args.scenarios]
+    verifications = {}
+    for scenario in scenarios:
+        if args.run:
+            verifications[scenario["name"]] = verify_scenario(scenario, args.queries, args.precision)
+        else:
+            verifications[scenario["name"]] = load_verification(scenario)
+
+    reference_name = scenarios[0]["name"]
+    other_names = [scenario["name"] for scenario in scenarios[1:]]
+    report = compare_verifications(reference_name, verifications)
+    queries = verified_queries(report, other_names)
+    for name, outcomes in report.items():
+        failures = {scenario_name: outcome for scenario_name, outcome in outcomes.items() if outcome != "verified"}
+        if failures:
+            print(f"{name}: " + ", ".join(f"{scenario_name} {outcome}" for scenario_name, outcome in failures.items()))
+    print(f"{len(queries)} of {len(report)} queries return the same results as {reference_name} in {', '.join(other_names)}")
+
+    query_stats = {scenario["name"]: load_statistics(results_path(scenario)) for scenario in scenarios}
+    comparison = {
+        "reference": reference_name,
+        "verified": queries,
+        "outcomes": report,
+        "medianExecutionTime": {
+            scenario_name: {name: stats[name]["median"] for name in queries if name in stats}
+            for scenario_name, stats in query_stats.items()
+        },
+    }
+    output_file = os.path.join(RESULTS_LOCAL_PATH, f"comparison-{'-'.join(scenario['name'] for scenario in scenarios)}.json")
+    with open(output_file, 'w', encoding='utf-8') as output:
+        json.dump(comparison, output, indent=4)
+    print(f"Comparison saved to {output_file}")
+    if queries:
+        plot_comparison_chart(query_stats, queries, os.path.splitext(output_file)[0] + ".png")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
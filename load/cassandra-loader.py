@@ -0,0 +1,138 @@
+import os
+import time
+import argparse
+import load_profile
+from dotenv import load_dotenv
+from cassandra_ddl import CASSANDRA_DDL_FILE, parse_cassandra_ddl, split_statements
+from checkpoint import DEFAULT_CHUNK_SIZE_MB, CheckpointManifest
+from cassandra_modeler import QUERY_TABLES_DDL_FILE, query_table_definitions
+from data_prep import fan_out
+from load_profile import add_profile_arguments, finish_profile, start_profile
+from sinks import connect_cassandra, make_cassandra_sink
+
+load_dotenv()
+
+DATA_DIR = os.getenv("TEST_DATA_LOCAL_PATH")
+CASSANDRA_HOST = os.getenv("CASSANDRA_HOST", "localhost")
+CASSANDRA_PORT = int(os.getenv("CASSANDRA_PORT", 9042))
+
+DEFAULT_CONCURRENCY = 64
+# Rows of the same partition sent together in one unlogged batch, kept small to stay
+# below Cassandra's batch_size_warn_threshold
+DEFAULT_PARTITION_BATCH_ROWS = 20
+
+def create_schema(session, ddl_file=CASSANDRA_DDL_FILE):
+    """Create the keyspace and tables from cassandra-ddl.sql, or the query tables from their generated DDL."""
+    try:
+        with open(ddl_file, "r") as file:
+            statements = split_statements(file.read())
+        for statement in statements:
+            session.execute(statement.replace("CREATE KEYSPACE ", "CREATE KEYSPACE IF NOT EXISTS ")
+                                     .replace("CREATE TABLE ", "CREATE TABLE IF NOT EXISTS "))
+        print("Schema created successfully.")
+    except Exception as e:
+        print(f"An error occurred while creating schema: {e}")
+
+def load_table(session, table_name, table_definition, file_path, args, batches=None, query_tables=None, manifest=None):
+    """Stream the rows of a .dat file into a Cassandra table, and its query tables, and return the row count.
+
+    The file is read once and every block is written to the table and each of its query tables.
+    With a checkpoint manifest it is loaded in byte-range chunks, each recorded once its writes
+    are acknowledged, and the chunks the manifest lists are skipped. Writes are upserts of the
+    primary key, so a chunk interrupted halfway can simply be written again.
+    """
+    if manifest is None or batches is not None:
+        chunks = [(0, None)]
+    else:
+        chunks = manifest.plan("cassandra", table_name, file_path, args.chunk_size * 1024 * 1024)
+    rows = 0
+    for start, end in chunks:
+        sinks = []
+        for name, definition in [(table_name, table_definition)] + sorted((query_tables or {}).items()):
+            sink, column_count = make_cassandra_sink(session, name, definition, args.concurrency,
+                                                     args.partition_batch_rows, source_table=table_name)
+            sinks.append(sink)
+        chunk_rows, errors = fan_out(file_path, sinks, column_count, start, end, batches=batches)
+        if errors:
+            raise next(iter(errors.values()))
+        if manifest is not None and batches is None:
+            manifest.commit("cassandra", table_name, start, end, chunk_rows)
+        rows += chunk_rows
+    return rows
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load the TPC-DS .dat files into the is_keyspace Cassandra tables.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="number of writes kept in flight")
+    parser.add_argument("--partition-batch-rows", type=int, default=DEFAULT_PARTITION_BATCH_ROWS,
+                        help="maximum rows of one partition sent as an unlogged batch, 1 disables grouping")
+    parser.add_argument("--create-schema", action="store_true",
+                        help="create the keyspace and tables from migration/cassandra-ddl.sql first")
+    parser.add_argument("--tables", nargs="*",
+                        help="only load these tables (default: every .dat file in TEST_DATA_LOCAL_PATH)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE_MB,
+                        help="size in MB of the chunks files are loaded and checkpointed in")
+    parser.add_argument("--resume", action="store_true",
+                        help="load only the chunks not committed by an earlier run")
+    parser.add_argument("--query-tables", action="store_true",
+                        help="also load the date-partitioned query tables generated by cassandra_modeler.py")
+    parser.add_argument("--cache", action="store_true",
+                        help="read the tables from the columnar cache, building it on first use (needs pyarrow)")
+    add_profile_arguments(parser, "cassandra-loader")
+    args = parser.parse_args()
+    if args.resume and args.cache:
+        parser.error("--resume cannot be used with --cache: cached tables are loaded in one piece without checkpoints")
+    return args
+
+def main():
+    args = parse_args()
+    if args.cache:
+        # pyarrow is only needed when the cache is used
+        from columnar_cache import iter_cached_batches
+    table_definitions = parse_cassandra_ddl()
+    manifest = CheckpointManifest(resume=args.resume)
+    query_tables = {}
+    if args.query_tables:
+        for name, definition in query_table_definitions().items():
+            query_tables.setdefault(definition["source"], {})[name] = definition
+    cluster, session = connect_cassandra(CASSANDRA_HOST, CASSANDRA_PORT)
+    profile = start_profile(args, "cassandra-loader")
+    try:
+        if args.create_schema:
+            create_schema(session)
+            if args.query_tables:
+                create_schema(session, QUERY_TABLES_DDL_FILE)
+        totals = [0, 0.0]
+        for file_name in sorted(os.listdir(DATA_DIR)):
+            if not file_name.endswith(".dat"):
+                continue
+            table_name = os.path.splitext(file_name)[0].lower()
+            if args.tables and table_name not in args.tables:
+                continue
+            file_path = os.path.join(DATA_DIR, file_name)
+            try:
+                if table_name not in table_definitions:
+                    raise FileNotFoundError(f"Table {table_name} is not defined in cassandra-ddl.sql")
+                started = time.perf_counter()
+                batches = iter_cached_batches(table_name, file_path) if args.cache else None
+                with load_profile.table(table_name):
+                    rows = load_table(session, table_name, table_definitions[table_name], file_path, args, batches,
+                                      query_tables.get(table_name), manifest)
+                elapsed = time.perf_counter() - started
+                totals[0] += rows
+                totals[1] += elapsed
+                rows_per_sec = rows / elapsed if elapsed > 0 else 0
+                copies = "".join(f", {name}" for name in sorted(query_tables.get(table_name, {})))
+                print(f"Data loaded into is_keyspace.{table_name}{copies}: {rows} rows in {elapsed:.2f}s ({rows_per_sec:.0f} rows/sec)")
+            except FileNotFoundError as e:
+                print(e)
+            except Exception as e:
+                print(f"Error loading data into Cassandra table {table_name}: {e}")
+        if totals[1] > 0:
+            print(f"Total: {totals[0]} rows in {totals[1]:.2f}s ({totals[0] / totals[1]:.0f} rows/sec)")
+    finally:
+        cluster.shutdown()
+        finish_profile(profile, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import re
+
+CASSANDRA_DDL_FILE = os.path.join(os.path.dirname(__file__), "..", "migration", "cassandra-ddl.sql")
+
+CREATE_TABLE_PATTERN = re.compile(r"CREATE TABLE\s+(\w+)\.(\w+)\s*\((.*?)\);", re.IGNORECASE | re.DOTALL)
+PRIMARY_KEY_PATTERN = re.compile(r"PRIMARY KEY\s*\((.*)\)", re.IGNORECASE | re.DOTALL)
+
+def split_statements(ddl):
+    """Split a CQL script into statements, dropping '--' comments."""
+    lines = [line for line in ddl.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+def parse_primary_key(definition):
+    """Return the partition key and clustering columns of a PRIMARY KEY definition."""
+    definition = definition.strip()
+    if definition.startswith("("):
+        # Composite partition key, e.g. ((a, b), c)
+        closing = definition.index(")")
+        partition_key = [column.strip().lower() for column in definition[1:closing].split(",")]
+        rest = definition[closing + 1:].lstrip(" ,")
+    else:
+        columns = [column.strip().lower() for column in definition.split(",")]
+        partition_key, rest = columns[:1], ", ".join(columns[1:])
+    clustering = [column.strip().lower() for column in rest.split(",") if column.strip()]
+    return partition_key, clustering
+
+def parse_cassandra_ddl(ddl_file=CASSANDRA_DDL_FILE):
+    """Parse the CREATE TABLE statements of a CQL file.
+
+    Returns a dictionary keyed by table name with the keyspace, the (column, type) pairs in
+    declaration order, the partition key columns and the clustering columns.
+    """
+    with open(ddl_file, "r") as file:
+        ddl = file.read()
+
+    tables = {}
+    for keyspace, table_name, body in CREATE_TABLE_PATTERN.findall(ddl):
+        columns = []
+        partition_key, clustering = [], []
+        for definition in body.split("\n"):
+            definition = definition.strip().rstrip(",")
+            if not definition:
+                continue
+            primary_key = PRIMARY_KEY_PATTERN.match(definition)
+            if primary_key:
+                partition_key, clustering = parse_primary_key(primary_key.group(1))
+                continue
+            name, column_type = definition.split()[:2]
+            columns.append((name.lower(), column_type.upper()))
+        tables[table_name.lower()] = {
+            "keyspace": keyspace,
+            "columns": columns,
+            "partition_key": partition_key,
+            "clustering": clustering,
+        }
+    return tables
@@ -0,0 +1,135 @@
+import os
+import re
+import json
+import argparse
+from collections import Counter, defaultdict
+from cassandra_ddl import parse_cassandra_ddl
+
+QUERIES_DIR = os.path.join(os.path.dirname(__file__), "..", "benchmark", "queries")
+QUERY_TABLES_DDL_FILE = os.path.join(os.path.dirname(__file__), "..", "migration", "cassandra-query-tables.sql")
+QUERY_TABLES_MAPPING_FILE = os.path.join(os.path.dirname(__file__), "..", "migration", "cassandra-query-tables.json")
+
+DATE_TABLE = "date_dim"
+# Suffix of the date-partitioned copy of a fact table
+QUERY_TABLE_SUFFIX = "_by_date"
+# Cassandra keys cannot be null, so null keys of the copies are stored as this value, which no
+# dimension key equals, so inner joins on them still find nothing
+NULL_KEY = -1
+DEFAULT_MIN_QUERIES = 2
+DEFAULT_CLUSTERING_COLUMNS = 1
+
+TABLE_PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+JOIN_PATTERN = re.compile(r"(?:\w+\.)?(\w+)\s*=\s*(?:\w+\.)?(\w+)")
+
+def load_query_templates(queries_dir=QUERIES_DIR):
+    """Read the benchmark query templates, keyed by query name."""
+    templates = {}
+    for sql_file in sorted(os.listdir(queries_dir)):
+        if sql_file.endswith(".sql"):
+            with open(os.path.join(queries_dir, sql_file), "r") as query_file:
+                templates[os.path.splitext(sql_file)[0]] = query_file.read()
+    return templates
+
+def query_joins(template, column_tables):
+    """Return the equi-joins of a query template as (column, joined column) pairs of two different tables."""
+    sql = re.sub(r"--[^\n]*", "", TABLE_PLACEHOLDER_PATTERN.sub(lambda match: match.group(1), template))
+    joins = set()
+    for left, right in JOIN_PATTERN.findall(sql.lower()):
+        if left in column_tables and right in column_tables and column_tables[left] != column_tables[right]:
+            joins.add((left, right))
+            joins.add((right, left))
+    return joins
+
+def design_query_tables(templates, tables, min_queries=DEFAULT_MIN_QUERIES, clustering_columns=DEFAULT_CLUSTERING_COLUMNS):
+    """Design a date-partitioned copy of every table the queries join to date_dim.
+
+    The copy is partitioned by the date key the queries join most, so a restriction of that key
+    reaches single partitions, and clustered by the dimension keys the same queries join most
+    (like the item or customer), followed by the table's own key columns to keep rows unique.
+    Only tables whose date key at least min_queries queries join get a copy.
+    """
+    column_tables = {column: table_name for table_name, table in tables.items() for column, _ in table["columns"]}
+    dimension_keys = {table["partition_key"][0] for table in tables.values()
+                      if len(table["partition_key"]) == 1 and not table["clustering"]}
+    date_key = tables[DATE_TABLE]["partition_key"][0]
+    date_joins = defaultdict(Counter)
+    key_joins = defaultdict(Counter)
+    queries = defaultdict(set)
+    for name, template in templates.items():
+        for column, joined in query_joins(template, column_tables):
+            table_name = column_tables[column]
+            if table_name == DATE_TABLE or column in dimension_keys:
+                continue
+            if joined == date_key:
+                date_joins[table_name][column] += 1
+                queries[table_name].add(name)
+            elif joined in dimension_keys:
+                key_joins[table_name][column] += 1
+
+    designs = {}
+    for table_name, counts in sorted(date_joins.items()):
+        partition_column, count = max(counts.items(), key=lambda item: (item[1], item[0]))
+        table = tables[table_name]
+        # Tables already partitioned by their date key, like inventory, need no copy
+        if count < min_queries or table["partition_key"] == [partition_column]:
+            continue
+        ranked = sorted((column for column in key_joins[table_name] if column != partition_column),
+                        key=lambda column: (-key_joins[table_name][column], column))
+        clustering = ranked[:clustering_columns]
+        clustering += [column for column in table["partition_key"] + table["clustering"]
+                       if column not in clustering and column != partition_column]
+        designs[f"{table_name}{QUERY_TABLE_SUFFIX}"] = {
+            "source": table_name,
+            "keyspace": table["keyspace"],
+            "partition_key": [partition_column],
+            "clustering": clustering,
+            "null_key": NULL_KEY,
+            "queries": sorted(queries[table_name]),
+        }
+    return designs
+
+def query_table_ddl(name, design, tables):
+    """Return the CREATE TABLE statement of a query table, with the columns of its source table."""
+    source = tables[design["source"]]
+    lines = [f"    {column} {column_type}," for column, column_type in source["columns"]]
+    lines.append(f"    PRIMARY KEY (({', '.join(design['partition_key'])}), {', '.join(design['clustering'])})")
+    return f"CREATE TABLE {design['keyspace']}.{name} (\n" + "\n".join(lines) + "\n);\n"
+
+def query_table_definitions(mapping_file=QUERY_TABLES_MAPPING_FILE):
+    """Read the generated query tables as table definitions like parse_cassandra_ddl(), plus their source and null key."""
+    with open(mapping_file, "r") as file:
+        designs = json.load(file)
+    tables = parse_cassandra_ddl()
+    return {
+        name: dict(design, columns=tables[design["source"]]["columns"])
+        for name, design in designs.items()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate date-partitioned Cassandra copies of the fact tables for the benchmark queries.")
+    parser.add_argument("--min-queries", type=int, default=DEFAULT_MIN_QUERIES,
+                        help="queries that must join a table's date key for it to get a copy")
+    parser.add_argument("--clustering-columns", type=int, default=DEFAULT_CLUSTERING_COLUMNS,
+                        help="most joined dimension keys that lead the clustering columns")
+    parser.add_argument("--dry-run", action="store_true", help="print the designs without writing them")
+    args = parser.parse_args()
+
+    tables = parse_cassandra_ddl()
+    designs = design_query_tables(load_query_templates(), tables, args.min_queries, args.clustering_columns)
+    for name, design in designs.items():
+        print(f"{name}: partitioned by {', '.join(design['partition_key'])}, clustered by "
+              f"{', '.join(design['clustering'])} for {len(design['queries'])} queries")
+    if args.dry_run:
+        return
+
+    with open(QUERY_TABLES_DDL_FILE, "w") as ddl_file:
+        ddl_file.write("-- Generated by load/cassandra_modeler.py from the benchmark queries, do not edit\n\n")
+        ddl_file.write("\n".join(query_table_ddl(name, design, tables) for name, design in designs.items()))
+    with open(QUERY_TABLES_MAPPING_FILE, "w") as mapping_file:
+        json.dump(designs, mapping_file, indent=4)
+        mapping_file.write("\n")
+    print(f"Query tables written to {QUERY_TABLES_DDL_FILE} and {QUERY_TABLES_MAPPING_FILE}")
+
+if __name__ == "__main__":
+    main()
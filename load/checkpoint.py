@@ -0,0 +1,99 @@
+import os
+import json
+import threading
+from data_prep import split_into_chunks
+
+def checkpoint_path():
+    """Return the checkpoint manifest file, read when a manifest is created so the loaders' .env applies."""
+    return os.getenv("LOAD_CHECKPOINT_FILE") or os.path.join(
+        os.getenv("TEST_DATA_TMP_LOCAL_PATH") or ".", "load-checkpoint.json")
+
+# Files bigger than this are split into byte-range chunks that are loaded and committed one by one
+DEFAULT_CHUNK_SIZE_MB = 64
+
+# PostgreSQL table recording the chunks committed in the same transaction as their rows
+POSTGRES_CHECKPOINT_TABLE = "load_checkpoints"
+
+class CheckpointManifest:
+    """Records the byte-range chunks of every table committed to every store in a JSON file.
+
+    The file is replaced atomically after every commit, so after a crash it lists every chunk
+    whose rows are committed and a resumed load only loads the others. The chunks of a table
+    are forgotten when the load does not resume, or when its source file or chunk size changed.
+    """
+
+    def __init__(self, path=None, resume=False):
+        self.path = path or checkpoint_path()
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as file:
+                self._entries = json.load(file)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self._entries, file, indent=4)
+        os.replace(temp_path, self.path)
+
+    def plan(self, store, table_name, file_path, chunk_size):
+        """Split a file into chunks and return the (start, end) ranges the store has not committed yet."""
+        stat = os.stat(file_path)
+        source = {"file": os.path.abspath(file_path), "size": stat.st_size, "mtime": stat.st_mtime,
+                  "chunkSize": chunk_size}
+        key = f"{store}/{table_name}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.resume and entry["source"] != source:
+                print(f"Source of {key} changed since the checkpoint, loading it from the start")
+            if entry is None or not self.resume or entry["source"] != source:
+                entry = self._entries[key] = {"source": source, "chunks": {}}
+                self._save()
+            committed = set(entry["chunks"])
+        chunks = split_into_chunks(file_path, chunk_size)
+        pending = [(start, end) for start, end in chunks if f"{start}-{end}" not in committed]
+        if len(pending) < len(chunks):
+            print(f"Resuming {key}: {len(chunks) - len(pending)} of {len(chunks)} chunks already committed")
+        return pending
+
+    def commit(self, store, table_name, start, end, rows):
+        """Record that the rows of a chunk are committed to a store."""
+        with self._lock:
+            self._entries[f"{store}/{table_name}"]["chunks"][f"{start}-{end}"] = rows
+            self._save()
+
+    def committed_rows(self, store, table_name):
+        entry = self._entries.get(f"{store}/{table_name}")
+        return sum(entry["chunks"].values()) if entry else 0
+
+def ensure_postgres_checkpoints(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS public.{POSTGRES_CHECKPOINT_TABLE} (
+            table_name TEXT NOT NULL,
+            chunk_start BIGINT NOT NULL,
+            chunk_end BIGINT NOT NULL,
+            rows BIGINT NOT NULL,
+            committed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (table_name, chunk_start, chunk_end)
+        )""")
+
+def reset_postgres_checkpoints(cursor, tables):
+    """Forget the committed chunks of tables that are loaded from the start."""
+    cursor.execute(f"DELETE FROM public.{POSTGRES_CHECKPOINT_TABLE} WHERE table_name = ANY(%s)", (list(tables),))
+
+def postgres_committed_rows(cursor, table_name, start, end):
+    """Return the rows of a chunk committed to PostgreSQL, or None when it is not committed.
+
+    This covers a crash between the commit of a chunk and the update of the manifest.
+    """
+    cursor.execute(f"SELECT rows FROM public.{POSTGRES_CHECKPOINT_TABLE} "
+                   "WHERE table_name = %s AND chunk_start = %s AND chunk_end = %s", (table_name, start, end))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def record_postgres_chunk(cursor, table_name, start, end, rows):
+    """Record a chunk in the transaction that copies its rows, so both are committed or neither is."""
+    cursor.execute(f"INSERT INTO public.{POSTGRES_CHECKPOINT_TABLE} (table_name, chunk_start, chunk_end, rows) "
+                   "VALUES (%s, %s, %s, %s)", (table_name, start, end, rows))
@@ -0,0 +1,155 @@
+import os
+import io
+import glob
+import time
+import hashlib
+import argparse
+from decimal import Decimal
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from dotenv import load_dotenv
+from data_prep import Batch, iter_batches, to_copy_text
+from schema_compiler import SCHEMA_DIR, compile_schema, parse_cassandra_date
+
+load_dotenv()
+
+DATA_DIR = os.getenv("TEST_DATA_LOCAL_PATH")
+TMP_DATA_DIR = os.getenv("TEST_DATA_TMP_LOCAL_PATH")
+CACHE_DIR = os.getenv("TEST_DATA_CACHE_LOCAL_PATH") or os.path.join(TMP_DATA_DIR or ".", "columnar-cache")
+
+DEFAULT_COMPRESSION = "zstd"
+
+# Arrow type stored for each type name of the schema files
+ARROW_TYPES = {
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "date": pa.date32(),
+    "str": pa.string(),
+}
+
+# Parsers producing the Python values the Arrow arrays are built from
+CACHE_TYPE_PARSERS = {
+    "int": int,
+    "float": float,
+    "date": parse_cassandra_date,
+    "str": str,
+}
+
+COPY_WRITE_OPTIONS = pa_csv.WriteOptions(include_header=False, delimiter='|', quoting_style='none')
+
+class ArrowBatch(Batch):
+    """A record batch read back from the cache, handed to the sinks with no parsing.
+
+    documents() follows the Mongo loader types (dates as datetime) and columns() follows the
+    Cassandra loader types (DECIMAL columns as Decimal, dates as date). The values are already
+    typed, so the row converters the sinks pass are not used; the sinks apply what follows the
+    conversion, like the layout of a Mongo collection or the null keys of a Cassandra query
+    table, to these values too.
+    """
+
+    def __init__(self, record_batch):
+        self.record_batch = record_batch
+        self.text = None
+        self.rows = None
+        self.row_count = record_batch.num_rows
+
+    def copy_text(self):
+        buffer = io.BytesIO()
+        pa_csv.write_csv(self.record_batch, buffer, COPY_WRITE_OPTIONS)
+        # Add back the trailing delimiter of the .dat format so an empty last field is kept
+        return to_copy_text(buffer.getvalue().decode('utf-8').replace('\n', '|\n'))
+
+    def documents(self, to_documents):
+        record_batch = self.record_batch
+        for index, field in enumerate(record_batch.schema):
+            if pa.types.is_date32(field.type):
+                # BSON has no date type, so dates are stored as datetimes like convert_type() does
+                record_batch = record_batch.set_column(index, field.name, record_batch.column(index).cast(pa.timestamp("ms")))
+        return record_batch.to_pylist()
+
+    def columns(self, convert_columns):
+        columns = []
+        for field, column in zip(self.record_batch.schema, self.record_batch.columns):
+            values = column.to_pylist()
+            if pa.types.is_floating(field.type):
+                values = [None if value is None else Decimal(repr(value)) for value in values]
+            columns.append(values)
+        return columns
+
+def cache_key(table_name, file_path):
+    """Build the key of a table's cache file from the source file's size and mtime and the schema contents."""
+    stat = os.stat(file_path)
+    with open(os.path.join(SCHEMA_DIR, f"{table_name}.json"), "rb") as schema_file:
+        schema_hash = hashlib.sha256(schema_file.read()).hexdigest()
+    key = f"{stat.st_size}:{stat.st_mtime_ns}:{schema_hash}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+def cache_path(table_name, file_path):
+    return os.path.join(CACHE_DIR, f"{table_name}-{cache_key(table_name, file_path)}.arrow")
+
+def build_cache(table_name, file_path, compression=DEFAULT_COMPRESSION):
+    """Parse a .dat file once and write it as a typed, compressed Arrow IPC file."""
+    converter = compile_schema(table_name, CACHE_TYPE_PARSERS)
+    schema = pa.schema([(column, ARROW_TYPES.get(target_type, pa.string()))
+                        for column, target_type in zip(converter.columns, converter.types)])
+    path = cache_path(table_name, file_path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    with pa.OSFile(temp_path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for batch in iter_batches(file_path, len(converter.columns)):
+            columns = converter.convert_columns(batch.rows)
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+    os.replace(temp_path, path)
+    # Drop the files cached for older versions of the data or schema
+    for stale_path in glob.glob(os.path.join(CACHE_DIR, f"{table_name}-*.arrow")):
+        if stale_path != path:
+            os.remove(stale_path)
+    return path
+
+def get_or_build_cache(table_name, file_path, compression=DEFAULT_COMPRESSION):
+    """Return the path of a table's up-to-date cache file, building it first if needed."""
+    path = cache_path(table_name, file_path)
+    if not os.path.exists(path):
+        build_cache(table_name, file_path, compression)
+    return path
+
+def iter_cached_batches(table_name, file_path, compression=DEFAULT_COMPRESSION):
+    """Yield the batches of a table from its memory-mapped cache file."""
+    path = get_or_build_cache(table_name, file_path, compression)
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            yield ArrowBatch(reader.get_batch(index))
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar cache of the TPC-DS .dat files.")
+    parser.add_argument("tables", nargs="*", help="tables to cache (default: every .dat file in TEST_DATA_LOCAL_PATH)")
+    parser.add_argument("--compression", choices=["zstd", "lz4", "none"], default=DEFAULT_COMPRESSION,
+                        help="buffer compression, 'none' lets loads use the memory-mapped buffers without copying")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild cache files that are already up to date")
+    args = parser.parse_args()
+
+    for file_name in sorted(os.listdir(DATA_DIR)):
+        if not file_name.endswith(".dat"):
+            continue
+        table_name = os.path.splitext(file_name)[0].lower()
+        if args.tables and table_name not in args.tables:
+            continue
+        file_path = os.path.join(DATA_DIR, file_name)
+        try:
+            if not args.rebuild and os.path.exists(cache_path(table_name, file_path)):
+                print(f"Cache for {table_name} is up to date")
+                continue
+            started = time.perf_counter()
+            path = build_cache(table_name, file_path, args.compression)
+            elapsed = time.perf_counter() - started
+            print(f"Cached {table_name} in {elapsed:.2f}s: {os.path.getsize(file_path)} bytes -> {os.path.getsize(path)} bytes")
+        except FileNotFoundError as e:
+            print(e)
+        except Exception as e:
+            print(f"Error caching table {table_name}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,740 @@
+import os
+import re
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from dotenv import load_dotenv
+from schema_compiler import SCHEMA_DIR
+
+load_dotenv()
+
+DATA_DIR = os.getenv("TEST_DATA_LOCAL_PATH")
+POSTGRES_DDL_FILE = os.path.join(os.path.dirname(__file__), "..", "migration", "postgres-ddl.sql")
+
+# Rows of every table at scale factor 1, as dsdgen writes them, and the power of the scale factor
+# they grow with: the fact tables grow linearly and the dimensions more slowly, like dsdgen's
+TABLE_SIZES = {
+    "store_sales": (2880404, 1.0),
+    "catalog_sales": (1441548, 1.0),
+    "web_sales": (719384, 1.0),
+    "inventory": (11745000, 1.0),
+    "customer": (100000, 0.7),
+    "customer_address": (50000, 0.7),
+    "item": (18000, 0.5),
+    "catalog_page": (11718, 0.5),
+    "promotion": (300, 0.5),
+    "store": (12, 0.5),
+    "warehouse": (5, 0.5),
+    "call_center": (6, 0.5),
+    "web_page": (60, 0.5),
+    "web_site": (30, 0.5),
+    "customer_demographics": (1920800, 0.0),
+    "household_demographics": (7200, 0.0),
+    "income_band": (20, 0.0),
+    "reason": (35, 0.0),
+    "ship_mode": (20, 0.0),
+    "date_dim": (73049, 0.0),
+    "time_dim": (86400, 0.0),
+}
+# Every date and time key refers to the calendars, so they keep their size below scale factor 1
+CALENDAR_TABLES = ("date_dim", "time_dim")
+# Returns are a sample of the lines of their sales table, generated by the same worker
+RETURNS_TABLES = {"store_returns": "store_sales", "catalog_returns": "catalog_sales", "web_returns": "web_sales"}
+SALES_TABLES = {sales: returns for returns, sales in RETURNS_TABLES.items()}
+RETURN_RATE = 0.1
+# Every order or ticket has this many lines, each for a different item
+LINES_PER_ORDER = 8
+# Share of the references of the fact tables left empty, as dsdgen leaves some of them
+NULL_FRACTION = 0.02
+
+DEFAULT_SHARD_ROWS = 1000000
+# Rows generated and written at a time by a worker, a multiple of LINES_PER_ORDER
+BLOCK_ROWS = 100000
+
+# Dates are keyed by their Julian day number, like dsdgen's date_dim from 1900-01-02
+FIRST_DATE = np.datetime64("1900-01-02")
+FIRST_DATE_SK = 2415022
+# Sales happen in the five years the query templates filter on
+SALES_FIRST_DATE = np.datetime64("1998-01-02")
+SALES_DAYS = int((np.datetime64("2003-01-02") - SALES_FIRST_DATE).astype(np.int64)) + 1
+SALES_FIRST_DATE_SK = FIRST_DATE_SK + int((SALES_FIRST_DATE - FIRST_DATE).astype(np.int64))
+SECONDS_PER_DAY = 86400
+MIN_ROWS = 10
+
+PRIMARY_KEY_PATTERN = re.compile(r"create table\s+(?:\w+\.)?(\w+)\s*\((.*?)\);", re.IGNORECASE | re.DOTALL)
+KEY_COLUMNS_PATTERN = re.compile(r"primary key\s*\(([^)]*)\)", re.IGNORECASE)
+# Abbreviated references, which no suffix of a dimension key matches alone
+REFERENCE_ALIASES = {
+    "cdemo_sk": "customer_demographics",
+    "hdemo_sk": "household_demographics",
+    "addr_sk": "customer_address",
+}
+
+DECIMAL_TYPE = pa.decimal128(19, 2)
+WRITE_OPTIONS = pa_csv.WriteOptions(include_header=False, delimiter='|', quoting_style='none')
+
+FLAGS = ["Y", "N"]
+# Values of the string columns whose name ends with the key, from the values the query templates filter on
+VOCABULARIES = {
+    "category": ["Books", "Children", "Electronics", "Home", "Jewelry", "Men", "Music", "Shoes", "Sports", "Women"],
+    "class": ["accessories", "athletic", "baseball", "business", "camcorders", "classical", "computers", "country",
+              "dresses", "fiction", "football", "furniture", "kids", "mystery", "pants", "pop", "reference", "rock",
+              "shirts", "swimwear", "televisions", "tennis", "womens"],
+    "color": ["almond", "antique", "azure", "beige", "black", "blue", "brown", "burlywood", "chartreuse", "chiffon",
+              "coral", "cornflower", "cream", "cyan", "firebrick", "floral", "forest", "gainsboro", "ghost",
+              "goldenrod", "green", "honeydew", "hot", "indian", "khaki", "lace", "lavender", "lemon", "lime",
+              "linen", "maroon", "midnight", "mint", "navy", "olive", "orange", "orchid", "peach", "pink", "plum",
+              "powder", "purple", "red", "rose", "salmon", "sienna", "slate", "snow", "tan", "thistle", "tomato",
+              "turquoise", "violet", "wheat", "white", "yellow"],
+    "size": ["petite", "small", "medium", "large", "extra large", "economy", "N/A"],
+    "units": ["Each", "Dozen", "Case", "Pallet", "Gross", "Box", "Bundle", "Carton", "Pound", "Ounce", "Lb", "Oz",
+              "Tsp", "Tbl", "Cup", "Gram", "Unknown"],
+    "container": ["Unknown"],
+    "state": ["AL", "CA", "CO", "FL", "GA", "IA", "IL", "IN", "KS", "KY", "MI", "MN", "MO", "MS", "NC", "ND", "NE",
+              "OH", "OK", "SD", "TN", "TX", "VA", "WA", "WI", "WV"],
+    "city": ["Midway", "Fairview", "Oak Grove", "Five Points", "Pleasant Hill", "Centerville", "Riverside", "Union",
+             "Salem", "Greenwood", "Liberty", "Mount Pleasant", "Oakland", "Glendale", "Antioch", "Bethel"],
+    "county": ["Williamson County", "Walker County", "Ziebach County", "Barrow County", "Franklin Parish",
+               "Luce County", "Richland County", "Daviess County", "Bronx County", "Orange County", "Fairfield County",
+               "Huron County", "Jackson County", "Mesa County", "Marshall County"],
+    "country": ["United States"],
+    "street_name": ["Main", "Oak", "Park", "Elm", "Maple", "Cedar", "Hill", "Lake", "Pine", "Sunset", "Washington",
+                    "Lincoln", "Jackson", "Walnut", "Ridge", "Spring", "1st", "2nd", "3rd", "4th", "5th"],
+    "street_type": ["Street", "Ave", "Blvd", "Road", "Lane", "Court", "Way", "Drive", "Circle", "Parkway", "Boulevard",
+                    "Dr.", "Ct.", "Ln", "RD", "ST", "Wy"],
+    "location_type": ["apartment", "condo", "single family"],
+    "salutation": ["Mr.", "Mrs.", "Ms.", "Miss", "Dr.", "Sir"],
+    "first_name": ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William",
+                   "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+                   "Charles", "Karen", "Daniel", "Nancy", "Matthew", "Lisa", "Anthony", "Betty"],
+    "last_name": ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+                  "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore",
+                  "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez"],
+    "birth_country": ["UNITED STATES", "CANADA", "MEXICO", "GERMANY", "FRANCE", "JAPAN", "CHINA", "INDIA", "BRAZIL",
+                      "NIGERIA", "EGYPT", "AUSTRALIA", "ITALY", "SPAIN", "PERU", "CHILE"],
+    "gender": ["M", "F"],
+    "marital_status": ["M", "S", "D", "W", "U"],
+    "education_status": ["Primary", "Secondary", "College", "2 yr Degree", "4 yr Degree", "Advanced Degree",
+                         "Unknown"],
+    "credit_rating": ["Good", "High Risk", "Low Risk", "Unknown"],
+    "buy_potential": [">10000", "5001-10000", "1001-5000", "501-1000", "0-500", "Unknown"],
+    "hours": ["8AM-4PM", "8AM-12AM", "8AM-8AM"],
+    "preferred_cust_flag": FLAGS,
+    "discount_active": FLAGS,
+    "autogen_flag": FLAGS,
+    "sm_type": ["EXPRESS", "LIBRARY", "NEXT DAY", "OVERNIGHT", "REGULAR", "TWO DAY"],
+    "code": ["AIR", "SURFACE", "SEA", "BIKE"],
+    "carrier": ["UPS", "FEDEX", "AIRBORNE", "USPS", "DHL", "TBS", "ZHOU", "ZOUROS", "MSC", "LATVIAN", "ALLIANCE",
+                "ORIENTAL", "BARIAN", "BOXBUNDLES", "GREAT EASTERN", "DIAMOND", "RUPEKSA", "GERMA", "HARMSTORF",
+                "PRIVATECARRIER"],
+    "wp_type": ["ad", "bio", "dynamic", "feedback", "general", "order", "protected", "welcome"],
+    "cp_type": ["bi-annual", "quarterly", "monthly"],
+    "department": ["DEPARTMENT"],
+    "purpose": ["Unknown"],
+}
+# Ranges of the integer columns whose name ends with the key, others range from 1 to 100
+INT_RANGES = {
+    "birth_day": (1, 28),
+    "birth_month": (1, 12),
+    "birth_year": (1924, 1992),
+    "dep_count": (0, 6),
+    "dep_employed_count": (0, 6),
+    "dep_college_count": (0, 6),
+    "vehicle_count": (-1, 4),
+    "purchase_estimate": (500, 10000),
+    "brand_id": (1, 1000),
+    "manufact_id": (1, 1000),
+    "manager_id": (1, 100),
+    "quantity_on_hand": (0, 1000),
+    "employees": (1, 700),
+    "floor_space": (5000000, 10000000),
+    "sq_ft": (50000, 1000000),
+    "response_target": (1, 1),
+    "char_count": (100, 8000),
+    "link_count": (2, 25),
+    "image_count": (1, 7),
+    "max_ad_count": (0, 4),
+    "catalog_number": (1, 109),
+    "catalog_page_number": (1, 108),
+    "quantity": (1, 100),
+}
+# Ranges in cents of the decimal columns whose name ends with the key, others range from 0 to 100.00
+CENT_RANGES = {
+    "tax_percentage": (0, 11),
+    "tax_precentage": (0, 11),
+    "current_price": (9, 9999),
+    "wholesale_cost": (2, 8000),
+    "cost": (100000, 100000),
+}
+DEFAULT_INT_RANGE = (1, 100)
+DEFAULT_CENT_RANGE = (0, 10000)
+# Distinct values of a string column that has no vocabulary
+DEFAULT_POOL_SIZE = 100
+
+def ends_with(stem, key):
+    return stem == key or stem.endswith("_" + key)
+
+def lookup(table, stem):
+    """Return the entry of a column in a table of column name suffixes, the longest matching suffix winning."""
+    matches = [key for key in table if ends_with(stem, key)]
+    return table[max(matches, key=len)] if matches else None
+
+def table_rows(table_name, scale):
+    """Return the rows of a table at a scale factor, which for a returns table depend on its sales."""
+    rows, power = TABLE_SIZES[table_name]
+    if table_name in CALENDAR_TABLES:
+        return rows
+    # Below scale factor 1 the fixed tables shrink too, so tests get small data, but every
+    # dimension keeps a few rows for the query filters to choose from
+    factor = scale ** power if scale >= 1 else scale ** (power or 1.0)
+    return max(min(rows, MIN_ROWS), int(round(rows * factor)))
+
+def plan_rows(scale):
+    """Return the rows of every table but the returns at a scale factor."""
+    rows = {table_name: table_rows(table_name, scale) for table_name in TABLE_SIZES}
+    # Inventory counts every item in every warehouse once a week
+    per_week = rows["item"] * rows["warehouse"]
+    rows["inventory"] = min(rows["inventory"], per_week * (SALES_DAYS // 7 + 1))
+    if rows["item"] < LINES_PER_ORDER:
+        raise ValueError(f"Scale factor {scale} gives {rows['item']} items, fewer than the {LINES_PER_ORDER} lines of an order")
+    return rows
+
+def load_tables(schema_dir=SCHEMA_DIR, ddl_file=POSTGRES_DDL_FILE):
+    """Read the columns and types of every table from its schema file and its primary key from the PostgreSQL DDL.
+
+    The DDL declares no foreign keys, so the references are found from the names of the
+    surrogate keys, such as ss_sold_date_sk for d_date_sk.
+    """
+    with open(ddl_file, "r") as file:
+        ddl = file.read()
+    primary_keys = {}
+    for table_name, body in PRIMARY_KEY_PATTERN.findall(ddl):
+        match = KEY_COLUMNS_PATTERN.search(body)
+        if match:
+            primary_keys[table_name.lower()] = [column.strip().lower() for column in match.group(1).split(",")]
+    tables = {}
+    for table_name in sorted(TABLE_SIZES.keys() | RETURNS_TABLES.keys()):
+        with open(os.path.join(schema_dir, f"{table_name}.json"), "r") as file:
+            schema = json.load(file)
+        columns = list(schema)
+        tables[table_name] = {
+            "columns": columns,
+            "types": [schema[column] for column in columns],
+            "primaryKey": primary_keys.get(table_name, []),
+            "prefix": columns[0].split("_")[0] + "_",
+        }
+    dimensions = {}
+    for table_name, table in tables.items():
+        key = table["primaryKey"]
+        if len(key) == 1 and key[0].endswith("_sk"):
+            dimensions.setdefault(key[0][len(table["prefix"]):], table_name)
+    for table in tables.values():
+        table["references"] = find_references(table, dimensions)
+    return tables
+
+def find_references(table, dimensions):
+    """Map every surrogate key column of a table that is not its own key to the dimension it refers to."""
+    references = {}
+    for column in table["columns"]:
+        if not column.endswith("_sk") or table["primaryKey"] == [column]:
+            continue
+        stem = column[len(table["prefix"]):]
+        target = lookup(REFERENCE_ALIASES, stem) or lookup(dimensions, stem)
+        if target is not None:
+            references[column] = target
+    return references
+
+def stem_of(table, column):
+    return column[len(table["prefix"]):]
+
+def with_nulls(rng, count, fraction=NULL_FRACTION):
+    """Return a mask of the rows left empty."""
+    return rng.random(count) < fraction
+
+def reference_keys(target, count, rng, rows):
+    """Draw keys of a dimension, dates and times within the sales period and the day."""
+    if target == "date_dim":
+        return SALES_FIRST_DATE_SK + rng.integers(0, SALES_DAYS, count)
+    if target == "time_dim":
+        return rng.integers(0, SECONDS_PER_DAY, count)
+    return rng.integers(1, rows[target] + 1, count)
+
+def int_array(values, mask=None):
+    return pa.array(values, pa.int64(), mask=mask)
+
+def cent_array(cents, mask=None):
+    """Build a DECIMAL(19,2) array from integer cents, which is exactly its unscaled value."""
+    return pa.array(cents, pa.int64(), mask=mask).cast(pa.decimal128(19, 0)).view(DECIMAL_TYPE)
+
+def date_array(date_sks, mask=None):
+    return pa.array(FIRST_DATE + (date_sks - FIRST_DATE_SK), mask=mask)
+
+def string_array(indices, vocabulary):
+    return pc.take(pa.array(vocabulary, pa.string()), pa.array(indices))
+
+def business_ids(sks):
+    """Format keys as the 16 character business ids of dsdgen, like AAAAAAAAAAAAABAC."""
+    return pc.utf8_lpad(pc.cast(pa.array(sks), pa.string()), 16, "A")
+
+def number_strings(values, width=0, prefix=""):
+    strings = pc.cast(pa.array(values), pa.string())
+    if width:
+        strings = pc.utf8_lpad(strings, width, "0")
+    return pc.binary_join_element_wise(prefix, strings, "") if prefix else strings
+
+def pair_stem(stem):
+    """Return the name a code column and its label column share, like brand for i_brand_id and i_brand."""
+    for suffix in ("_id", "_name"):
+        if stem.endswith(suffix):
+            return stem[:-len(suffix)]
+    return stem
+
+def dimension_columns(table, start, count, rng, rows):
+    """Generate the rows of a dimension keyed from start + 1, column by column."""
+    sks = np.arange(start + 1, start + count + 1)
+    stems = {column: stem_of(table, column) for column in table["columns"]}
+    int_pairs = {pair_stem(stem) for column, column_type, stem in zip(table["columns"], table["types"], stems.values())
+                 if column_type == "int"}
+    str_pairs = {pair_stem(stem) for column, column_type, stem in zip(table["columns"], table["types"], stems.values())
+                 if column_type == "str" and not stem.endswith("_id")}
+    # A code and its label are drawn together, so i_category_id always matches i_category
+    pair_indices = {}
+    for pair in sorted(int_pairs & str_pairs):
+        vocabulary = lookup(VOCABULARIES, pair)
+        size = len(vocabulary) if vocabulary else (lookup(INT_RANGES, pair + "_id") or DEFAULT_INT_RANGE)[1]
+        pair_indices[pair] = rng.integers(0, size, count)
+    columns = {}
+    rec_start = None
+    for column, column_type in zip(table["columns"], table["types"]):
+        stem = stems[column]
+        pair = pair_stem(stem)
+        if table["primaryKey"] == [column]:
+            columns[column] = int_array(sks)
+        elif column in table["references"]:
+            columns[column] = int_array(reference_keys(table["references"][column], count, rng, rows),
+                                        with_nulls(rng, count))
+        elif column_type == "str" and stem.endswith("_id"):
+            columns[column] = business_ids(sks)
+        elif pair in pair_indices:
+            vocabulary = lookup(VOCABULARIES, pair)
+            if column_type == "int":
+                columns[column] = int_array(pair_indices[pair] + 1)
+            elif vocabulary:
+                columns[column] = string_array(pair_indices[pair], vocabulary)
+            else:
+                columns[column] = number_strings(pair_indices[pair] + 1, prefix=f"{pair} #")
+        elif stem in ("lower_bound", "upper_bound"):
+            columns[column] = int_array((sks - 1 if stem == "lower_bound" else sks) * 10000)
+        elif column_type == "int":
+            low, high = lookup(INT_RANGES, stem) or DEFAULT_INT_RANGE
+            columns[column] = int_array(rng.integers(low, high + 1, count))
+        elif column_type == "float":
+            if ends_with(stem, "gmt_offset"):
+                columns[column] = cent_array(-100 * rng.integers(5, 9, count))
+            else:
+                low, high = lookup(CENT_RANGES, stem) or DEFAULT_CENT_RANGE
+                columns[column] = cent_array(rng.integers(low, high + 1, count))
+        elif column_type == "date":
+            if ends_with(stem, "rec_end_date") and rec_start is not None:
+                # About half of the rows are current and have no end date
+                columns[column] = date_array(rec_start + rng.integers(365, 1096, count), with_nulls(rng, count, 0.5))
+            else:
+                rec_start = SALES_FIRST_DATE_SK - 365 + rng.integers(0, SALES_DAYS, count)
+                columns[column] = date_array(rec_start)
+        elif ends_with(stem, "zip"):
+            columns[column] = number_strings(rng.integers(600, 100000, count), 5)
+        elif ends_with(stem, "street_number"):
+            columns[column] = number_strings(rng.integers(1, 1000, count))
+        elif ends_with(stem, "suite_number"):
+            columns[column] = number_strings(rng.integers(1, 500, count), prefix="Suite ")
+        else:
+            vocabulary = (lookup(VOCABULARIES, f"{table['prefix']}{stem}") or lookup(VOCABULARIES, stem)
+                          or (FLAGS if stem.startswith("channel_") and stem != "channel_details" else None))
+            if vocabulary is None:
+                vocabulary = [f"{stem} {index}" for index in range(1, DEFAULT_POOL_SIZE + 1)]
+            columns[column] = string_array(rng.integers(0, len(vocabulary), count), vocabulary)
+    return columns
+
+def date_dim_columns(table, start, count, rng, rows):
+    """Generate the calendar from 1900-01-02, one row per day keyed by its Julian day number."""
+    days = np.arange(start, start + count)
+    sks = FIRST_DATE_SK + days
+    dates = FIRST_DATE + days
+    months = dates.astype("datetime64[M]")
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    moy = months.astype(np.int64) % 12 + 1
+    dom = (dates - months).astype(np.int64) + 1
+    qoy = (moy - 1) // 3 + 1
+    # The epoch was a Thursday, and d_dow counts from Sunday
+    dow = (dates.astype(np.int64) + 4) % 7
+    week_seq = (days + 1) // 7 + 1
+    quarter_seq = (years - 1900) * 4 + qoy
+    holiday = ((moy == 1) & (dom == 1)) | ((moy == 7) & (dom == 4)) | ((moy == 12) & (dom == 25))
+    following_holiday = ((moy == 1) & (dom == 2)) | ((moy == 7) & (dom == 5)) | ((moy == 12) & (dom == 26))
+    first_dom = sks - dom + 1
+    next_months = (months + 1).astype("datetime64[D]")
+    last_dom = FIRST_DATE_SK + (next_months - FIRST_DATE).astype(np.int64) - 1
+    yes_no = lambda values: string_array(values.astype(np.int64), ["N", "Y"])
+    values = {
+        "date_sk": int_array(sks),
+        "date_id": business_ids(sks),
+        "date": pa.array(dates),
+        "month_seq": int_array((years - 1900) * 12 + moy - 1),
+        "week_seq": int_array(week_seq),
+        "quarter_seq": int_array(quarter_seq),
+        "year": int_array(years),
+        "dow": int_array(dow),
+        "moy": int_array(moy),
+        "dom": int_array(dom),
+        "qoy": int_array(qoy),
+        "fy_year": int_array(years),
+        "fy_quarter_seq": int_array(quarter_seq),
+        "fy_week_seq": int_array(week_seq),
+        "day_name": string_array(dow, ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]),
+        "quarter_name": pc.binary_join_element_wise(pc.cast(pa.array(years), pa.string()),
+                                                     pc.cast(pa.array(qoy), pa.string()), "Q"),
+        "holiday": yes_no(holiday),
+        "weekend": yes_no((dow == 0) | (dow == 6)),
+        "following_holiday": yes_no(following_holiday),
+        "first_dom": int_array(first_dom),
+        "last_dom": int_array(last_dom),
+        "same_day_ly": int_array(sks - 365),
+        "same_day_lq": int_array(sks - 91),
+    }
+    columns = {}
+    for column in table["columns"]:
+        stem = stem_of(table, column)
+        columns[column] = values[stem] if stem in values else string_array(np.zeros(count, np.int64), ["N"])
+    return columns
+
+def time_dim_columns(table, start, count, rng, rows):
+    """Generate one row per second of the day."""
+    seconds = np.arange(start, start + count)
+    hours = seconds // 3600
+    shifts = np.select([hours < 8, hours < 16], [2, 0], 1)
+    sub_shifts = np.select([hours < 6, hours < 12, hours < 18], [3, 0, 1], 2)
+    meals = np.select([(hours >= 6) & (hours < 9), (hours >= 11) & (hours < 14), (hours >= 17) & (hours < 20)],
+                      [0, 1, 2], 3)
+    values = {
+        "time_sk": int_array(seconds),
+        "time_id": business_ids(seconds + 1),
+        "time": int_array(seconds),
+        "hour": int_array(hours),
+        "minute": int_array(seconds // 60 % 60),
+        "second": int_array(seconds % 60),
+        "am_pm": string_array((hours >= 12).astype(np.int64), ["AM", "PM"]),
+        "shift": string_array(shifts, ["first", "second", "third"]),
+        "sub_shift": string_array(sub_shifts, ["morning", "afternoon", "evening", "night"]),
+        "meal_time": pc.take(pa.array(["breakfast", "lunch", "dinner", None], pa.string()), pa.array(meals)),
+    }
+    return {column: values[stem_of(table, column)] for column in table["columns"]}
+
+def inventory_columns(table, start, count, rng, rows):
+    """Generate the weekly count of every item in every warehouse, from the first week of the sales."""
+    positions = np.arange(start, start + count)
+    warehouses = rows["warehouse"]
+    items = rows["item"]
+    keys = {
+        "warehouse": positions % warehouses + 1,
+        "item": positions // warehouses % items + 1,
+        "date_dim": SALES_FIRST_DATE_SK + 7 * (positions // (warehouses * items)),
+    }
+    columns = {}
+    for column in table["columns"]:
+        target = table["references"].get(column)
+        if target in keys:
+            columns[column] = int_array(keys[target])
+        else:
+            low, high = INT_RANGES["quantity_on_hand"]
+            columns[column] = int_array(rng.integers(low, high + 1, count), with_nulls(rng, count))
+    return columns
+
+def sales_measures(count, rng):
+    """Price the lines of a sales table in cents, deriving the totals from the unit prices like dsdgen."""
+    quantity = rng.integers(1, 101, count)
+    wholesale = rng.integers(100, 10001, count)
+    list_price = wholesale * (100 + rng.integers(0, 201, count)) // 100
+    sales_price = list_price * (100 - rng.integers(0, 101, count)) // 100
+    ext_sales = sales_price * quantity
+    ext_list = list_price * quantity
+    ext_wholesale = wholesale * quantity
+    ext_tax = ext_sales * rng.integers(0, 10, count) // 100
+    coupon = np.where(rng.random(count) < 0.2, ext_sales * rng.integers(0, 101, count) // 100, 0)
+    ext_ship = ext_list * rng.integers(0, 51, count) // 100
+    net_paid = ext_sales - coupon
+    return {
+        "quantity": quantity,
+        "wholesale_cost": wholesale,
+        "list_price": list_price,
+        "sales_price": sales_price,
+        "ext_discount_amt": ext_list - ext_sales,
+        "ext_sales_price": ext_sales,
+        "ext_wholesale_cost": ext_wholesale,
+        "ext_list_price": ext_list,
+        "ext_tax": ext_tax,
+        "coupon_amt": coupon,
+        "ext_ship_cost": ext_ship,
+        "net_paid": net_paid,
+        "net_paid_inc_tax": net_paid + ext_tax,
+        "net_paid_inc_ship": net_paid + ext_ship,
+        "net_paid_inc_ship_tax": net_paid + ext_ship + ext_tax,
+        "net_profit": net_paid - ext_wholesale,
+    }
+
+def sales_columns(table, start, count, rng, rows):
+    """Generate the lines of a sales table from start, LINES_PER_ORDER lines of different items per order.
+
+    The date, time, customer and other references of an order are shared by its lines, while
+    the item, promotion and prices vary by line. Returns the columns and the raw values by
+    column name without the table prefix, which the returns are sampled from.
+    """
+    first_order = start // LINES_PER_ORDER
+    positions = np.arange(count)
+    order_of_line = positions // LINES_PER_ORDER
+    orders = int(order_of_line[-1]) + 1 if count else 0
+    measures = sales_measures(count, rng)
+    raw = {stem: (values, None) for stem, values in measures.items()}
+    columns = {}
+    sold = None
+    for column, column_type in zip(table["columns"], table["types"]):
+        stem = stem_of(table, column)
+        target = table["references"].get(column)
+        if stem in ("ticket_number", "order_number"):
+            values, mask = first_order + order_of_line + 1, None
+        elif target == "item":
+            items = rows["item"]
+            values, mask = (rng.integers(0, items, orders)[order_of_line] + positions % LINES_PER_ORDER) % items + 1, None
+        elif target == "promotion":
+            values, mask = reference_keys(target, count, rng, rows), with_nulls(rng, count)
+        elif ends_with(stem, "ship_date_sk") and sold is not None:
+            values, mask = sold[0] + rng.integers(2, 91, orders)[order_of_line], sold[1]
+        elif target is not None:
+            order_mask = with_nulls(rng, orders)
+            values, mask = reference_keys(target, orders, rng, rows)[order_of_line], order_mask[order_of_line]
+            if ends_with(stem, "sold_date_sk"):
+                sold = (values, mask)
+        elif stem in measures:
+            columns[column] = int_array(measures[stem]) if column_type == "int" else cent_array(measures[stem])
+            continue
+        else:
+            raise ValueError(f"No generator for the sales column {column}")
+        raw[stem] = (values, mask)
+        columns[column] = int_array(values, mask)
+    return columns, raw
+
+def returns_columns(table, raw, rng, rows):
+    """Generate the returns of a sample of sales lines, which keep the line's item, order and customers.
+
+    The refunded customer is the one billed and the returning customer the one shipped to,
+    and the amounts are refunds of part of the quantity sold.
+    """
+    selected = np.flatnonzero(rng.random(len(raw["quantity"][0])) < RETURN_RATE)
+    count = len(selected)
+    sold = lambda stem: raw[stem][0][selected]
+    quantity = rng.integers(1, sold("quantity") + 1)
+    amount = sold("sales_price") * quantity
+    tax = amount * rng.integers(0, 10, count) // 100
+    amount_inc_tax = amount + tax
+    fee = rng.integers(50, 10001, count)
+    ship_cost = sold("list_price") * quantity * rng.integers(0, 51, count) // 100
+    cash = amount_inc_tax * rng.integers(0, 101, count) // 100
+    reversed_charge = (amount_inc_tax - cash) * rng.integers(0, 101, count) // 100
+    measures = {
+        "return_quantity": quantity,
+        "return_amt": amount,
+        "return_amount": amount,
+        "return_tax": tax,
+        "return_amt_inc_tax": amount_inc_tax,
+        "fee": fee,
+        "return_ship_cost": ship_cost,
+        "refunded_cash": cash,
+        "reversed_charge": reversed_charge,
+        "store_credit": amount_inc_tax - cash - reversed_charge,
+        "account_credit": amount_inc_tax - cash - reversed_charge,
+        "net_loss": fee + ship_cost + tax,
+    }
+    columns = {}
+    for column, column_type in zip(table["columns"], table["types"]):
+        stem = stem_of(table, column)
+        source = stem
+        if stem.startswith("refunded_") and stem not in measures:
+            source = "bill_" + stem[len("refunded_"):]
+        elif stem.startswith("returning_"):
+            source = "ship_" + stem[len("returning_"):]
+        if stem in measures:
+            columns[column] = int_array(measures[stem]) if column_type == "int" else cent_array(measures[stem])
+        elif ends_with(stem, "returned_date_sk"):
+            values, mask = raw["sold_date_sk"]
+            returned = values[selected] + rng.integers(1, 91, count)
+            columns[column] = int_array(returned, None if mask is None else mask[selected])
+        elif source in raw:
+            values, mask = raw[source]
+            columns[column] = int_array(values[selected], None if mask is None else mask[selected])
+        elif column in table["references"]:
+            columns[column] = int_array(reference_keys(table["references"][column], count, rng, rows),
+                                        with_nulls(rng, count))
+        else:
+            raise ValueError(f"No generator for the returns column {column}")
+    return columns
+
+# Generators of the tables that are not plain dimensions
+TABLE_GENERATORS = {
+    "date_dim": date_dim_columns,
+    "time_dim": time_dim_columns,
+    "inventory": inventory_columns,
+}
+
+def to_table(columns, table):
+    """Build a record table in column order, with an empty last column for the trailing delimiter of the .dat format."""
+    arrays = [columns[column] for column in table["columns"]]
+    arrays.append(pa.nulls(len(arrays[0]), pa.int8()))
+    return pa.table(arrays, names=table["columns"] + [""])
+
+class PartWriter:
+    """Writes the blocks of one shard of a table to its part file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._writer = None
+
+    def write(self, record_table):
+        if self._writer is None:
+            self._writer = pa_csv.CSVWriter(self.path, record_table.schema, write_options=WRITE_OPTIONS)
+        self._writer.write_table(record_table)
+        self.rows += record_table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        elif not os.path.exists(self.path):
+            open(self.path, "w").close()
+
+def part_path(parts_dir, table_name, shard):
+    return os.path.join(parts_dir, f"{table_name}.{shard:05d}.dat")
+
+def generate_shard(table_name, shard, start, count, seed, tables, rows, parts_dir, write_tables):
+    """Generate rows start to start + count of a table into its part file, in blocks of BLOCK_ROWS.
+
+    A sales shard also writes the returns of its lines. The random stream depends only on the
+    seed, the table and the shard, so the output does not depend on the number of workers.
+    Returns the rows written to each table.
+    """
+    rng = np.random.default_rng([seed, sorted(tables).index(table_name), shard])
+    table = tables[table_name]
+    returns_name = SALES_TABLES.get(table_name)
+    writers = {name: PartWriter(part_path(parts_dir, name, shard))
+               for name in (table_name, returns_name) if name in write_tables}
+    try:
+        for block_start in range(start, start + count, BLOCK_ROWS):
+            block_count = min(BLOCK_ROWS, start + count - block_start)
+            if returns_name is not None:
+                columns, raw = sales_columns(table, block_start, block_count, rng, rows)
+                if returns_name in writers:
+                    writers[returns_name].write(to_table(returns_columns(tables[returns_name], raw, rng, rows),
+                                                         tables[returns_name]))
+            else:
+                generator = TABLE_GENERATORS.get(table_name, dimension_columns)
+                columns = generator(table, block_start, block_count, rng, rows)
+            if table_name in writers:
+                writers[table_name].write(to_table(columns, table))
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {name: writer.rows for name, writer in writers.items()}
+
+def plan_shards(generate_tables, rows, shard_rows):
+    """Split every table into shards of whole orders, the biggest first so the workers finish together."""
+    shard_rows = -(-shard_rows // LINES_PER_ORDER) * LINES_PER_ORDER
+    tasks = []
+    for table_name in generate_tables:
+        for shard, start in enumerate(range(0, rows[table_name], shard_rows)):
+            tasks.append((table_name, shard, start, min(shard_rows, rows[table_name] - start)))
+    return sorted(tasks, key=lambda task: -task[3])
+
+def concatenate_parts(parts_dir, table_name, shards, output_path):
+    """Join the part files of a table in shard order into its .dat file, replaced only once complete."""
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, "wb") as output:
+        for shard in range(shards):
+            with open(part_path(parts_dir, table_name, shard), "rb") as part:
+                shutil.copyfileobj(part, output, 16 * 1024 * 1024)
+    os.replace(temp_path, output_path)
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate TPC-DS-shaped .dat files at a scale factor, sharded across processes.")
+    parser.add_argument("tables", nargs="*", help="tables to generate (default: every table)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="scale factor, 1 is about 1 GB like dsdgen's, below 1 gives small test data")
+    parser.add_argument("--output", default=DATA_DIR, help="directory of the .dat files (default: TEST_DATA_LOCAL_PATH)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes generating the shards")
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS,
+                        help="rows of each shard, the unit of work of a process")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated values")
+    parser.add_argument("--overwrite", action="store_true", help="replace .dat files that already exist")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    tables = load_tables()
+    write_tables = set(args.tables or tables)
+    unknown = write_tables - set(tables)
+    if unknown:
+        print(f"Unknown tables: {', '.join(sorted(unknown))}")
+        return
+    if not args.output:
+        print("Set TEST_DATA_LOCAL_PATH or --output to the directory of the .dat files")
+        return
+    os.makedirs(args.output, exist_ok=True)
+    existing = sorted(name for name in write_tables if os.path.exists(os.path.join(args.output, f"{name}.dat")))
+    if existing and not args.overwrite:
+        print(f"Not replacing the existing files of {', '.join(existing)} in {args.output}, use --overwrite")
+        return
+
+    rows = plan_rows(args.scale)
+    # Returns are sampled from the lines of their sales, which are generated even when not written
+    generate_tables = sorted({RETURNS_TABLES.get(name, name) for name in write_tables})
+    tasks = plan_shards(generate_tables, rows, args.shard_rows)
+    shards = {}
+    for table_name, shard, _, _ in tasks:
+        shards[table_name] = max(shards.get(table_name, 0), shard + 1)
+    for returns_name, sales_name in RETURNS_TABLES.items():
+        shards[returns_name] = shards.get(sales_name, 0)
+
+    written = {name: 0 for name in write_tables}
+    parts_dir = tempfile.mkdtemp(prefix=".generate-", dir=args.output)
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(generate_shard, *task, args.seed, tables, rows, parts_dir, write_tables): task
+                for task in tasks
+            }
+            for future in as_completed(futures):
+                for name, shard_rows in future.result().items():
+                    written[name] += shard_rows
+        generated = time.perf_counter() - started
+        total_bytes = 0
+        for name in sorted(write_tables):
+            output_path = os.path.join(args.output, f"{name}.dat")
+            concatenate_parts(parts_dir, name, shards[name], output_path)
+            size = os.path.getsize(output_path)
+            total_bytes += size
+            print(f"Generated {name}: {written[name]} rows, {size / 1024 / 1024:.1f} MB")
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - started
+    total_rows = sum(written.values())
+    print(f"Total: {total_rows} rows, {total_bytes / 1024 / 1024:.1f} MB in {elapsed:.2f}s "
+          f"({generated:.2f}s generating with {args.workers} workers, {total_rows / elapsed:.0f} rows/sec)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import os
+import json
+import queue
+import threading
+import load_journal
+import load_profile
+
+# Size of the blocks the source files are read in
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+# Parsed blocks buffered for each sink before the reader waits for it to catch up
+SINK_QUEUE_SIZE = 4
+
+class Batch:
+    """A block of complete lines of a .dat file and, when a sink needs them, its split rows.
+
+    Sinks read batches through copy_text(), documents() and columns(), so other sources such as
+    the columnar cache can provide already typed values instead.
+    """
+
+    def __init__(self, text, rows=None):
+        self.text = text
+        self.rows = rows
+        self.row_count = len(rows) if rows is not None else text.count('\n')
+
+    def copy_text(self):
+        """Return the batch as PostgreSQL COPY text."""
+        return to_copy_text(self.text)
+
+    def documents(self, to_documents):
+        """Return the batch as documents built by the given row converter."""
+        return to_documents(self.rows)
+
+    def columns(self, convert_columns):
+        """Return the batch as lists of typed values per column, built by the given row converter."""
+        return convert_columns(self.rows)
+
+def split_into_chunks(file_path, chunk_size):
+    """Split a file into (start, end) byte ranges of roughly chunk_size bytes."""
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        return [(0, 0)]
+    return [(start, min(start + chunk_size, file_size)) for start in range(0, file_size, chunk_size)]
+
+def read_text_blocks(file_path, start=0, end=None, block_size=READ_BLOCK_SIZE):
+    """Yield blocks of the complete lines whose first byte falls inside [start, end).
+
+    Every block ends with a newline, so blocks can be split or rewritten without looking at
+    their neighbours.
+    """
+    if end is None:
+        end = os.path.getsize(file_path)
+    with open(file_path, 'rb') as infile:
+        if start > 0:
+            # The line that crosses the chunk boundary belongs to the previous chunk
+            infile.seek(start - 1)
+            infile.readline()
+        position = infile.tell()
+        remainder = b''
+        while position < end:
+            with load_profile.stage("read"):
+                block = infile.read(min(block_size, end - position))
+            if not block:
+                break
+            position += len(block)
+            load_profile.count(size=len(block))
+            block = remainder + block
+            last_newline = block.rfind(b'\n')
+            if last_newline == -1:
+                remainder = block
+                continue
+            remainder = block[last_newline + 1:]
+            with load_profile.stage("parse"):
+                text = block[:last_newline + 1].decode('utf-8')
+            yield text
+        # Finish the last line of the chunk, which may extend past the end offset
+        if remainder:
+            with load_profile.stage("read"):
+                line = infile.readline()
+            load_profile.count(size=len(line))
+            remainder += line
+        if remainder.strip():
+            if not remainder.endswith(b'\n'):
+                remainder += b'\n'
+            yield remainder.decode('utf-8')
+
+def split_rows(text, column_count=None):
+    """Split a block of lines into rows of raw fields, with '' for empty values.
+
+    The trailing delimiter of every line is dropped in one pass over the whole block. When
+    column_count is given, short rows are padded and long rows are truncated to it.
+    """
+    text = text.replace('|\n', '\n')
+    if text.endswith('|'):
+        text = text[:-1]
+    # Only '\n' ends a row: splitlines() would also split fields holding '\r', '\x0b' or '\x1c'
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    rows = [line.split('|') for line in lines]
+    if column_count is not None:
+        for row in rows:
+            if len(row) != column_count:
+                row.extend([''] * (column_count - len(row)))
+                del row[column_count:]
+    return rows
+
+def to_copy_text(text):
+    """Rewrite a block of lines to PostgreSQL COPY text, with '\\N' for empty fields."""
+    text = text.replace('|\n', '\n')
+    # Two passes, since the first one cannot rewrite overlapping runs like '|||'
+    text = text.replace('||', '|\\N|').replace('||', '|\\N|')
+    text = text.replace('|\n', '|\\N\n').replace('\n|', '\n\\N|')
+    if text.startswith('|'):
+        text = '\\N' + text
+    return text
+
+def iter_batches(file_path, column_count=None, need_rows=True, start=0, end=None, block_size=READ_BLOCK_SIZE):
+    """Read a file once in large blocks and yield a Batch per block."""
+    for text in read_text_blocks(file_path, start, end, block_size):
+        with load_profile.stage("parse"):
+            batch = Batch(text, split_rows(text, column_count) if need_rows else None)
+        load_profile.count(rows=batch.row_count)
+        yield batch
+
+def _run_sink(sink, batches, errors, table_name=None):
+    """Feed the batches of a queue to one sink until the end marker, recording its first error.
+
+    The stages the sink runs are attributed to the table being read, under the sink's target, and
+    the write is journaled for the cached query results that read it.
+    """
+    table_name = table_name or sink.table_name
+    with load_profile.table(table_name, load_profile.target_name(sink.name, table_name, sink.table_name)):
+        with load_journal.writing(sink.name, table_name, sink.table_name):
+            _feed_sink(sink, batches, errors)
+
+def _feed_sink(sink, batches, errors):
+    failed = False
+    try:
+        sink.start()
+    except Exception as e:
+        errors[sink] = e
+        failed = True
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        if failed:
+            # Keep draining so the reader is never blocked by a failed sink
+            continue
+        try:
+            sink.write(batch)
+        except Exception as e:
+            errors[sink] = e
+            failed = True
+    if failed:
+        sink.abort(errors[sink])
+    else:
+        try:
+            sink.finish()
+        except Exception as e:
+            errors[sink] = e
+            sink.abort(e)
+
+def _timed_batches(batches):
+    """Time the reading of batches from another source, like the columnar cache, as the read stage."""
+    iterator = iter(batches)
+    while True:
+        with load_profile.stage("read"):
+            batch = next(iterator, None)
+        if batch is None:
+            return
+        load_profile.count(rows=batch.row_count)
+        yield batch
+
+def fan_out(file_path, sinks, column_count=None, start=0, end=None, block_size=READ_BLOCK_SIZE, batches=None):
+    """Read and split a file once and write every block to all sinks in parallel.
+
+    Each sink runs in its own thread behind a bounded queue, so memory stays constant and the
+    slowest target sets the pace. When batches is given it is used instead of reading the file.
+    Returns the number of rows read and a dictionary with the error of every sink that failed.
+    """
+    need_rows = any(sink.needs_rows for sink in sinks)
+    if batches is None:
+        batches = iter_batches(file_path, column_count, need_rows, start, end, block_size)
+    else:
+        batches = _timed_batches(batches)
+    table_name, _ = load_profile.current()
+    errors = {}
+    queues = [queue.Queue(maxsize=SINK_QUEUE_SIZE) for _ in sinks]
+    threads = [
+        threading.Thread(target=_run_sink, args=(sink, sink_queue, errors, table_name), name=f"sink-{type(sink).__name__}")
+        for sink, sink_queue in zip(sinks, queues)
+    ]
+    for thread in threads:
+        thread.start()
+    row_count = 0
+    try:
+        for batch in batches:
+            row_count += batch.row_count
+            for sink_queue in queues:
+                sink_queue.put(batch)
+    finally:
+        for sink_queue in queues:
+            sink_queue.put(None)
+        for thread in threads:
+            thread.join()
+    return row_count, errors
+
+def read_scenario_tables(scenario_file, tables):
+    """Map every table to the stores it belongs to according to a benchmark scenario file.
+
+    A scenario file lists the tables of every store under "tables", where "*" places every
+    table in that store.
+    """
+    with open(scenario_file, "r") as file:
+        scenario = json.load(file)
+    assignments = {}
+    for store, store_tables in scenario["tables"].items():
+        for table_name in (tables if store_tables == "*" else store_tables):
+            if table_name in tables:
+                assignments.setdefault(table_name, set()).add(store)
+    return assignments
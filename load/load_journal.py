@@ -0,0 +1,52 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+
+_warned = False
+
+def journal_path():
+    """Return the journal file, read when first written so the loaders' .env applies."""
+    return os.getenv("LOAD_JOURNAL_FILE") or os.path.join(
+        os.getenv("TEST_DATA_TMP_LOCAL_PATH") or ".", "load-journal.jsonl")
+
+def record(store, tables, event):
+    """Append one write event of a store's tables to the journal the Presto cache proxy follows.
+
+    Every event is a single appended line, so loader threads and worker processes can record
+    at the same time. A journal that cannot be written only prints a warning, since the load
+    itself does not depend on it.
+    """
+    global _warned
+    line = json.dumps({
+        "time": time.time(),
+        "store": store,
+        "tables": sorted({table.lower() for table in tables if table}),
+        "event": event,
+        "pid": os.getpid(),
+    }) + "\n"
+    path = journal_path()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError as e:
+        if not _warned:
+            print(f"Warning: could not write the load journal {path}, cached query results may be stale: {e}")
+            _warned = True
+
+@contextmanager
+def writing(store, *tables):
+    """Record the start and the end of a write to tables, the end even when the write fails.
+
+    Results cached before the start are invalidated by it, and those cached while the write ran
+    by its end.
+    """
+    record(store, tables, "start")
+    try:
+        yield
+    finally:
+        record(store, tables, "end")
@@ -0,0 +1,384 @@
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import resource
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+# Stages of the load pipeline, in order, and what a load spending most of its time in each is limited by
+STAGES = ("read", "parse", "convert", "transmit", "commit")
+STAGE_LIMITS = {"read": "disk", "parse": "python", "convert": "python", "transmit": "database", "commit": "database"}
+SOURCE_STAGES = ("read", "parse")
+PROFILERS = ("cprofile", "sample")
+
+PROFILE_THREADS = ("memory-sampler", "stack-sampler")
+MEMORY_SAMPLE_INTERVAL = 0.1
+STACK_SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 30
+
+# Profile the stages are recorded in, and the table and target the current thread is loading
+_active = None
+_context = threading.local()
+
+def current_rss_mb():
+    """Return the resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        # No /proc on this platform, fall back to the lifetime peak
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+def current():
+    """Return the table and target the current thread is loading, or None for each."""
+    return getattr(_context, "table", None), getattr(_context, "target", None)
+
+def target_name(store, table_name, target_table):
+    """Name the target of a table in a store, with the name it is loaded under when that differs."""
+    return store if target_table == table_name else f"{store}:{target_table}"
+
+@contextmanager
+def table(table_name, target=None):
+    """Attribute the stages the current thread runs to a table, and to a target store of it when given."""
+    if _active is None or table_name is None:
+        yield
+        return
+    previous = current()
+    _context.table, _context.target = table_name, target
+    _active.open_table(table_name)
+    try:
+        yield
+    finally:
+        _active.close_table(table_name)
+        _context.table, _context.target = previous
+
+@contextmanager
+def stage(name):
+    """Time a stage of the table the current thread is loading; does nothing when no profile is active.
+
+    Stages and counts inside another stage, like the parsing of a columnar cache built while its
+    first batch is read, belong to the outer stage.
+    """
+    table_name, target = current()
+    if _active is None or table_name is None or getattr(_context, "stage", None) is not None:
+        yield
+        return
+    _context.stage = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _active.add(table_name, target, name, time.perf_counter() - started)
+        _context.stage = None
+
+def record(name, seconds):
+    """Add the seconds of a stage timed by the caller, for stages that do not fit in a with block."""
+    table_name, target = current()
+    if _active is not None and table_name is not None:
+        _active.add(table_name, target, name, seconds)
+
+def count(rows=0, size=0):
+    """Count the rows and bytes read for the table the current thread is loading."""
+    table_name, _ = current()
+    if _active is not None and table_name is not None and getattr(_context, "stage", None) is None:
+        _active.count(table_name, rows, size)
+
+class StackSampler:
+    """Samples the stacks of every thread at a fixed interval and counts the functions on them.
+
+    Unlike cProfile it sees the sink threads too, and its overhead does not depend on the number
+    of calls, so it does not inflate the many small calls of parsing.
+    """
+
+    def __init__(self, interval=STACK_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Leave out the threads of the profile itself
+            skipped = {thread.ident for thread in threading.enumerate() if thread.name in PROFILE_THREADS}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in skipped:
+                    continue
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    key = f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+                    stats = self.samples.setdefault(key, {"samples": 0, "selfSamples": 0})
+                    if key not in seen:
+                        stats["samples"] += 1
+                        seen.add(key)
+                    if leaf:
+                        stats["selfSamples"] += 1
+                        leaf = False
+                    frame = frame.f_back
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def function_stats(self):
+        return self.samples
+
+class CallProfiler:
+    """Runs cProfile in the thread that starts it, the one reading and parsing the files."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def function_stats(self):
+        stats = {}
+        for (file_name, line, function), (_, calls, total, cumulative, _) in pstats.Stats(self.profiler).stats.items():
+            stats[f"{file_name}:{line}({function})"] = {
+                "calls": calls, "totalSeconds": total, "cumulativeSeconds": cumulative}
+        return stats
+
+def make_profiler(profiler):
+    if profiler == "cprofile":
+        return CallProfiler()
+    if profiler == "sample":
+        return StackSampler()
+    return None
+
+def merge_function_stats(into, stats):
+    """Add the per-function counters of one profile to another, like those of several worker processes."""
+    for function, counters in stats.items():
+        totals = into.setdefault(function, dict.fromkeys(counters, 0))
+        for name, value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+
+def new_table_stats():
+    return {"stages": {}, "targets": {}, "rows": 0, "bytes": 0, "started": None, "finished": None, "peakRssMb": 0.0}
+
+def bottleneck(stats):
+    """Return the stage the table spent the most time in, the thread that ran it and what it is limited by.
+
+    Stages of different threads overlap, so the longest one is the pipeline's slowest step: read
+    means disk, parse and convert mean Python and transmit and commit mean waiting for the database.
+    """
+    candidates = [(seconds, "source", name) for name, seconds in stats["stages"].items()]
+    candidates += [(seconds, target, name) for target, stages in stats["targets"].items()
+                   for name, seconds in stages.items()]
+    if not candidates:
+        return None
+    seconds, thread, name = max(candidates)
+    return {"stage": name, "thread": thread, "seconds": seconds, "limitedBy": STAGE_LIMITS.get(name)}
+
+class LoadProfile:
+    """Collects the per-table stage timings, rows, bytes and peak memory of a load and writes them as a JSON report.
+
+    Stages are timed by the threads that run them, through table() and stage(), while the profile
+    is active. Worker processes run their own profile and send it back with export(), which the
+    parent adds with merge(); with in_workers the profiler only runs in the workers.
+    """
+
+    def __init__(self, loader, profiler=None, in_workers=False):
+        self.loader = loader
+        self.profiler_name = profiler
+        self.profiler = None if in_workers else make_profiler(profiler)
+        self.tables = {}
+        self.functions = {}
+        self.started_at = None
+        self.started = None
+        self.elapsed = 0.0
+        self.peak_rss_mb = 0.0
+        self.worker_peak_rss_mb = None
+        self._open = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._memory_thread = None
+
+    def _sample_memory(self):
+        while True:
+            rss = current_rss_mb()
+            with self._lock:
+                self.peak_rss_mb = max(self.peak_rss_mb, rss)
+                for table_name in self._open:
+                    self.tables[table_name]["peakRssMb"] = max(self.tables[table_name]["peakRssMb"], rss)
+            if self._stop.wait(MEMORY_SAMPLE_INTERVAL):
+                break
+
+    def start(self):
+        global _active
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.started = time.perf_counter()
+        self._memory_thread = threading.Thread(target=self._sample_memory, name="memory-sampler", daemon=True)
+        self._memory_thread.start()
+        if self.profiler is not None:
+            self.profiler.start()
+        _active = self
+
+    def stop(self):
+        global _active
+        _active = None
+        if self.profiler is not None:
+            self.profiler.stop()
+            merge_function_stats(self.functions, self.profiler.function_stats())
+        self._stop.set()
+        self._memory_thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        self.peak_rss_mb = max(self.peak_rss_mb, peak_rss_mb())
+
+    def _table(self, table_name):
+        return self.tables.setdefault(table_name, new_table_stats())
+
+    def open_table(self, table_name):
+        with self._lock:
+            stats = self._table(table_name)
+            now = time.time()
+            stats["started"] = now if stats["started"] is None else min(stats["started"], now)
+            self._open[table_name] = self._open.get(table_name, 0) + 1
+
+    def close_table(self, table_name):
+        with self._lock:
+            stats = self._table(table_name)
+            now = time.time()
+            stats["finished"] = now if stats["finished"] is None else max(stats["finished"], now)
+            self._open[table_name] -= 1
+            if not self._open[table_name]:
+                del self._open[table_name]
+
+    def add(self, table_name, target, name, seconds):
+        with self._lock:
+            stats = self._table(table_name)
+            # Reading and parsing the source happen once per table, whatever store it is loaded into
+            source_stage = name in SOURCE_STAGES or target is None
+            stages = stats["stages"] if source_stage else stats["targets"].setdefault(target, {})
+            stages[name] = stages.get(name, 0.0) + seconds
+
+    def count(self, table_name, rows, size):
+        with self._lock:
+            stats = self._table(table_name)
+            stats["rows"] += rows
+            stats["bytes"] += size
+
+    def export(self):
+        """Return what a worker process measured, to be merged into the parent's profile."""
+        return {"tables": self.tables, "functions": self.functions, "peakRssMb": self.peak_rss_mb}
+
+    def merge(self, exported):
+        """Add the tables and functions measured by a worker process."""
+        with self._lock:
+            for table_name, worker_stats in exported["tables"].items():
+                stats = self._table(table_name)
+                for name, seconds in worker_stats["stages"].items():
+                    stats["stages"][name] = stats["stages"].get(name, 0.0) + seconds
+                for target, stages in worker_stats["targets"].items():
+                    target_stages = stats["targets"].setdefault(target, {})
+                    for name, seconds in stages.items():
+                        target_stages[name] = target_stages.get(name, 0.0) + seconds
+                stats["rows"] += worker_stats["rows"]
+                stats["bytes"] += worker_stats["bytes"]
+                for bound, pick in (("started", min), ("finished", max)):
+                    if worker_stats[bound] is not None:
+                        stats[bound] = worker_stats[bound] if stats[bound] is None else pick(stats[bound], worker_stats[bound])
+                stats["peakRssMb"] = max(stats["peakRssMb"], worker_stats["peakRssMb"])
+            self.worker_peak_rss_mb = max(self.worker_peak_rss_mb or 0.0, exported["peakRssMb"])
+            merge_function_stats(self.functions, exported["functions"])
+
+    def report(self):
+        """Build the report: throughput, stage times and bottleneck of every table, and the top profiled functions."""
+        tables = {}
+        for table_name, stats in sorted(self.tables.items()):
+            wall = stats["finished"] - stats["started"] if stats["started"] is not None and stats["finished"] is not None else 0.0
+            tables[table_name] = {
+                "wallSeconds": wall,
+                "rows": stats["rows"],
+                "bytes": stats["bytes"],
+                "rowsPerSec": stats["rows"] / wall if wall > 0 else None,
+                "mbPerSec": stats["bytes"] / (1024 * 1024) / wall if wall > 0 else None,
+                "peakRssMb": stats["peakRssMb"],
+                "stages": {name: stats["stages"][name] for name in STAGES if name in stats["stages"]},
+                "targets": {target: {name: stages[name] for name in STAGES if name in stages}
+                            for target, stages in sorted(stats["targets"].items())},
+                "bottleneck": bottleneck(stats),
+            }
+        rows = sum(stats["rows"] for stats in self.tables.values())
+        size = sum(stats["bytes"] for stats in self.tables.values())
+        limits = {}
+        for stats in tables.values():
+            if stats["bottleneck"] is not None:
+                limit = stats["bottleneck"]["limitedBy"]
+                limits[limit] = limits.get(limit, 0.0) + stats["wallSeconds"]
+        report = {
+            "loader": self.loader,
+            "startedAt": self.started_at,
+            "wallSeconds": self.elapsed,
+            "rows": rows,
+            "bytes": size,
+            "rowsPerSec": rows / self.elapsed if self.elapsed > 0 else None,
+            "mbPerSec": size / (1024 * 1024) / self.elapsed if self.elapsed > 0 else None,
+            "peakRssMb": self.peak_rss_mb,
+            # Seconds of the tables limited by disk, Python or the database
+            "limitedBy": limits,
+            "tables": tables,
+        }
+        if self.worker_peak_rss_mb is not None:
+            report["workerPeakRssMb"] = self.worker_peak_rss_mb
+        if self.profiler_name is not None:
+            sort_key = "cumulativeSeconds" if self.profiler_name == "cprofile" else "samples"
+            top = sorted(self.functions.items(), key=lambda item: item[1].get(sort_key, 0), reverse=True)[:TOP_FUNCTIONS]
+            report["profiler"] = self.profiler_name
+            report["functions"] = [dict(counters, function=function) for function, counters in top]
+        return report
+
+    def write(self, path):
+        report = self.report()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(report, file, indent=4)
+        print(f"Load report saved to {path}")
+        for table_name, stats in report["tables"].items():
+            if stats["bottleneck"] is not None:
+                print(f"  {table_name}: limited by {stats['bottleneck']['limitedBy']} "
+                      f"({stats['bottleneck']['stage']} in {stats['bottleneck']['thread']})")
+
+def default_report_path(loader):
+    return os.path.join(os.getenv("TEST_DATA_TMP_LOCAL_PATH") or ".", f"load-report-{loader}.json")
+
+def add_profile_arguments(parser, loader):
+    parser.add_argument("--report", nargs="?", const=default_report_path(loader),
+                        help="time every stage of the load and write a JSON report, by default to "
+                             f"TEST_DATA_TMP_LOCAL_PATH/load-report-{loader}.json")
+    parser.add_argument("--profile", choices=PROFILERS,
+                        help="also profile the load with cProfile (calls of the reading thread) or a stack sampler "
+                             "(every thread), listing the top functions in the report")
+
+def start_profile(args, loader, in_workers=False):
+    """Start the profile of a load when --report or --profile is given, returning None otherwise."""
+    if args.report is None and args.profile is None:
+        return None
+    if args.report is None:
+        args.report = default_report_path(loader)
+    profile = LoadProfile(loader, args.profile, in_workers)
+    profile.start()
+    return profile
+
+def finish_profile(profile, args):
+    if profile is not None:
+        profile.stop()
+        profile.write(args.report)
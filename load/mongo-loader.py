@@ -1,8 +1,16 @@
 import os
 import json
-from pymongo import MongoClient
+import argparse
+from pymongo import ASCENDING, MongoClient
 from dotenv import load_dotenv
 from datetime import datetime
+import load_journal
+import load_profile
+from checkpoint import DEFAULT_CHUNK_SIZE_MB, CheckpointManifest
+from data_prep import fan_out, iter_batches
+from load_profile import add_profile_arguments, finish_profile, start_profile
+from schema_compiler import compile_schema
+from sinks import MongoSink
 
 load_dotenv()
 
@@ -11,6 +19,19 @@ SCHEMA_DIR = os.getenv("TEST_DATA_SCHEMA_LOCAL_PATH")
 MONGO_URI = "mongodb://localhost:27017"
 DB_NAME = os.getenv("MONGO_DB")
 
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_WORKERS = 4
+
+# Layouts of the returns collections, the tables with a *_returned_date_sk key
+LAYOUTS = ("flat", "embedded", "bucketed")
+BUCKET_KEY_SUFFIX = "_returned_date_sk"
+# Rows stored in one date bucket document at most, so documents stay far below the 16 MB limit
+DEFAULT_BUCKET_ROWS = 1000
+# Keys the returns collections are indexed on with --indexes
+INDEXED_KEY_SUFFIXES = ("_returned_date_sk", "_item_sk")
+# Small dimensions whose fields the embedded layout copies into the documents referencing them
+EMBEDDED_DIMENSIONS = {"reason": "_reason_sk"}
+
 def get_columns_from_schema(table_name):
     """Read column names from the schema JSON file for a given table."""
     schema_file = os.path.join(SCHEMA_DIR, f"{table_name}.json")
@@ -49,52 +70,240 @@ def convert_type(value, target_type):
     except ValueError:
         raise ValueError(f"Cannot convert value '{value}' to {target_type}")
 
-def preprocess_data(file_path, table_columns, table_schema):
+def fields_to_document(fields, table_columns, table_schema):
+    """Convert the raw fields of one row to a document with typed values."""
+    fields = [None if field == '' else field for field in fields]
+    # Create a dictionary matching the columns with the data
+    document = {}
+    for i in range(len(fields)):
+        column = table_columns[i]
+        value = fields[i]
+        target_type = table_schema.get(column, "str")
+        document[column] = convert_type(value, target_type)
+    return document
+
+def line_to_document(line, table_columns, table_schema):
+    """Convert one line of a .dat file to a document with typed values."""
+    cleaned_line = line.rstrip()
+    if cleaned_line.endswith('|'):
+        cleaned_line = cleaned_line[:-1]
+    return fields_to_document(cleaned_line.split('|'), table_columns, table_schema)
+
+def document_converter(table_columns, table_schema, converter=None):
+    """Return the function turning a list of split rows into documents.
+
+    With a compiled converter rows are converted column by column, otherwise each field goes
+    through convert_type().
+    """
+    if converter is not None:
+        return converter.to_documents
+    return lambda rows: [fields_to_document(row, table_columns, table_schema) for row in rows]
+
+def find_key(table_columns, suffix):
+    """Return the column of a table ending with suffix, or None."""
+    return next((column for column in table_columns if column.endswith(suffix)), None)
+
+def layout_collection(table_name, layout):
+    """Name the collection of a table in a layout, so every layout can be loaded next to the flat one."""
+    return table_name if layout == "flat" else f"{table_name}_{layout}"
+
+def load_dimension(table_name):
+    """Read a small dimension table into a dictionary of its documents keyed by their surrogate key."""
+    converter = compile_schema(table_name)
+    key = converter.columns[0]
+    documents = {}
+    for batch in iter_batches(os.path.join(DATA_DIR, f"{table_name}.dat"), len(converter.columns)):
+        for document in converter.to_documents(batch.rows):
+            documents[document.pop(key)] = document
+    return documents
+
+def embed_dimensions(dimension_keys):
+    """Build the layout step giving every document the fields of the dimension rows its keys reference."""
+    def embed(documents):
+        for document in documents:
+            for key, dimension in dimension_keys.items():
+                fields = dimension.get(document.get(key))
+                if fields:
+                    document.update(fields)
+        return documents
+    return embed
+
+def bucket_documents(bucket_key, bucket_rows=DEFAULT_BUCKET_ROWS):
+    """Build the layout step turning the documents of a batch into one document per date key with the rows inside.
+
+    A date spread over several batches gets several buckets, each with its row count.
+    """
+    def bucket(documents):
+        buckets = {}
+        for document in documents:
+            buckets.setdefault(document.pop(bucket_key, None), []).append(document)
+        return [
+            {bucket_key: key, "count": len(documents[start:start + bucket_rows]),
+             "rows": documents[start:start + bucket_rows]}
+            for key, documents in buckets.items()
+            for start in range(0, len(documents), bucket_rows)
+        ]
+    return bucket
+
+def layout_step(table_columns, layout, bucket_rows=DEFAULT_BUCKET_ROWS, dimensions=None):
+    """Return the step reshaping the flat documents of a batch of a returns table for a layout, or None for flat.
+
+    The embedded layout copies the fields of small dimensions like reason into each document, and
+    the bucketed layout groups the rows of each date into bucket documents. The step runs on the
+    documents whether they were converted from rows or read from the columnar cache.
+    """
+    if layout == "embedded":
+        dimension_keys = {find_key(table_columns, suffix): dimensions[dimension]
+                          for dimension, suffix in EMBEDDED_DIMENSIONS.items() if find_key(table_columns, suffix)}
+        return embed_dimensions(dimension_keys)
+    if layout == "bucketed":
+        return bucket_documents(find_key(table_columns, BUCKET_KEY_SUFFIX), bucket_rows)
+    return None
+
+def create_indexes(db, collection_name, table_columns, layout):
+    """Index a returns collection on its date and item keys, inside the bucketed rows for the item key."""
+    bucket_key = find_key(table_columns, BUCKET_KEY_SUFFIX)
+    for suffix in INDEXED_KEY_SUFFIXES:
+        key = find_key(table_columns, suffix)
+        if key is None:
+            continue
+        field = f"rows.{key}" if layout == "bucketed" and key != bucket_key else key
+        db[collection_name].create_index([(field, ASCENDING)])
+        print(f"Indexed {collection_name} on {field}")
+
+def preprocess_data(file_path, table_columns, table_schema, converter=None, shape_documents=None):
     """Preprocess data to convert values to appropriate types and return as JSON format."""
+    to_documents = document_converter(table_columns, table_schema, converter)
     data = []
-    with open(file_path, 'r') as infile:
-        for line in infile:
-            cleaned_line = line.rstrip()
-            if cleaned_line.endswith('|'):
-                cleaned_line = cleaned_line[:-1]
-            fields = cleaned_line.split('|')
-            fields = [None if field == '' else field for field in fields]
-            # Create a dictionary matching the columns with the data
-            document = {}
-            for i in range(len(fields)):
-                column = table_columns[i]
-                value = fields[i]
-                target_type = table_schema.get(column, "str")
-                document[column] = convert_type(value, target_type)
-            data.append(document)
+    for batch in iter_batches(file_path, len(table_columns)):
+        with load_profile.stage("convert"):
+            documents = to_documents(batch.rows)
+            data.extend(shape_documents(documents) if shape_documents is not None else documents)
     return data
 
-def load_data_to_mongo(db, collection_name, file_path, table_columns, table_schema):
+def load_data_to_mongo(db, collection_name, file_path, table_columns, table_schema, converter=None, shape_documents=None):
     """Load data into MongoDB collection."""
-    data = preprocess_data(file_path, table_columns, table_schema)
+    data = preprocess_data(file_path, table_columns, table_schema, converter, shape_documents)
     collection = db[collection_name]
-    collection.insert_many(data)
+    with load_profile.stage("transmit"), load_journal.writing("mongo", collection_name):
+        collection.insert_many(data)
+
+def load_data_to_mongo_streaming(workers, collection_name, file_path, table_columns, table_schema, batch_size,
+                                 converter=None, batches=None, shape_documents=None, manifest=None, chunk_size=None):
+    """Stream batches of documents to a pool of insert workers, keeping at most two batches per worker in memory.
+
+    With a checkpoint manifest the file is loaded in byte-range chunks, each recorded once its
+    documents are inserted, and the chunks the manifest lists are skipped. The documents of a
+    chunk have ids of their position in it, so a chunk interrupted halfway is loaded again
+    without duplicates. A collection with no committed chunk is dropped first. Cached batches
+    are loaded in one piece without checkpoints, so their collection is always dropped first.
+    """
+    to_documents = document_converter(table_columns, table_schema, converter)
+    if manifest is None or batches is not None:
+        chunks = [(0, None)]
+        drop = batches is not None
+    else:
+        chunks = manifest.plan("mongo", collection_name, file_path, chunk_size)
+        drop = not manifest.committed_rows("mongo", collection_name) and chunks
+    if drop:
+        with MongoClient(MONGO_URI) as client:
+            client[DB_NAME][collection_name].drop()
+    docs, elapsed, peak_rss_mb = 0, 0.0, 0.0
+    for start, end in chunks:
+        id_prefix = start if manifest is not None and batches is None else None
+        sink = MongoSink(MONGO_URI, DB_NAME, collection_name, to_documents, workers, batch_size, id_prefix,
+                         shape_documents)
+        _, errors = fan_out(file_path, [sink], len(table_columns), start, end, batches=batches)
+        if errors:
+            raise errors[sink]
+        if id_prefix is not None:
+            manifest.commit("mongo", collection_name, start, end, sink.rows)
+        docs += sink.rows
+        elapsed += sink.elapsed
+        peak_rss_mb = max(peak_rss_mb, sink.peak_rss_mb)
+    docs_per_sec = docs / elapsed if elapsed > 0 else 0
+    print(f"{collection_name}: {docs} docs in {elapsed:.2f}s ({docs_per_sec:.0f} docs/sec), "
+          f"peak RSS {peak_rss_mb:.1f} MB")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load the TPC-DS .dat files into MongoDB.")
+    parser.add_argument("--mode", choices=["stream", "bulk"], default="stream",
+                        help="insert fixed-size batches from a pool of workers (default) or build each collection in memory first")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="number of insert worker threads, each with its own MongoClient")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="number of documents sent per insert_many call")
+    parser.add_argument("--converter", choices=["compiled", "per-field"], default="compiled",
+                        help="convert values column-wise with the compiled schema (default) or field by field")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE_MB,
+                        help="size in MB of the chunks files are loaded and checkpointed in, in stream mode")
+    parser.add_argument("--resume", action="store_true",
+                        help="in stream mode, load only the chunks not committed by an earlier run")
+    parser.add_argument("--layout", choices=LAYOUTS, default="flat",
+                        help="layout of the returns collections: one document per row (default), rows with the reason "
+                             "fields embedded, or documents bucketing the rows of each date; non-flat layouts are "
+                             "loaded into <table>_<layout>")
+    parser.add_argument("--bucket-rows", type=int, default=DEFAULT_BUCKET_ROWS,
+                        help="rows per bucket document in the bucketed layout")
+    parser.add_argument("--indexes", action="store_true",
+                        help="index the returns collections on their *_returned_date_sk and *_item_sk keys")
+    parser.add_argument("--tables", nargs="*",
+                        help="only load these tables (default: every .dat file in TEST_DATA_LOCAL_PATH)")
+    parser.add_argument("--cache", action="store_true",
+                        help="in stream mode, read the tables from the columnar cache, building it on first use (needs pyarrow)")
+    add_profile_arguments(parser, "mongo-loader")
+    args = parser.parse_args()
+    if args.resume and args.cache:
+        parser.error("--resume cannot be used with --cache: cached tables are loaded in one piece without checkpoints")
+    return args
 
 def main():
+    args = parse_args()
+    if args.cache:
+        # pyarrow is only needed when the cache is used
+        from columnar_cache import iter_cached_batches
     client = MongoClient(MONGO_URI)
     db = client[DB_NAME]
+    manifest = CheckpointManifest(resume=args.resume)
+    profile = start_profile(args, "mongo-loader")
+    dimensions = {dimension: load_dimension(dimension) for dimension in EMBEDDED_DIMENSIONS} if args.layout == "embedded" else {}
     # Load data into MongoDB
     for file_name in os.listdir(DATA_DIR):
         if file_name.endswith(".dat"):
             table_name = os.path.splitext(file_name)[0].lower()
             file_path = os.path.join(DATA_DIR, file_name)
+            if args.tables and table_name not in args.tables:
+                continue
             try:
                 # Get columns from schema
                 table_columns = get_columns_from_schema(table_name)
                 # Load the schema for the table
                 table_schema = load_table_schema(table_name)
+                converter = compile_schema(table_name) if args.converter == "compiled" else None
+                # Only the returns tables have layouts, every other table is loaded flat
+                is_returns = find_key(table_columns, BUCKET_KEY_SUFFIX) is not None
+                layout = args.layout if is_returns else "flat"
+                collection_name = layout_collection(table_name, layout)
+                shape_documents = layout_step(table_columns, layout, args.bucket_rows, dimensions)
                 # Load data into the MongoDB collection
-                load_data_to_mongo(db, table_name, file_path, table_columns, table_schema)
-                print(f"Data loaded into MongoDB collection {table_name} from {file_name}")
+                with load_profile.table(table_name, load_profile.target_name("mongo", table_name, collection_name)):
+                    if args.mode == "stream":
+                        batches = iter_cached_batches(table_name, file_path) if args.cache else None
+                        load_data_to_mongo_streaming(args.workers, collection_name, file_path, table_columns, table_schema,
+                                                     args.batch_size, converter, batches, shape_documents, manifest,
+                                                     args.chunk_size * 1024 * 1024)
+                    else:
+                        load_data_to_mongo(db, collection_name, file_path, table_columns, table_schema, converter,
+                                           shape_documents)
+                if args.indexes and is_returns:
+                    create_indexes(db, collection_name, table_columns, layout)
+                print(f"Data loaded into MongoDB collection {collection_name} from {file_name}")
             except FileNotFoundError as e:
                 print(e)
             except Exception as e:
                 print(f"Error loading data into MongoDB collection {table_name}: {e}")
+    client.close()
+    finish_profile(profile, args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
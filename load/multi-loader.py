@@ -0,0 +1,189 @@
+import os
+import argparse
+import psycopg
+import load_profile
+import load_journal
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from cassandra_ddl import parse_cassandra_ddl
+from cassandra_modeler import query_table_definitions
+from checkpoint import DEFAULT_CHUNK_SIZE_MB, CheckpointManifest, ensure_postgres_checkpoints, reset_postgres_checkpoints
+from data_prep import fan_out, read_scenario_tables
+from load_profile import add_profile_arguments, finish_profile, start_profile
+from schema_compiler import compile_schema
+from sinks import MongoSink, PostgresSink, connect_cassandra, make_cassandra_sink
+
+load_dotenv()
+
+DATA_DIR = os.getenv("TEST_DATA_LOCAL_PATH")
+BENCHMARK_DIR = os.path.join(os.path.dirname(__file__), "..", "benchmark")
+MONGO_URI = "mongodb://localhost:27017"
+MONGO_DB = os.getenv("MONGO_DB")
+CASSANDRA_HOST = os.getenv("CASSANDRA_HOST", "localhost")
+CASSANDRA_PORT = int(os.getenv("CASSANDRA_PORT", 9042))
+
+DB_CONFIG = {
+    "dbname": os.getenv("POSTGRES_DB"),
+    "user": os.getenv("POSTGRES_USER"),
+    "password": os.getenv("POSTGRES_PASSWORD"),
+    "host": "localhost",
+    "port": 5432
+}
+
+def scenario_file_path(scenario):
+    """Return the file of a scenario given as a number, a name in benchmark/scenarios or a path."""
+    if scenario.endswith(".json"):
+        return scenario
+    if scenario.isdigit():
+        scenario = f"scenario-{scenario}"
+    return os.path.join(BENCHMARK_DIR, "scenarios", f"{scenario}.json")
+
+def resolve_targets(scenarios, tables):
+    """Collect the stores every table must be loaded into for the given benchmark scenarios."""
+    targets = {}
+    for scenario in scenarios:
+        scenario_file = scenario_file_path(scenario)
+        for table_name, stores in read_scenario_tables(scenario_file, tables).items():
+            targets.setdefault(table_name, set()).update(stores)
+    return targets
+
+def plan_chunks(manifest, table_stores, table_name, file_path, chunk_size):
+    """Return the chunks of a file in order, each with the stores that have not committed it yet."""
+    pending = {store: set(manifest.plan(store, table_name, file_path, chunk_size)) for store in table_stores}
+    return [(chunk, sorted(store for store in table_stores if chunk in pending[store]))
+            for chunk in sorted(set().union(*pending.values()))]
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Read every TPC-DS .dat file once and load it into all stores a benchmark scenario places it in.")
+    parser.add_argument("--scenarios", nargs="+", default=["0", "1", "2"],
+                        help="scenario numbers, names or files whose table placement decides the targets (default: 0 1 2)")
+    parser.add_argument("--workers", type=int, default=4, help="MongoDB insert workers per collection")
+    parser.add_argument("--batch-size", type=int, default=10000, help="documents per MongoDB insert_many call")
+    parser.add_argument("--concurrency", type=int, default=64, help="Cassandra writes kept in flight per table")
+    parser.add_argument("--partition-batch-rows", type=int, default=20,
+                        help="maximum rows of one Cassandra partition sent as an unlogged batch")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE_MB,
+                        help="size in MB of the chunks files are loaded and checkpointed in")
+    parser.add_argument("--resume", action="store_true",
+                        help="load only the chunks every store has not committed in an earlier run")
+    parser.add_argument("--query-tables", action="store_true",
+                        help="also load the date-partitioned copies generated by cassandra_modeler.py of the Cassandra tables")
+    parser.add_argument("--cache", action="store_true",
+                        help="read the tables from the columnar cache, building it on first use (needs pyarrow)")
+    add_profile_arguments(parser, "multi-loader")
+    args = parser.parse_args()
+    if args.resume and args.cache:
+        parser.error("--resume cannot be used with --cache: cached tables are loaded in one piece without checkpoints")
+    return args
+
+def main():
+    args = parse_args()
+    files = {
+        os.path.splitext(file_name)[0].lower(): os.path.join(DATA_DIR, file_name)
+        for file_name in sorted(os.listdir(DATA_DIR)) if file_name.endswith(".dat")
+    }
+    targets = resolve_targets(args.scenarios, set(files))
+    if args.cache:
+        # pyarrow is only needed when the cache is used
+        from columnar_cache import iter_cached_batches
+    stores = set().union(*targets.values()) if targets else set()
+
+    manifest = CheckpointManifest(resume=args.resume)
+    chunk_size = args.chunk_size * 1024 * 1024
+    pg_conn = None
+    cluster = None
+    profile = start_profile(args, "multi-loader")
+    try:
+        if "postgres" in stores:
+            pg_conn = psycopg.connect(**DB_CONFIG)
+            pg_conn.autocommit = True
+            with pg_conn.cursor() as cursor:
+                ensure_postgres_checkpoints(cursor)
+                if not args.resume:
+                    # A load from the start empties the tables, like the Mongo collections are dropped
+                    pg_tables = [table_name for table_name, table_stores in targets.items() if "postgres" in table_stores]
+                    with pg_conn.transaction():
+                        if pg_tables:
+                            cursor.execute(f"TRUNCATE {', '.join(pg_tables)}")
+                        reset_postgres_checkpoints(cursor, pg_tables)
+                    load_journal.record("postgres", pg_tables, "truncate")
+        if "cassandra" in stores:
+            cassandra_tables = parse_cassandra_ddl()
+            query_tables = query_table_definitions() if args.query_tables else {}
+            cluster, session = connect_cassandra(CASSANDRA_HOST, CASSANDRA_PORT)
+
+        for table_name, file_path in files.items():
+            table_stores = targets.get(table_name)
+            if not table_stores:
+                print(f"Skipping {table_name}: not placed in any store by scenarios {', '.join(args.scenarios)}")
+                continue
+            try:
+                column_count = len(compile_schema(table_name).columns)
+                if args.cache:
+                    # The cache holds whole tables, so they are loaded in one piece without checkpoints
+                    chunks = [((0, None), sorted(table_stores))]
+                else:
+                    chunks = plan_chunks(manifest, table_stores, table_name, file_path, chunk_size)
+                if "mongo" in table_stores and chunks and (args.cache or not manifest.committed_rows("mongo", table_name)):
+                    with MongoClient(MONGO_URI) as client:
+                        client[MONGO_DB][table_name].drop()
+                totals = {store: [0, 0.0] for store in table_stores}
+                failed = set()
+                read_rows = 0
+                for (start, end), chunk_stores in chunks:
+                    checkpointed = not args.cache
+                    sinks = {}
+                    for store in chunk_stores:
+                        if store in failed:
+                            continue
+                        if store == "postgres":
+                            sinks[store] = [PostgresSink(pg_conn, table_name, (start, end) if checkpointed else None)]
+                        elif store == "mongo":
+                            sinks[store] = [MongoSink(MONGO_URI, MONGO_DB, table_name, compile_schema(table_name).to_documents,
+                                                      args.workers, args.batch_size, start if checkpointed else None)]
+                        elif store == "cassandra":
+                            sink, _ = make_cassandra_sink(session, table_name, cassandra_tables[table_name],
+                                                          args.concurrency, args.partition_batch_rows)
+                            sinks[store] = [sink]
+                            for name, definition in sorted(query_tables.items()):
+                                if definition["source"] == table_name:
+                                    sink, _ = make_cassandra_sink(session, name, definition, args.concurrency,
+                                                                  args.partition_batch_rows, source_table=table_name)
+                                    sinks[store].append(sink)
+                    if not sinks:
+                        continue
+                    batches = iter_cached_batches(table_name, file_path) if args.cache else None
+                    with load_profile.table(table_name):
+                        rows, errors = fan_out(file_path, [sink for store_sinks in sinks.values() for sink in store_sinks],
+                                               column_count, start, end, batches=batches)
+                    read_rows += rows
+                    for store, store_sinks in sinks.items():
+                        store_errors = [errors[sink] for sink in store_sinks if sink in errors]
+                        if store_errors:
+                            rerun = "rerun" if args.cache else "rerun with --resume to load its remaining chunks"
+                            print(f"Error loading data into {store} table {table_name}, {rerun}: {store_errors[0]}")
+                            failed.add(store)
+                            continue
+                        if checkpointed:
+                            manifest.commit(store, table_name, start, end, store_sinks[0].rows)
+                        totals[store][0] += store_sinks[0].rows
+                        totals[store][1] += max(sink.elapsed for sink in store_sinks)
+                print(f"Read {read_rows} rows of {table_name} for {', '.join(sorted(table_stores))}")
+                for store, (rows, elapsed) in sorted(totals.items()):
+                    if store not in failed:
+                        rows_per_sec = rows / elapsed if elapsed > 0 else 0
+                        print(f"  {store} {table_name}: {rows} rows in {elapsed:.2f}s ({rows_per_sec:.0f} rows/sec)")
+            except FileNotFoundError as e:
+                print(e)
+            except Exception as e:
+                print(f"Error loading data for table {table_name}: {e}")
+    finally:
+        if pg_conn is not None:
+            pg_conn.close()
+        if cluster is not None:
+            cluster.shutdown()
+        finish_profile(profile, args)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
 import os
+import time
+import argparse
 import psycopg
+import load_journal
+import load_profile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dotenv import load_dotenv
+from checkpoint import (DEFAULT_CHUNK_SIZE_MB, CheckpointManifest, ensure_postgres_checkpoints, postgres_committed_rows,
+                        record_postgres_chunk, reset_postgres_checkpoints)
+from data_prep import read_text_blocks, to_copy_text
+from load_profile import LoadProfile, add_profile_arguments, finish_profile, start_profile
 
 load_dotenv()
 
@@ -16,6 +25,9 @@ DB_CONFIG = {
     "port": 5432
 }
 
+# Connection owned by each worker process in streaming mode
+_worker_conn = None
+
 def create_schema(cursor):
     try:
         with open(POSTGRES_DDL_FILE, 'r') as file:
@@ -25,56 +37,184 @@ def create_schema(cursor):
     except Exception as e:
         print(f"An error occurred while creating schema: {e}")
 
+def clean_line(line):
+    """Remove the trailing delimiter and replace empty fields with '\\N' for PostgreSQL compatibility."""
+    cleaned_line = line.rstrip()
+    if cleaned_line.endswith('|'):
+        cleaned_line = cleaned_line[:-1]
+    fields = cleaned_line.split('|')
+    fields = [r'\N' if field == '' else field for field in fields]
+    return '|'.join(fields)
+
 def preprocess_data(table_name, file_path):
     # Define the path for the temporary cleaned file
     temp_file_path = os.path.join(TMP_DATA_DIR, f"{table_name}_postgres.dat")
     with open(file_path, 'r') as infile, open(temp_file_path, 'w') as outfile:
         for line in infile:
-            # Strip the line to remove any trailing whitespace, then remove trailing '|'
-            cleaned_line = line.rstrip()
-            if cleaned_line.endswith('|'):
-                cleaned_line = cleaned_line[:-1]
-            # Split the line by the delimiter '|' and replace any empty field with '\N' for PostgreSQL compatibility
-            fields = cleaned_line.split('|')
-            fields = [r'\N' if field == '' else field for field in fields]
-            # Rebuild the line by joining the fields with the delimiter '|'
-            cleaned_line = '|'.join(fields)
             # Write the cleaned line to the temporary file
-            outfile.write(cleaned_line + '\n')
+            outfile.write(clean_line(line) + '\n')
     return temp_file_path
 
 def load_data_to_table(cursor, table_name, file_path):
-    temp_file_path = preprocess_data(table_name, file_path)
+    # Reading and cleaning the lines happen in one pass, so the temp file counts as conversion
+    with load_profile.stage("convert"):
+        temp_file_path = preprocess_data(table_name, file_path)
+    load_profile.count(size=os.path.getsize(file_path))
     try:
         print(f"Loading data into {table_name} from {temp_file_path}")
         with open(temp_file_path, "r") as file:
             with cursor.copy(f"COPY {table_name} FROM STDIN WITH DELIMITER '|'") as copy:
-                while data := file.read(100):
-                    copy.write(data)
+                with load_profile.stage("transmit"):
+                    while data := file.read(100):
+                        copy.write(data)
         print(f"Data loaded into {table_name} successfully")
     except Exception as e:
         print(f"Error during COPY command for {table_name}: {e}")
     finally:
         os.remove(temp_file_path)
 
+def init_worker():
+    """Open the connection used by a worker process for all of its chunks."""
+    global _worker_conn
+    _worker_conn = psycopg.connect(**DB_CONFIG)
+    _worker_conn.autocommit = True
+
+def copy_chunk(table_name, file_path, start, end, profiled=False, profiler=None):
+    """Stream one byte range of a file into a table with COPY and return its row count and timings.
+
+    The rows and the chunk's checkpoint are committed in one transaction, so a chunk that was
+    already committed is skipped and a failed one leaves no rows behind. When profiled, the stages
+    of the chunk are timed in this worker and returned for the parent's report, or None otherwise.
+    """
+    started = time.time()
+    chunk_profile = LoadProfile("postgres-loader", profiler) if profiled else None
+    if chunk_profile is not None:
+        chunk_profile.start()
+    try:
+        with load_profile.table(table_name, "postgres"), load_journal.writing("postgres", table_name):
+            rows = _copy_chunk(table_name, file_path, start, end)
+    finally:
+        if chunk_profile is not None:
+            chunk_profile.stop()
+    return table_name, rows, started, time.time(), chunk_profile.export() if chunk_profile is not None else None
+
+def _copy_chunk(table_name, file_path, start, end):
+    rows = 0
+    with _worker_conn.transaction(), _worker_conn.cursor() as cursor:
+        committed_rows = postgres_committed_rows(cursor, table_name, start, end)
+        if committed_rows is not None:
+            return committed_rows
+        with cursor.copy(f"COPY {table_name} FROM STDIN WITH DELIMITER '|'") as copy:
+            for text in read_text_blocks(file_path, start, end):
+                with load_profile.stage("convert"):
+                    copy_text = to_copy_text(text)
+                    text_rows = text.count('\n')
+                load_profile.count(rows=text_rows)
+                with load_profile.stage("transmit"):
+                    copy.write(copy_text)
+                rows += text_rows
+            copied = time.perf_counter()
+        record_postgres_chunk(cursor, table_name, start, end, rows)
+    # Ending the COPY and committing wait for the server to write the rows still buffered
+    load_profile.record("commit", time.perf_counter() - copied)
+    return rows
+
+def load_streaming(tables, workers, chunk_size, manifest, profile=None):
+    """Load all tables over a pool of worker processes, splitting big files into chunks.
+
+    Every committed chunk is recorded in the manifest, and chunks it already lists are skipped.
+    With a load profile every worker times its chunks, and their stages are merged into it.
+    """
+    tasks = []
+    for table_name, file_path in tables:
+        pending = manifest.plan("postgres", table_name, file_path, chunk_size)
+        if not pending:
+            print(f"{table_name} is already loaded: {manifest.committed_rows('postgres', table_name)} rows")
+        for start, end in pending:
+            tasks.append((table_name, file_path, start, end))
+    # Schedule the largest chunks first so the big fact tables do not end up last
+    tasks.sort(key=lambda task: task[3] - task[2], reverse=True)
+
+    pending_chunks = {}
+    table_stats = {}
+    for table_name, _, _, _ in tasks:
+        pending_chunks[table_name] = pending_chunks.get(table_name, 0) + 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        futures = {
+            executor.submit(copy_chunk, *task, profile is not None, profile.profiler_name if profile else None): task
+            for task in tasks
+        }
+        for future in as_completed(futures):
+            table_name, _, start, end = futures[future]
+            try:
+                _, rows, started, finished, chunk_stats = future.result()
+            except Exception as e:
+                print(f"Error during COPY command for {table_name}, rerun with --resume to load its remaining chunks: {e}")
+                pending_chunks[table_name] = None
+                continue
+            manifest.commit("postgres", table_name, start, end, rows)
+            if chunk_stats is not None:
+                profile.merge(chunk_stats)
+            if pending_chunks[table_name] is None:
+                continue
+            stats = table_stats.setdefault(table_name, {"rows": 0, "started": started, "finished": finished})
+            stats["rows"] += rows
+            stats["started"] = min(stats["started"], started)
+            stats["finished"] = max(stats["finished"], finished)
+            pending_chunks[table_name] -= 1
+            if pending_chunks[table_name] == 0:
+                elapsed = stats["finished"] - stats["started"]
+                rows_per_sec = stats["rows"] / elapsed if elapsed > 0 else 0
+                print(f"Data loaded into {table_name} successfully: {stats['rows']} rows in {elapsed:.2f}s ({rows_per_sec:.0f} rows/sec)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load the TPC-DS .dat files into PostgreSQL.")
+    parser.add_argument("--mode", choices=["stream", "temp-file"], default="stream",
+                        help="stream rows straight into COPY (default) or write a cleaned temp file first")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of parallel connections used in stream mode")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE_MB,
+                        help="size in MB of the chunks big files are split into in stream mode")
+    parser.add_argument("--resume", action="store_true",
+                        help="in stream mode, keep the schema and load only the chunks not committed by an earlier run")
+    add_profile_arguments(parser, "postgres-loader")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    tables = []
+    for file_name in os.listdir(DATA_DIR):
+        if file_name.endswith(".dat"):
+            table_name = os.path.splitext(file_name)[0].lower()
+            tables.append((table_name, os.path.join(DATA_DIR, file_name)))
+
     conn = psycopg.connect(**DB_CONFIG)
     conn.autocommit = True
+    # In stream mode the chunks are copied and profiled by the worker processes
+    profile = start_profile(args, "postgres-loader", in_workers=args.mode == "stream")
     try:
         with conn.cursor() as cursor:
-            create_schema(cursor)
-            for file_name in os.listdir(DATA_DIR):
-                if file_name.endswith(".dat"):
-                    table_name = os.path.splitext(file_name)[0].lower()
-                    file_path = os.path.join(DATA_DIR, file_name)
-                    try:
+            if not (args.resume and args.mode == "stream"):
+                create_schema(cursor)
+            if args.mode == "stream":
+                ensure_postgres_checkpoints(cursor)
+                if not args.resume:
+                    reset_postgres_checkpoints(cursor, [table_name for table_name, _ in tables])
+                manifest = CheckpointManifest(resume=args.resume)
+                load_streaming(tables, args.workers, args.chunk_size * 1024 * 1024, manifest, profile)
+                return
+            for table_name, file_path in tables:
+                try:
+                    with load_profile.table(table_name, "postgres"), load_journal.writing("postgres", table_name):
                         load_data_to_table(cursor, table_name, file_path)
-                    except FileNotFoundError as e:
-                        print(e)
-                    except Exception as e:
-                        print(f"Error loading data into {table_name}: {e}")
+                except FileNotFoundError as e:
+                    print(e)
+                except Exception as e:
+                    print(f"Error loading data into {table_name}: {e}")
     finally:
         conn.close()
+        finish_profile(profile, args)
 
 if __name__ == "__main__":
     main()
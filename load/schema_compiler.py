@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.util
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from dotenv import load_dotenv
+from data_prep import read_text_blocks, split_rows
+
+load_dotenv()
+
+SCHEMA_DIR = os.getenv("TEST_DATA_SCHEMA_LOCAL_PATH")
+DATA_DIR = os.getenv("TEST_DATA_LOCAL_PATH")
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Compiled converters, so every schema file is read only once per process
+_compiled_tables = {}
+
+@lru_cache(maxsize=None)
+def parse_date(value):
+    """Parse a date string, caching the result since the same dates repeat across rows."""
+    return datetime.strptime(value, "%Y-%m-%d")
+
+# Parser used for each type name of the schema files, unknown types are kept as strings
+TYPE_PARSERS = {
+    "int": int,
+    "float": float,
+    "date": parse_date,
+    "str": str,
+}
+
+@lru_cache(maxsize=None)
+def parse_cassandra_date(value):
+    """Parse a date string to the datetime.date expected for DATE columns."""
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+# Parsers matching the column types of cassandra-ddl.sql, which uses DECIMAL for float columns
+CASSANDRA_TYPE_PARSERS = {
+    "int": int,
+    "float": Decimal,
+    "date": parse_cassandra_date,
+    "str": str,
+}
+
+class TableConverter:
+    """Column-wise converter for the rows of one table, built from its schema file."""
+
+    def __init__(self, table_name, table_schema, type_parsers):
+        self.table_name = table_name
+        self.columns = list(table_schema.keys())
+        self.types = [table_schema[column] for column in self.columns]
+        # str columns need no conversion, so only the other columns get a parser
+        self.parsers = [
+            None if type_parsers.get(target_type, str) is str else type_parsers[target_type]
+            for target_type in self.types
+        ]
+
+    def split_lines(self, lines):
+        """Split a batch of lines into rows of raw fields, with '' for empty values."""
+        return split_rows(''.join(lines), len(self.columns))
+
+    def convert_columns(self, rows):
+        """Convert a batch of rows and return the typed values column by column, with None for empty values."""
+        if not rows:
+            return [[] for _ in self.columns]
+        converted = []
+        for index, values in enumerate(zip(*rows)):
+            parser = self.parsers[index]
+            if parser is None:
+                converted.append([value or None for value in values])
+                continue
+            try:
+                converted.append([parser(value) if value else None for value in values])
+            except (ValueError, ArithmeticError):
+                bad_value = next(value for value in values if value and not _parses(parser, value))
+                raise ValueError(f"Cannot convert value '{bad_value}' of column {self.columns[index]} to {self.types[index]}")
+        return converted
+
+    def to_tuples(self, rows):
+        """Convert a batch of rows to tuples of typed values in schema column order."""
+        return list(zip(*self.convert_columns(rows)))
+
+    def to_documents(self, rows):
+        """Convert a batch of rows to dictionaries keyed by column name."""
+        columns = self.columns
+        return [dict(zip(columns, values)) for values in zip(*self.convert_columns(rows))]
+
+def _parses(parser, value):
+    try:
+        parser(value)
+        return True
+    except (ValueError, ArithmeticError):
+        return False
+
+def load_schema(table_name):
+    """Load the schema for a table from a JSON file."""
+    schema_file = os.path.join(SCHEMA_DIR, f"{table_name}.json")
+    if not os.path.exists(schema_file):
+        raise FileNotFoundError(f"Schema file not found for table: {table_name}")
+    with open(schema_file, "r") as file:
+        return json.load(file)
+
+def compile_schema(table_name, type_parsers=None):
+    """Return the converter of a table, reading its schema file on first use."""
+    key = (table_name, id(type_parsers))
+    if key not in _compiled_tables:
+        _compiled_tables[key] = TableConverter(table_name, load_schema(table_name), type_parsers or TYPE_PARSERS)
+    return _compiled_tables[key]
+
+def benchmark_table(table_name, file_path, batch_size, repeat):
+    """Time the per-field conversion of mongo-loader.py against the compiled converter for one file."""
+    spec = importlib.util.spec_from_file_location("mongo_loader", os.path.join(os.path.dirname(__file__), "mongo-loader.py"))
+    mongo_loader = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mongo_loader)
+    table_schema = load_schema(table_name)
+    table_columns = list(table_schema.keys())
+    lines = [line for text in read_text_blocks(file_path) for line in text.splitlines(True)]
+    batches = [lines[start:start + batch_size] for start in range(0, len(lines), batch_size)]
+    row_count = len(lines)
+
+    per_field_times = []
+    compiled_times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for batch in batches:
+            [mongo_loader.line_to_document(line, table_columns, table_schema) for line in batch]
+        per_field_times.append(time.perf_counter() - started)
+
+        parse_date.cache_clear()
+        _compiled_tables.clear()
+        started = time.perf_counter()
+        converter = compile_schema(table_name)
+        for batch in batches:
+            converter.to_documents(converter.split_lines(batch))
+        compiled_times.append(time.perf_counter() - started)
+
+    per_field = min(per_field_times)
+    compiled = min(compiled_times)
+    print(f"{table_name}: {row_count} rows, per-field {per_field:.3f}s ({row_count / per_field:.0f} rows/sec), "
+          f"compiled {compiled:.3f}s ({row_count / compiled:.0f} rows/sec), speedup {per_field / compiled:.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the compiled schema converters against the per-field conversion.")
+    parser.add_argument("tables", nargs="*", help="tables to benchmark (default: every .dat file in TEST_DATA_LOCAL_PATH)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows converted per batch")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per table, the fastest one is reported")
+    args = parser.parse_args()
+
+    tables = args.tables or sorted(os.path.splitext(f)[0].lower() for f in os.listdir(DATA_DIR) if f.endswith(".dat"))
+    for table_name in tables:
+        file_path = os.path.join(DATA_DIR, f"{table_name}.dat")
+        try:
+            benchmark_table(table_name, file_path, args.batch_size, args.repeat)
+        except FileNotFoundError as e:
+            print(e, file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
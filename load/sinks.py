@@ -0,0 +1,327 @@
+import time
+import threading
+import load_profile
+from concurrent.futures import ThreadPoolExecutor
+from cassandra import ConsistencyLevel
+from cassandra.cluster import Cluster, ExecutionProfile, EXEC_PROFILE_DEFAULT
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import BatchStatement, BatchType
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from checkpoint import postgres_committed_rows, record_postgres_chunk
+from schema_compiler import CASSANDRA_TYPE_PARSERS, compile_schema
+
+# Error code of an insert whose _id already exists
+DUPLICATE_KEY_ERROR = 11000
+
+class Sink:
+    """Target of the batches read by data_prep.fan_out(), called from a single thread.
+
+    Subclasses set needs_rows when they use the split rows of a batch rather than its text, and
+    time their convert, transmit and commit stages with load_profile.stage().
+    """
+
+    needs_rows = True
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.rows = 0
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def write(self, batch):
+        raise NotImplementedError
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def abort(self, error):
+        """Clean up after a failed start() or write(), instead of finish()."""
+
+    def report(self):
+        """Return a one-line throughput summary."""
+        rows_per_sec = self.rows / self.elapsed if self.elapsed > 0 else 0
+        return f"{self.name} {self.table_name}: {self.rows} rows in {self.elapsed:.2f}s ({rows_per_sec:.0f} rows/sec)"
+
+class PostgresSink(Sink):
+    """Streams batches into a table with COPY over an open connection.
+
+    Given the (start, end) byte range of the chunk it loads, the sink copies it in a transaction
+    that also records the chunk as committed, and skips a chunk that is already committed.
+    """
+
+    name = "postgres"
+    needs_rows = False
+
+    def __init__(self, conn, table_name, chunk=None):
+        super().__init__(table_name)
+        self.conn = conn
+        self.chunk = chunk
+        self.skipped = False
+        self._transaction = None
+        self._cursor = None
+        self._copy_context = None
+        self._copy = None
+
+    def start(self):
+        super().start()
+        if self.chunk is not None:
+            self._transaction = self.conn.transaction()
+            self._transaction.__enter__()
+        self._cursor = self.conn.cursor()
+        if self.chunk is not None:
+            committed_rows = postgres_committed_rows(self._cursor, self.table_name, *self.chunk)
+            if committed_rows is not None:
+                self.skipped = True
+                self.rows = committed_rows
+                return
+        self._copy_context = self._cursor.copy(f"COPY {self.table_name} FROM STDIN WITH DELIMITER '|'")
+        self._copy = self._copy_context.__enter__()
+
+    def write(self, batch):
+        if self.skipped:
+            return
+        with load_profile.stage("convert"):
+            text = batch.copy_text()
+        with load_profile.stage("transmit"):
+            self._copy.write(text)
+        self.rows += batch.row_count
+
+    def finish(self):
+        with load_profile.stage("commit"):
+            if not self.skipped:
+                self._copy_context.__exit__(None, None, None)
+                if self.chunk is not None:
+                    record_postgres_chunk(self._cursor, self.table_name, *self.chunk, self.rows)
+            self._cursor.close()
+            if self._transaction is not None:
+                self._transaction.__exit__(None, None, None)
+        super().finish()
+
+    def abort(self, error):
+        # Leaving the COPY and the transaction with the error rolls both back
+        if self._copy_context is not None:
+            try:
+                self._copy_context.__exit__(type(error), error, error.__traceback__)
+            except Exception:
+                pass
+        if self._cursor is not None:
+            self._cursor.close()
+        if self._transaction is not None:
+            try:
+                self._transaction.__exit__(type(error), error, error.__traceback__)
+            except Exception:
+                pass
+
+class MongoSink(Sink):
+    """Converts batches to documents and inserts them from a pool of workers with their own MongoClient.
+
+    At most two insert_many batches per worker are in flight, so memory stays bounded. With an
+    id_prefix, like the start offset of the chunk being loaded, every document gets the _id of
+    its position in the chunk, so loading a chunk again only inserts the documents it is missing.
+    shape_documents, like a layout step of mongo-loader.py, reshapes the documents of every batch
+    before they are inserted.
+    """
+
+    name = "mongo"
+
+    def __init__(self, mongo_uri, db_name, collection_name, to_documents, workers=4, batch_size=10000, id_prefix=None,
+                 shape_documents=None):
+        super().__init__(collection_name)
+        self.id_prefix = id_prefix
+        self._next_id = 0
+        self.mongo_uri = mongo_uri
+        self.db_name = db_name
+        self.to_documents = to_documents
+        self.shape_documents = shape_documents
+        self.workers = workers
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._executor = None
+        self._in_flight = None
+        self._futures = []
+        self._errors = []
+        self.peak_rss_mb = 0.0
+
+    def _insert(self, documents):
+        if not hasattr(self._local, "client"):
+            self._local.client = MongoClient(self.mongo_uri)
+        try:
+            self._local.client[self.db_name][self.table_name].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Documents inserted by an earlier attempt at the chunk are duplicates of their _id
+            if any(error["code"] != DUPLICATE_KEY_ERROR for error in e.details["writeErrors"]):
+                raise
+        return len(documents)
+
+    def _on_done(self, future):
+        self._in_flight.release()
+        if future.exception() is not None:
+            self._errors.append(future.exception())
+
+    def start(self):
+        super().start()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._in_flight = threading.BoundedSemaphore(self.workers * 2)
+        self.peak_rss_mb = load_profile.current_rss_mb()
+
+    def write(self, batch):
+        with load_profile.stage("convert"):
+            documents = batch.documents(self.to_documents)
+            if self.shape_documents is not None:
+                documents = self.shape_documents(documents)
+            if self.id_prefix is not None:
+                for document in documents:
+                    document["_id"] = f"{self.id_prefix}:{self._next_id}"
+                    self._next_id += 1
+        for offset in range(0, len(documents), self.batch_size):
+            # Waiting for a free insert slot is waiting for the server
+            with load_profile.stage("transmit"):
+                self._in_flight.acquire()
+            if self._errors:
+                self._in_flight.release()
+                raise self._errors[0]
+            future = self._executor.submit(self._insert, documents[offset:offset + self.batch_size])
+            future.add_done_callback(self._on_done)
+            self._futures.append(future)
+            self.peak_rss_mb = max(self.peak_rss_mb, load_profile.current_rss_mb())
+
+    def abort(self, error):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def finish(self):
+        with load_profile.stage("commit"):
+            self._executor.shutdown(wait=True)
+        if self._errors:
+            raise self._errors[0]
+        self.rows = sum(future.result() for future in self._futures)
+        self._futures = []
+        super().finish()
+
+class CassandraSink(Sink):
+    """Writes converted rows with a prepared statement, keeping a fixed number of writes in flight.
+
+    With a token-aware load balancing policy each write goes straight to a replica of its
+    partition. Rows of a batch that share a partition key are grouped into unlogged batches of
+    at most partition_batch_rows rows, which a single replica applies in one write. fill_keys, like
+    the one fill_null_keys() builds, fixes up the typed columns of every batch before the rows are
+    built from them.
+    """
+
+    name = "cassandra"
+
+    def __init__(self, session, insert, table_name, convert_columns, partition_key_indexes=(), concurrency=64,
+                 partition_batch_rows=1, fill_keys=None):
+        super().__init__(table_name)
+        self.session = session
+        self.insert = insert
+        self.convert_columns = convert_columns
+        self.fill_keys = fill_keys
+        self.partition_key_indexes = list(partition_key_indexes)
+        self.partition_batch_rows = partition_batch_rows
+        self._concurrency = concurrency
+        self._in_flight = threading.BoundedSemaphore(concurrency)
+        self._errors = []
+
+    def _on_success(self, _):
+        self._in_flight.release()
+
+    def _on_error(self, error):
+        self._errors.append(error)
+        self._in_flight.release()
+
+    def iter_statements(self, rows):
+        """Yield (statement, parameters) pairs for a batch of converted rows."""
+        if self.partition_batch_rows <= 1 or not self.partition_key_indexes:
+            for row in rows:
+                yield self.insert, row
+            return
+        partitions = {}
+        for row in rows:
+            partitions.setdefault(tuple(row[index] for index in self.partition_key_indexes), []).append(row)
+        for partition_rows in partitions.values():
+            if len(partition_rows) == 1:
+                yield self.insert, partition_rows[0]
+                continue
+            for start in range(0, len(partition_rows), self.partition_batch_rows):
+                statement = BatchStatement(batch_type=BatchType.UNLOGGED)
+                for row in partition_rows[start:start + self.partition_batch_rows]:
+                    statement.add(self.insert, row)
+                yield statement, None
+
+    def write(self, batch):
+        with load_profile.stage("convert"):
+            columns = batch.columns(self.convert_columns)
+            if self.fill_keys is not None:
+                columns = self.fill_keys(columns)
+            statements = list(self.iter_statements(list(zip(*columns))))
+        with load_profile.stage("transmit"):
+            for statement, parameters in statements:
+                self._in_flight.acquire()
+                if self._errors:
+                    self._in_flight.release()
+                    raise self._errors[0]
+                future = self.session.execute_async(statement, parameters)
+                future.add_callbacks(self._on_success, self._on_error)
+        self.rows += batch.row_count
+
+    def finish(self):
+        # Wait for the writes still in flight
+        with load_profile.stage("commit"):
+            for _ in range(self._concurrency):
+                self._in_flight.acquire()
+        for _ in range(self._concurrency):
+            self._in_flight.release()
+        if self._errors:
+            raise self._errors[0]
+        super().finish()
+
+def connect_cassandra(host, port):
+    """Connect with token-aware routing so every write goes straight to a replica of its partition."""
+    profile = ExecutionProfile(
+        load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy()),
+        consistency_level=ConsistencyLevel.LOCAL_ONE,
+    )
+    cluster = Cluster([host], port=port, execution_profiles={EXEC_PROFILE_DEFAULT: profile})
+    return cluster, cluster.connect()
+
+def prepare_insert(session, table_name, table_definition, columns):
+    """Prepare the INSERT statement of a table for the columns of its schema file."""
+    ddl_columns = {name for name, _ in table_definition["columns"]}
+    missing = [column for column in columns if column not in ddl_columns]
+    if missing:
+        raise ValueError(f"Columns {missing} of {table_name} are not defined in cassandra-ddl.sql")
+    placeholders = ", ".join("?" for _ in columns)
+    return session.prepare(
+        f"INSERT INTO {table_definition['keyspace']}.{table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+    )
+
+def fill_null_keys(key_indexes, null_key):
+    """Build the step storing null values of the key columns of converted columns as null_key, since Cassandra keys cannot be null."""
+    def fill(columns):
+        for index in key_indexes:
+            columns[index] = [null_key if value is None else value for value in columns[index]]
+        return columns
+    return fill
+
+def make_cassandra_sink(session, table_name, table_definition, concurrency=64, partition_batch_rows=1, source_table=None):
+    """Build the sink writing the rows of a table through its prepared INSERT statement.
+
+    A query table generated by cassandra_modeler.py is written from the rows of its source table,
+    with its null keys filled in. Returns the sink and the number of columns of the schema file.
+    """
+    converter = compile_schema(source_table or table_name, CASSANDRA_TYPE_PARSERS)
+    insert = prepare_insert(session, table_name, table_definition, converter.columns)
+    partition_key_indexes = [converter.columns.index(column) for column in table_definition["partition_key"]]
+    fill_keys = None
+    if table_definition.get("null_key") is not None:
+        key_indexes = [converter.columns.index(column)
+                       for column in table_definition["partition_key"] + table_definition["clustering"]]
+        fill_keys = fill_null_keys(key_indexes, table_definition["null_key"])
+    sink = CassandraSink(session, insert, table_name, converter.convert_columns, partition_key_indexes,
+                         concurrency, partition_batch_rows, fill_keys)
+    return sink, len(converter.columns)
@@ -0,0 +1,128 @@
+-- Generated by load/cassandra_modeler.py from the benchmark queries, do not edit
+
+CREATE TABLE is_keyspace.catalog_sales_by_date (
+    cs_sold_date_sk INT,
+    cs_sold_time_sk INT,
+    cs_ship_date_sk INT,
+    cs_bill_customer_sk INT,
+    cs_bill_cdemo_sk INT,
+    cs_bill_hdemo_sk INT,
+    cs_bill_addr_sk INT,
+    cs_ship_customer_sk INT,
+    cs_ship_cdemo_sk INT,
+    cs_ship_hdemo_sk INT,
+    cs_ship_addr_sk INT,
+    cs_call_center_sk INT,
+    cs_catalog_page_sk INT,
+    cs_ship_mode_sk INT,
+    cs_warehouse_sk INT,
+    cs_item_sk INT,
+    cs_promo_sk INT,
+    cs_order_number INT,
+    cs_quantity INT,
+    cs_wholesale_cost DECIMAL,
+    cs_list_price DECIMAL,
+    cs_sales_price DECIMAL,
+    cs_ext_discount_amt DECIMAL,
+    cs_ext_sales_price DECIMAL,
+    cs_ext_wholesale_cost DECIMAL,
+    cs_ext_list_price DECIMAL,
+    cs_ext_tax DECIMAL,
+    cs_coupon_amt DECIMAL,
+    cs_ext_ship_cost DECIMAL,
+    cs_net_paid DECIMAL,
+    cs_net_paid_inc_tax DECIMAL,
+    cs_net_paid_inc_ship DECIMAL,
+    cs_net_paid_inc_ship_tax DECIMAL,
+    cs_net_profit DECIMAL,
+    PRIMARY KEY ((cs_sold_date_sk), cs_item_sk, cs_order_number)
+);
+
+CREATE TABLE is_keyspace.store_returns_by_date (
+    sr_returned_date_sk INT,
+    sr_return_time_sk INT,
+    sr_item_sk INT,
+    sr_customer_sk INT,
+    sr_cdemo_sk INT,
+    sr_hdemo_sk INT,
+    sr_addr_sk INT,
+    sr_store_sk INT,
+    sr_reason_sk INT,
+    sr_ticket_number INT,
+    sr_return_quantity INT,
+    sr_return_amt DECIMAL,
+    sr_return_tax DECIMAL,
+    sr_return_amt_inc_tax DECIMAL,
+    sr_fee DECIMAL,
+    sr_return_ship_cost DECIMAL,
+    sr_refunded_cash DECIMAL,
+    sr_reversed_charge DECIMAL,
+    sr_store_credit DECIMAL,
+    sr_net_loss DECIMAL,
+    PRIMARY KEY ((sr_returned_date_sk), sr_item_sk, sr_ticket_number)
+);
+
+CREATE TABLE is_keyspace.store_sales_by_date (
+    ss_sold_date_sk INT,
+    ss_sold_time_sk INT,
+    ss_item_sk INT,
+    ss_customer_sk INT,
+    ss_cdemo_sk INT,
+    ss_hdemo_sk INT,
+    ss_addr_sk INT,
+    ss_store_sk INT,
+    ss_promo_sk INT,
+    ss_ticket_number INT,
+    ss_quantity INT,
+    ss_wholesale_cost DECIMAL,
+    ss_list_price DECIMAL,
+    ss_sales_price DECIMAL,
+    ss_ext_discount_amt DECIMAL,
+    ss_ext_sales_price DECIMAL,
+    ss_ext_wholesale_cost DECIMAL,
+    ss_ext_list_price DECIMAL,
+    ss_ext_tax DECIMAL,
+    ss_coupon_amt DECIMAL,
+    ss_net_paid DECIMAL,
+    ss_net_paid_inc_tax DECIMAL,
+    ss_net_profit DECIMAL,
+    PRIMARY KEY ((ss_sold_date_sk), ss_item_sk, ss_ticket_number)
+);
+
+CREATE TABLE is_keyspace.web_sales_by_date (
+    ws_sold_date_sk INT,
+    ws_sold_time_sk INT,
+    ws_ship_date_sk INT,
+    ws_item_sk INT,
+    ws_bill_customer_sk INT,
+    ws_bill_cdemo_sk INT,
+    ws_bill_hdemo_sk INT,
+    ws_bill_addr_sk INT,
+    ws_ship_customer_sk INT,
+    ws_ship_cdemo_sk INT,
+    ws_ship_hdemo_sk INT,
+    ws_ship_addr_sk INT,
+    ws_web_page_sk INT,
+    ws_web_site_sk INT,
+    ws_ship_mode_sk INT,
+    ws_warehouse_sk INT,
+    ws_promo_sk INT,
+    ws_order_number INT,
+    ws_quantity INT,
+    ws_wholesale_cost DECIMAL,
+    ws_list_price DECIMAL,
+    ws_sales_price DECIMAL,
+    ws_ext_discount_amt DECIMAL,
+    ws_ext_sales_price DECIMAL,
+    ws_ext_wholesale_cost DECIMAL,
+    ws_ext_list_price DECIMAL,
+    ws_ext_tax DECIMAL,
+    ws_coupon_amt DECIMAL,
+    ws_ext_ship_cost DECIMAL,
+    ws_net_paid DECIMAL,
+    ws_net_paid_inc_tax DECIMAL,
+    ws_net_paid_inc_ship DECIMAL,
+    ws_net_paid_inc_ship_tax DECIMAL,
+    ws_net_profit DECIMAL,
+    PRIMARY KEY ((ws_sold_date_sk), ws_bill_customer_sk, ws_item_sk, ws_order_number)
+);